@@ -0,0 +1,72 @@
+import threading
+import time
+from typing import Optional
+
+
+class AdaptiveConcurrency:
+    """
+    Límite de concurrencia que se ajusta según el rendimiento observado.
+
+    Funciona como un semáforo cuyo tamaño cambia: cada `interval` segundos se
+    mide cuántas operaciones terminaron por segundo. Si el ritmo creció más de
+    un 10% se permite una operación simultánea más; si cayó más de un 10% se
+    permite una menos.
+    """
+    def __init__(self, initial: int, maximum: int, minimum: int = 1, interval: float = 2.0):
+        """
+        Inicializa el límite de concurrencia.
+
+        Args:
+            initial: Número inicial de operaciones simultáneas
+            maximum: Número máximo de operaciones simultáneas
+            minimum: Número mínimo de operaciones simultáneas
+            interval: Segundos entre cada ajuste del límite
+        """
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = max(self.minimum, min(initial, self.maximum))
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._completed = 0
+        self._window_start = time.monotonic()
+        self._last_rate = None
+
+    def acquire(self):
+        """
+        Espera hasta que haya hueco para una operación más y la registra.
+        """
+        with self._cond:
+            while self._inflight >= self.limit:
+                self._cond.wait()
+            self._inflight += 1
+
+    def release(self, now: Optional[float] = None):
+        """
+        Marca una operación como terminada y, si pasó el intervalo, ajusta el límite.
+
+        Args:
+            now: Instante actual (time.monotonic() si no se indica)
+        """
+        with self._cond:
+            self._inflight -= 1
+            self._completed += 1
+            self._adjust(time.monotonic() if now is None else now)
+            self._cond.notify_all()
+
+    def _adjust(self, now: float):
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return
+
+        rate = self._completed / elapsed
+        if self._last_rate is None or rate > self._last_rate * 1.1:
+            # El rendimiento sigue mejorando: probar con una operación más
+            self.limit = min(self.limit + 1, self.maximum)
+        elif rate < self._last_rate * 0.9:
+            # El rendimiento empeoró: volver a un nivel menor
+            self.limit = max(self.limit - 1, self.minimum)
+
+        self._last_rate = rate
+        self._completed = 0
+        self._window_start = now
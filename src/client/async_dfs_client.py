@@ -0,0 +1,571 @@
+import os
+import stat
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, List, Optional, Tuple
+
+import grpc
+from grpc import aio
+
+from src.client.dfs_client import DFSClient
+from src.client.buffer_pool import BufferPool
+from src.client.datanode_client import DataNodeClient
+from src.client.progress_bar import ProgressBar
+from src.common.checksum import verify_checksum
+from src.common.compression import ACCEPT_COMPRESSION_KEY, compress_block, decompress_block
+from src.common.proto import datanode_pb2, datanode_pb2_grpc
+
+
+async def _as_completed_bounded(coroutines: Iterable[Awaitable], limit: int) -> AsyncIterator[Any]:
+    """
+    Ejecuta las corrutinas de un iterador con como mucho `limit` en curso a la
+    vez y devuelve sus resultados a medida que terminan. Las corrutinas se crean
+    solo cuando hay hueco, así que la memoria no depende de cuántas haya.
+
+    Args:
+        coroutines: Iterador (normalmente un generador) de corrutinas
+        limit: Número máximo de corrutinas en curso
+
+    Yields:
+        Resultado de cada corrutina, en orden de finalización
+    """
+    pending = set()
+    try:
+        for coroutine in coroutines:
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(coroutine))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class AsyncDFSClient(DFSClient):
+    """
+    Cliente DFS que sube y descarga bloques con asyncio en lugar de hilos.
+
+    Las transferencias con los DataNodes usan gRPC asíncrono (grpc.aio), por lo
+    que cientos de bloques pueden estar en curso sin un hilo del sistema por
+    cada uno. Cada bloque se sube una vez al líder, que lo replica en los demás
+    DataNodes. Las llamadas al NameNode, que tras el registro masivo son unas
+    pocas por archivo, se siguen haciendo con el cliente HTTP síncrono en un
+    hilo aparte. put_file y get_file ejecutan las versiones asíncronas con
+    asyncio.run, así que el cliente puede usarse igual que DFSClient.
+    """
+    def __init__(self, namenode_url: str, block_size: Optional[int] = None, max_inflight: int = 32):
+        """
+        Inicializa el cliente DFS asíncrono.
+
+        Args:
+            namenode_url: URL del NameNode (ej: 'http://localhost:8000')
+            block_size: Tamaño de bloque personalizado (opcional)
+            max_inflight: Número máximo de bloques transfiriéndose a la vez
+        """
+        super().__init__(namenode_url, block_size)
+        self.logger = logging.getLogger("AsyncDFSClient")
+        self.max_inflight = max_inflight
+        # Canales gRPC asíncronos abiertos durante una operación ((hostname, port) -> canal)
+        self._channels = {}
+
+    def put_file(self, local_path: str, dfs_path: str, max_workers: Optional[int] = None) -> bool:
+        return asyncio.run(self.aput_file(local_path, dfs_path, max_workers))
+
+    def get_file(self, dfs_path: str, local_path: str, max_workers: Optional[int] = None,
+                 max_retries: int = 3) -> bool:
+        return asyncio.run(self.aget_file(dfs_path, local_path, max_workers, max_retries))
+
+    async def aput_file(self, local_path: str, dfs_path: str, max_workers: Optional[int] = None) -> bool:
+        """
+        Sube un archivo al sistema de archivos distribuido.
+
+        Args:
+            local_path: Ruta local del archivo a subir
+            dfs_path: Ruta destino en el DFS
+            max_workers: Número máximo de bloques subiéndose a la vez (DFS_MAX_WORKERS o max_inflight
+                por defecto)
+
+        Returns:
+            True si la operación fue exitosa, False en caso contrario
+        """
+        try:
+            try:
+                file_stat = os.stat(local_path)
+            except OSError:
+                file_stat = None
+            if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+                self.logger.error(f"Error: El archivo local {local_path} no existe o no es un archivo")
+                return False
+
+            parent_dir = os.path.dirname(dfs_path)
+            if parent_dir and not await asyncio.to_thread(self._ensure_directory_exists, parent_dir):
+                self.logger.error(f"Error: No se pudo crear el directorio padre {parent_dir}")
+                return False
+
+            file_size = file_stat.st_size
+            self.logger.info(f"Archivo: {os.path.basename(dfs_path)} ({self._format_size(file_size)})")
+
+            # Archivos de un solo bloque: misma ruta directa que el cliente síncrono
+            if file_size <= self.block_size:
+                return await asyncio.to_thread(self._put_small_file, local_path, dfs_path, file_size)
+
+            block_size = self._block_size_for(file_size)
+            blocks = self._split_file_into_blocks(local_path, file_size, block_size)
+            block_distribution = await asyncio.to_thread(self.block_distributor.distribute_blocks, blocks)
+
+            blocks_without_nodes = [b['block_id'] for b in blocks if b['block_id'] not in block_distribution]
+            if blocks_without_nodes:
+                self.logger.error(f"Error: {len(blocks_without_nodes)} bloques no tienen DataNodes asignados")
+                return False
+
+            file_info = await asyncio.to_thread(self.namenode_client.create_file, {
+                'name': os.path.basename(dfs_path),
+                'path': dfs_path,
+                'type': 'file',
+                'size': file_size
+            })
+            file_id = file_info.get('file_id')
+            if not file_id:
+                self.logger.error("Error: No se pudo crear el archivo en el NameNode")
+                return False
+
+            for block in blocks:
+                block['file_id'] = file_id
+
+            # Registrar los bloques en orden mientras empiezan las subidas; las
+            # ubicaciones no se envían hasta que el registro termine
+            registration = asyncio.ensure_future(
+                asyncio.to_thread(self.namenode_client.register_blocks_bulk, file_id, blocks))
+
+            # Cada bloque en curso ocupa memoria: limitar también por upload_buffer_budget
+            limit = max(1, min(max_workers or self.default_max_workers or self.max_inflight, self.upload_buffer_budget // block_size))
+            upload_start = time.monotonic()
+            fd = self._open_for_upload(local_path)
+
+            # Un buffer reutilizable por subida en curso, como en put_file: los
+            # bloques se leen sobre él en lugar de reservar bytes nuevos cada vez
+            buffer_pool = BufferPool(min(block_size, file_size), limit)
+
+            def read_block(block, buffer):
+                # Leer el bloque del disco calculando su checksum a la vez; zlib y
+                # crc32c liberan el GIL, así que se solapa con las transferencias en curso
+                self._prefetch_range(fd, block['offset'] + block['size'], block_size)
+                data = memoryview(buffer)[:block['size']]
+                block['checksum'] = self._read_block_with_checksum(fd, data, block['offset'])
+                self._drop_cached_range(fd, block['offset'], block['size'])
+                return data
+
+            async def upload(block):
+                buffer = buffer_pool.acquire()
+                try:
+                    nodes = block_distribution.pop(block['block_id'])
+                    try:
+                        data = await asyncio.to_thread(read_block, block, buffer)
+                    except OSError as e:
+                        self.logger.error(f"Error al leer el bloque {block['block_id']}: {str(e)}")
+                        return [(False, block['block_id'], node_info['node_id']) for node_info in nodes]
+                    return await self._aupload_block_replicated(block, data, nodes)
+                finally:
+                    buffer_pool.release(buffer)
+
+            total_uploads = sum(len(block_distribution[b['block_id']]) for b in blocks)
+            progress_bar = ProgressBar(total_uploads)
+            uploaded = 0
+            failed_uploads = 0
+
+            self.logger.info("Subiendo bloques a los DataNodes...")
+            try:
+                async for results in _as_completed_bounded((upload(block) for block in blocks), limit):
+                    for success, block_id, node_id in results:
+                        if not success:
+                            failed_uploads += 1
+                            self.logger.error(f"Error al subir el bloque {block_id} al DataNode {node_id}")
+                        uploaded += 1
+                        progress_bar.update(uploaded)
+
+                    if registration.done() and len(self._pending_locations) >= self.location_batch_size:
+                        await asyncio.to_thread(self._flush_block_locations)
+            finally:
+                progress_bar.close()
+                os.close(fd)
+                await self._close_channels()
+
+            if not failed_uploads:
+                self._upload_throughput = file_size / max(time.monotonic() - upload_start, 1e-6)
+
+            try:
+                await registration
+            except Exception as e:
+                self.logger.error(f"Error registrando los bloques en el NameNode: {e}")
+                self._discard_block_locations(file_id)
+                return False
+
+            if not await asyncio.to_thread(self._flush_block_locations, file_id):
+                self.logger.error("Error: No se pudieron registrar las ubicaciones de los bloques en el NameNode")
+                self._discard_block_locations(file_id)
+                return False
+
+            if failed_uploads > 0:
+                self.logger.warning(f"Advertencia: {failed_uploads} bloques no se pudieron subir correctamente")
+                self.logger.warning("El archivo podría no estar completo en el DFS")
+                return False
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error al subir el archivo: {str(e)}")
+            return False
+
+    async def aget_file(self, dfs_path: str, local_path: str, max_workers: Optional[int] = None,
+                        max_retries: int = 3) -> bool:
+        """
+        Descarga un archivo del sistema de archivos distribuido.
+
+        Args:
+            dfs_path: Ruta del archivo en el DFS
+            local_path: Ruta local donde se guardará el archivo
+            max_workers: Número máximo de bloques descargándose a la vez (DFS_MAX_WORKERS o max_inflight
+                por defecto)
+            max_retries: Número máximo de reintentos para bloques fallidos
+
+        Returns:
+            True si la operación fue exitosa, False en caso contrario
+        """
+        try:
+            file_info = self._resolve_compact_locations(
+                await asyncio.to_thread(self.namenode_client.get_file_info, dfs_path, True))
+            if not file_info:
+                self.logger.error(f"Error: El archivo {dfs_path} no existe en el DFS")
+                return False
+
+            if file_info.get('type') != 'file':
+                self.logger.error(f"Error: {dfs_path} no es un archivo")
+                return False
+
+            blocks = file_info.get('blocks', [])
+            os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+
+            if not blocks:
+                if file_info.get('size', 0) == 0:
+                    open(local_path, 'wb').close()
+                    self.logger.info(f"Archivo descargado exitosamente en {local_path}")
+                    return True
+
+                self.logger.error("Error: No se encontraron bloques para el archivo")
+                return False
+
+            self.logger.info(f"Descargando {len(blocks)} bloques...")
+
+            block_offsets = {}
+            file_size = 0
+            for block in blocks:
+                block_offsets[block.get('block_id')] = file_size
+                file_size += block.get('size', 0)
+
+            unresolved_ids = {location['datanode_id'] for block in blocks for location in block.get('locations', [])
+                              if location.get('datanode_id') and not (location.get('hostname') and location.get('port'))}
+            datanode_map = await asyncio.to_thread(self._get_datanode_map, unresolved_ids) if unresolved_ids else {}
+
+            # Cada bloque en curso ocupa memoria: limitar también por download_buffer_budget
+            limit = self._download_concurrency(max_workers or self.default_max_workers or self.max_inflight, blocks)
+            progress_bar = ProgressBar(len(blocks))
+            downloaded = 0
+
+            fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                try:
+                    os.posix_fallocate(fd, 0, file_size)
+                except (AttributeError, OSError):
+                    os.ftruncate(fd, file_size)
+
+                async def download(block):
+                    data = await self._adownload_block(block, datanode_map)
+                    if data is None:
+                        return block, False
+                    # Escribir fuera del bucle de eventos para no frenar las demás descargas
+                    await asyncio.to_thread(self._pwrite_all, fd, data, block_offsets[block['block_id']])
+                    return block, True
+
+                failed_blocks = []
+                async for block, success in _as_completed_bounded((download(block) for block in blocks), limit):
+                    if not success:
+                        failed_blocks.append(block)
+                    downloaded += 1
+                    progress_bar.update(downloaded)
+                progress_bar.close()
+
+                # Reintentar los bloques fallidos con ubicaciones actualizadas
+                for retry in range(max_retries):
+                    if not failed_blocks:
+                        break
+                    self.logger.info(f"Reintentando descargar {len(failed_blocks)} bloques fallidos (intento {retry + 1}/{max_retries})...")
+                    await asyncio.sleep(self.round_retry_policy.delay(retry))
+
+                    updated = await asyncio.gather(*[
+                        asyncio.to_thread(self.namenode_client.get_block_info, block['block_id'])
+                        for block in failed_blocks
+                    ])
+                    retries = (download(updated_block if updated_block and updated_block.get('locations') else block)
+                               for block, updated_block in zip(failed_blocks, updated))
+                    failed_blocks = [block async for block, success in _as_completed_bounded(retries, limit)
+                                     if not success]
+            finally:
+                os.close(fd)
+                await self._close_channels()
+
+            if failed_blocks:
+                failed_block_ids = [block['block_id'] for block in failed_blocks]
+                self.logger.error(f"Error: No se pudieron descargar {len(failed_blocks)} bloques")
+                self.logger.error(f"Bloques fallidos: {failed_block_ids}")
+                if (len(blocks) - len(failed_blocks)) / len(blocks) < 0.9:
+                    # No conservar un archivo parcial
+                    os.remove(local_path)
+                else:
+                    self.logger.warning("Advertencia: El archivo puede estar incompleto o corrupto debido a bloques faltantes.")
+                return False
+
+            self.logger.info(f"Archivo descargado exitosamente en {local_path}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error al descargar el archivo: {e}")
+            return False
+
+    def _get_stub(self, hostname: str, port: int) -> datanode_pb2_grpc.DataNodeServiceStub:
+        """
+        Devuelve un stub gRPC asíncrono para el DataNode, reutilizando su canal.
+
+        Args:
+            hostname: Host del DataNode
+            port: Puerto del DataNode
+
+        Returns:
+            Stub del servicio del DataNode
+        """
+        key = (hostname, int(port))
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = aio.insecure_channel(f"{hostname}:{port}", options=[
+                ('grpc.max_send_message_length', 8 * 1024 * 1024),
+                ('grpc.max_receive_message_length', 8 * 1024 * 1024)
+            ])
+            self._channels[key] = channel
+        return datanode_pb2_grpc.DataNodeServiceStub(channel)
+
+    async def _close_channels(self):
+        channels = list(self._channels.values())
+        self._channels.clear()
+        for channel in channels:
+            await channel.close()
+
+    async def _astore_block(self, node_info: Dict, block_id: str, data: bytes,
+                            max_attempts: int = 3) -> bool:
+        """
+        Envía un bloque a un DataNode reintentando con la espera de retry_policy.
+
+        Args:
+            node_info: DataNode de destino (con 'hostname' y 'port')
+            block_id: ID del bloque
+            data: Contenido del bloque
+            max_attempts: Número máximo de intentos
+
+        Returns:
+            True si el bloque quedó almacenado en el DataNode
+        """
+        stub = self._get_stub(node_info['hostname'], node_info['port'])
+        chunk_size = DataNodeClient.CHUNK_SIZE
+        compressed = await asyncio.to_thread(compress_block, data, self.compression)
+        payload = compressed if compressed is not None else data
+        compression = self.compression if compressed is not None else None
+        view = memoryview(payload)
+
+        def block_data_iterator():
+            for i in range(0, max(len(payload), 1), chunk_size):
+                yield datanode_pb2.BlockData(
+                    block_id=block_id,
+                    data=bytes(view[i:i + chunk_size]),
+                    offset=i,
+                    total_size=len(payload),
+                    original_size=len(data),
+                    compressed=compression is not None,
+                    compression_metadata=compression.encode() if compression else b''
+                )
+
+        for attempt in range(max_attempts):
+            try:
+                response = await stub.StoreBlock(block_data_iterator())
+                if response.status == datanode_pb2.BlockResponse.SUCCESS:
+                    return True
+            except grpc.RpcError as e:
+                self.logger.warning(f"Error enviando el bloque {block_id} (intento {attempt + 1}/{max_attempts}): {e}")
+
+            if attempt < max_attempts - 1:
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+
+        return False
+
+    async def _aupload_block_replicated(self, block: Dict, data: bytes, nodes: List[Dict]) -> List[Tuple[bool, str, str]]:
+        """
+        Sube un bloque una sola vez, al líder (el primer DataNode), y le pide que
+        lo replique a la vez en los demás. Si el líder no puede replicar en algún
+        DataNode, el cliente sube esa réplica directamente.
+
+        Args:
+            block: Información del bloque (con 'file_id' y 'checksum')
+            data: Contenido del bloque
+            nodes: DataNodes asignados al bloque; el primero es el líder
+
+        Returns:
+            Lista de tuplas (éxito, block_id, node_id), una por réplica
+        """
+        if not nodes:
+            return []
+
+        leader = nodes[0]
+        leader_result = await self._aupload_replica(block, data, leader, True)
+        replicate = leader_result[0] and leader_result[2] == leader['node_id']
+
+        async def follower(node_info):
+            if replicate:
+                try:
+                    response = await self._get_stub(leader['hostname'], leader['port']).ReplicateBlock(
+                        datanode_pb2.ReplicationRequest(
+                            block_id=block['block_id'],
+                            target_datanode_id=node_info['node_id'],
+                            target_hostname=node_info['hostname'],
+                            target_port=int(node_info['port'])
+                        ))
+                    if response.status == datanode_pb2.BlockResponse.SUCCESS:
+                        with self._locations_lock:
+                            self._pending_locations.append((block, node_info['node_id'], False))
+                        return True, block['block_id'], node_info['node_id']
+                except grpc.RpcError as e:
+                    self.logger.warning(f"Error replicando el bloque {block['block_id']} en {node_info['node_id']}: {e}")
+            return await self._aupload_replica(block, data, node_info, False)
+
+        return [leader_result] + list(await asyncio.gather(*[follower(node_info) for node_info in nodes[1:]]))
+
+    async def _aupload_replica(self, block: Dict, data: bytes, node_info: Dict, is_leader: bool,
+                               max_retries: int = 2) -> Tuple[bool, str, str]:
+        """
+        Sube una réplica de un bloque y, si falla, la reintenta en un DataNode alternativo.
+
+        Args:
+            block: Información del bloque (con 'file_id' y 'checksum')
+            data: Contenido del bloque
+            node_info: DataNode de destino
+            is_leader: Si es True, el DataNode es el líder
+            max_retries: Número máximo de intentos
+
+        Returns:
+            Tupla (éxito, block_id, node_id del último DataNode intentado)
+        """
+        failed_nodes = []
+        for attempt in range(max_retries):
+            if await self._astore_block(node_info, block['block_id'], data):
+                # La ubicación se envía al NameNode en lotes desde aput_file
+                with self._locations_lock:
+                    self._pending_locations.append((block, node_info['node_id'], is_leader))
+                return True, block['block_id'], node_info['node_id']
+
+            failed_nodes.append(node_info['node_id'])
+            if attempt < max_retries - 1:
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                alternative_nodes = await asyncio.to_thread(
+                    self.block_distributor.get_alternative_datanodes, block['size'], failed_nodes)
+                if not alternative_nodes:
+                    break
+                node_info = alternative_nodes[0]
+
+        return False, block['block_id'], node_info['node_id']
+
+    async def _adownload_block(self, block_info: Dict, datanode_map: Dict[str, Dict]) -> Optional[bytearray]:
+        """
+        Descarga un bloque de la réplica más rápida conocida, pidiéndolo también
+        a la siguiente si no responde en el tiempo esperado (ver download_block).
+
+        Args:
+            block_info: Información del bloque con sus ubicaciones
+            datanode_map: Información de DataNodes ya resuelta (node_id -> info)
+
+        Returns:
+            Contenido del bloque o None si no se pudo descargar de ninguna ubicación
+        """
+        block_id = block_info.get('block_id')
+        size = block_info.get('size') or self.block_size
+        errors = []
+        targets = []
+        for location in block_info.get('locations', []):
+            datanode_id = location.get('datanode_id')
+            hostname = location.get('hostname')
+            port = location.get('port')
+            if (not hostname or not port) and datanode_id in datanode_map:
+                hostname = datanode_map[datanode_id].get('hostname')
+                port = datanode_map[datanode_id].get('port')
+            if not hostname or not port:
+                errors.append(f"Información incompleta del DataNode {datanode_id}")
+                continue
+            targets.append((datanode_id, hostname, port))
+        self._order_targets(targets)
+
+        async def fetch(target):
+            datanode_id, hostname, port = target
+            start = time.monotonic()
+            try:
+                stub = self._get_stub(hostname, port)
+                data = bytearray()
+                compression = None
+                metadata = ((ACCEPT_COMPRESSION_KEY, self.compression),) if self.compression else None
+                async for chunk in stub.RetrieveBlock(datanode_pb2.BlockRequest(block_id=block_id), metadata=metadata):
+                    if not data and chunk.compressed:
+                        compression = chunk.compression_metadata.decode()
+                    data += chunk.data
+            except grpc.RpcError as e:
+                return None, f"Error con DataNode {datanode_id} ({hostname}:{port}): {e}"
+
+            if compression is not None:
+                data = await asyncio.to_thread(decompress_block, data, compression)
+
+            if not data:
+                return None, f"El DataNode {datanode_id} ({hostname}:{port}) devolvió datos vacíos"
+            if await asyncio.to_thread(verify_checksum, data, block_info.get('checksum')) is False:
+                return None, f"El DataNode {datanode_id} ({hostname}:{port}) devolvió datos con checksum incorrecto"
+            self._record_datanode_latency(datanode_id, time.monotonic() - start, len(data))
+            return data, None
+
+        pending = set()
+        next_target = 0
+        failures = 0
+        done = set()
+        try:
+            while pending or next_target < len(targets):
+                # Pedir el bloque a la siguiente réplica si las anteriores fallaron
+                # o si la última espera venció sin respuesta
+                if next_target < len(targets) and (not pending or not done):
+                    if not pending and failures:
+                        await asyncio.sleep(self.retry_policy.delay(failures - 1))
+                    pending.add(asyncio.ensure_future(fetch(targets[next_target])))
+                    next_target += 1
+
+                timeout = self._hedge_timeout(targets[next_target - 1][0], size) if next_target < len(targets) else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    data, error = task.result()
+                    if data is not None:
+                        return data
+                    errors.append(error)
+                    failures += 1
+        finally:
+            # Las peticiones que perdieron la carrera se cancelan en el DataNode
+            for task in pending:
+                task.cancel()
+
+        self.logger.error(f"No se pudo descargar el bloque {block_id}. Errores: {'; '.join(errors)}")
+        return None
@@ -1,7 +1,17 @@
 from typing import List, Dict, Optional, Tuple
 import random
+import time
 from src.client.namenode_client import NameNodeClient
 
+# Tamaño óptimo de bloque por NameNode (base_url -> (tamaño, instante de caducidad)),
+# compartido entre clientes para no consultarlo en cada construcción
+_optimal_block_size_cache = {}
+OPTIMAL_BLOCK_SIZE_TTL = 60.0
+
+# Tamaño mínimo del bloque aconsejado: con bloques más pequeños, el coste fijo de
+# cada bloque (RPC, registro en el NameNode y réplicas) domina la transferencia
+MIN_BLOCK_SIZE = 64 * 1024
+
 
 class BlockDistributor:
     """
@@ -18,19 +28,22 @@ class BlockDistributor:
         self.namenode_client = namenode_client
         self.replication_factor = replication_factor
     
-    def select_datanodes_for_block(self, block_size: int, excluded_nodes: List[str] = None) -> List[Dict]:
+    def select_datanodes_for_block(self, block_size: int, excluded_nodes: List[str] = None,
+                                   datanodes: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Selecciona los DataNodes más adecuados para almacenar un bloque.
         
         Args:
             block_size: Tamaño del bloque en bytes
             excluded_nodes: Lista de IDs de DataNodes a excluir
+            datanodes: DataNodes activos ya consultados (si no se indican, se piden al NameNode)
             
         Returns:
             Lista de DataNodes seleccionados con su información
         """
         # Obtener todos los DataNodes activos
-        datanodes = self.namenode_client.list_datanodes(status="active")
+        if datanodes is None:
+            datanodes = self.namenode_client.list_datanodes(status="active")
         
         if excluded_nodes:
             # Filtrar los DataNodes excluidos
@@ -52,8 +65,9 @@ class BlockDistributor:
             random.random()  # Desempate aleatorio
         ), reverse=True)
         
-        # Seleccionar los primeros nodos como candidatos
-        selected_nodes = eligible_datanodes[:num_nodes]
+        # Seleccionar los primeros nodos como candidatos (copias: la lista de
+        # DataNodes puede compartirse entre varios bloques)
+        selected_nodes = [dict(node) for node in eligible_datanodes[:num_nodes]]
         
         # Designar el primer nodo como líder
         for i, node in enumerate(selected_nodes):
@@ -89,9 +103,12 @@ class BlockDistributor:
         """
         block_distribution = {}
         
+        # Una sola consulta al NameNode para todos los bloques del archivo
+        datanodes = self.namenode_client.list_datanodes(status="active")
+        
         for block in blocks:
             try:
-                selected_nodes = self.select_datanodes_for_block(block['size'])
+                selected_nodes = self.select_datanodes_for_block(block['size'], datanodes=datanodes)
                 block_distribution[block['block_id']] = selected_nodes
             except Exception as e:
                 print(f"Error al distribuir el bloque {block['block_id']}: {e}")
@@ -107,6 +124,15 @@ class BlockDistributor:
         Returns:
             Tamaño óptimo de bloque en bytes
         """
+        cached = _optimal_block_size_cache.get(self.namenode_client.base_url)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        
+        block_size = self._compute_optimal_block_size()
+        _optimal_block_size_cache[self.namenode_client.base_url] = (block_size, time.monotonic() + OPTIMAL_BLOCK_SIZE_TTL)
+        return block_size
+    
+    def _compute_optimal_block_size(self) -> int:
         # Por defecto, usar 4MB como tamaño de bloque
         default_size = 4 * 1024 * 1024
         
@@ -122,7 +148,8 @@ class BlockDistributor:
             
             # Si el espacio promedio es muy pequeño, reducir el tamaño del bloque
             if avg_space < default_size * 10:  # Si hay menos de 10 bloques de espacio
-                return min(default_size, int(avg_space / 4))  # Usar 1/4 del espacio promedio
+                # Usar 1/4 del espacio promedio, sin bajar de MIN_BLOCK_SIZE
+                return max(MIN_BLOCK_SIZE, min(default_size, int(avg_space / 4)))
             
             return default_size
         except Exception:
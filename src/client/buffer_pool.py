@@ -0,0 +1,54 @@
+import queue
+import threading
+
+
+class BufferPool:
+    """
+    Pool de buffers reutilizables del tamaño de un bloque.
+
+    Evita reservar un objeto bytes nuevo por cada bloque leído: los buffers
+    se crean bajo demanda hasta un máximo y se devuelven al pool cuando el
+    bloque terminó de subirse.
+    """
+    def __init__(self, size: int, max_buffers: int):
+        """
+        Inicializa el pool de buffers.
+
+        Args:
+            size: Tamaño en bytes de cada buffer
+            max_buffers: Número máximo de buffers que puede crear el pool
+        """
+        self.size = size
+        self.max_buffers = max_buffers
+        self._free = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bytearray:
+        """
+        Obtiene un buffer libre. Si no hay ninguno y ya se alcanzó el máximo,
+        espera a que otro hilo libere uno.
+
+        Returns:
+            Buffer de tamaño fijo
+        """
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.max_buffers:
+                self._created += 1
+                return bytearray(self.size)
+
+        return self._free.get()
+
+    def release(self, buffer: bytearray):
+        """
+        Devuelve un buffer al pool para que pueda reutilizarse.
+
+        Args:
+            buffer: Buffer obtenido previamente con acquire()
+        """
+        self._free.put(buffer)
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import stat
 import sys
 import time
 import datetime
+import logging
+import logging.handlers
+import queue
 from typing import List, Dict, Optional, Tuple
 
 from src.client.dfs_client import DFSClient
@@ -44,6 +48,7 @@ class DFSCLI:
                 
                 if command == "exit" or command == "quit":
                     print("Saliendo del CLI...")
+                    self.client.close()
                     break
                 elif command == "help":
                     self._show_help()
@@ -95,7 +100,7 @@ Comandos disponibles:
   exit, quit                                   - Sale del CLI
 
 Opciones:
-  --workers=N  - Número de trabajadores para operaciones paralelas (1-16)
+  --workers=N  - Número de trabajadores para operaciones paralelas (1-32, automático si se omite)
   -l           - Formato largo para listar directorios
   -p           - Crear directorios padres si no existen
 """
@@ -115,7 +120,7 @@ Opciones:
         # Procesar argumentos
         local_path = args[0]
         dfs_path = args[1]
-        max_workers = 4  # Valor por defecto
+        max_workers = None  # Por defecto se ajusta automáticamente
         
         # Procesar argumentos opcionales
         for arg in args[2:]:
@@ -124,20 +129,22 @@ Opciones:
                     max_workers = int(arg.split("=")[1])
                     if max_workers < 1:
                         max_workers = 1
-                    elif max_workers > 16:
-                        max_workers = 16
+                    elif max_workers > 32:
+                        max_workers = 32
                 except (ValueError, IndexError):
-                    print("Advertencia: Valor inválido para workers, usando valor por defecto (4)")
-                    max_workers = 4
+                    print("Advertencia: Valor inválido para workers, se ajustará automáticamente")
+                    max_workers = None
         
         # Convertir rutas relativas a absolutas para el archivo local
         local_path = os.path.abspath(local_path)
         
-        # Verificar que el archivo existe
-        if not os.path.exists(local_path):
+        # Verificar que el archivo existe (un único stat para existencia, tipo y tamaño)
+        try:
+            file_stat = os.stat(local_path)
+        except FileNotFoundError:
             print(f"Error: El archivo local {local_path} no existe")
             return
-        elif not os.path.isfile(local_path):
+        if not stat.S_ISREG(file_stat.st_mode):
             print(f"Error: {local_path} no es un archivo")
             return
         
@@ -146,12 +153,12 @@ Opciones:
             dfs_path = self._resolve_path(dfs_path)
         
         # Mostrar información del archivo
-        file_size = os.path.getsize(local_path)
+        file_size = file_stat.st_size
         print(f"\nIniciando subida de archivo:")
         print(f"  Local: {local_path}")
         print(f"  DFS:   {dfs_path}")
         print(f"  Tamaño: {self._format_size(file_size)}")
-        print(f"  Workers: {max_workers}")
+        print(f"  Workers: {max_workers or 'automático'}")
         print("-" * 50)
         
         try:
@@ -174,10 +181,9 @@ Opciones:
         """
         Formatea un tamaño en bytes a una representación legible.
         """
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024 or unit == 'TB':
-                return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024
+        # Cada unidad son 10 bits más: la unidad sale de la longitud en bits
+        unit = min(4, max(0, (int(size_bytes).bit_length() - 1) // 10))
+        return f"{size_bytes / (1 << (10 * unit)):.2f} {('B', 'KB', 'MB', 'GB', 'TB')[unit]}"
     
     def _handle_get(self, args: List[str]):
         """
@@ -193,7 +199,7 @@ Opciones:
         # Procesar argumentos
         dfs_path = args[0]
         local_path = args[1]
-        max_workers = 4  # Valor por defecto
+        max_workers = None  # Por defecto se ajusta automáticamente
         
         # Procesar argumentos opcionales
         for arg in args[2:]:
@@ -202,11 +208,11 @@ Opciones:
                     max_workers = int(arg.split("=")[1])
                     if max_workers < 1:
                         max_workers = 1
-                    elif max_workers > 16:
-                        max_workers = 16
+                    elif max_workers > 32:
+                        max_workers = 32
                 except (ValueError, IndexError):
-                    print("Advertencia: Valor inválido para workers, usando valor por defecto (4)")
-                    max_workers = 4
+                    print("Advertencia: Valor inválido para workers, se ajustará automáticamente")
+                    max_workers = None
         
         # Manejar rutas relativas en el DFS
         if not dfs_path.startswith('/'):
@@ -235,7 +241,7 @@ Opciones:
         print(f"\nIniciando descarga de archivo:")
         print(f"  DFS:   {dfs_path}")
         print(f"  Local: {local_path}")
-        print(f"  Workers: {max_workers}")
+        print(f"  Workers: {max_workers or 'automático'}")
         print("-" * 50)
         
         # Iniciar la descarga
@@ -559,6 +565,7 @@ Opciones:
             # Eliminar el directorio
             try:
                 self.client.namenode_client.delete_directory(path, recursive=recursive)
+                self.client.forget_directory(path)
                 print(f"Directorio {path} eliminado exitosamente")
             except Exception as e:
                 print(f"Error al eliminar el directorio: {e}")
@@ -673,7 +680,7 @@ Opciones:
                 return
             
             # Obtener información de los bloques
-            blocks_info = self.client.namenode_client.get_file_blocks(path)
+            blocks_info = self.client.namenode_client.get_file_blocks(path, file_info)
             
             # Obtener lista de DataNodes activos
             active_datanodes = {
@@ -841,8 +848,20 @@ def main():
     
     args = parser.parse_args()
     
-    cli = DFSCLI(args.namenode, args.block_size)
-    cli.run()
+    # Los mensajes del cliente DFS se muestran en la consola como hasta ahora, pero
+    # los hilos de subida y descarga solo encolan sus registros: un único hilo los
+    # escribe, sin que compitan entre ellos por stdout
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    listener = logging.handlers.QueueListener(log_queue, console)
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[logging.handlers.QueueHandler(log_queue)])
+    listener.start()
+    
+    try:
+        cli = DFSCLI(args.namenode, args.block_size)
+        cli.run()
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -1,15 +1,66 @@
 import grpc
 import io
+import logging
+import hashlib
+import threading
 import time
 from typing import List, Optional, Iterator, Tuple, Dict, Any
 
 # Importamos los módulos generados por gRPC
 from src.common.proto import datanode_pb2, datanode_pb2_grpc
+from src.common.compression import ACCEPT_COMPRESSION_KEY, compress_block, decompress_block
+
+class CancelEvent(threading.Event):
+    """
+    Evento que, al activarse, cancela también las descargas en curso que lo
+    usan, aunque aún esperen su primer chunk (p. ej. las demás réplicas de un
+    bloque cuando una de ellas ya respondió).
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._calls_lock = threading.Lock()
+        self._calls = set()
+    
+    def set(self):
+        with self._calls_lock:
+            super().set()
+            calls, self._calls = self._calls, set()
+        for call in calls:
+            call.cancel()
+    
+    def track(self, call) -> bool:
+        """Registra una llamada en curso; devuelve False si el evento ya está activo."""
+        with self._calls_lock:
+            if self.is_set():
+                return False
+            self._calls.add(call)
+            return True
+    
+    def untrack(self, call):
+        with self._calls_lock:
+            self._calls.discard(call)
 
 class DataNodeClient:
-    def __init__(self, hostname: str, port: int):
+    # Tamaño de chunk por defecto de los streams de subida: con 1 MB los bloques
+    # grandes se envían en pocos mensajes sin acercarse al límite de 8 MB
+    CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self, hostname: str, port: int, compression: Optional[str] = None,
+                 chunk_size: Optional[int] = None):
+        """
+        Args:
+            hostname: Host del DataNode
+            port: Puerto del DataNode
+            compression: Algoritmo con el que comprimir los bloques en la red
+                ('zstd', 'lz4' o 'zlib'); None para enviarlos sin comprimir
+            chunk_size: Tamaño de cada mensaje del stream de subida (CHUNK_SIZE por defecto)
+        """
         self.hostname = hostname
         self.port = port
+        self.compression = compression
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.logger = logging.getLogger("DataNodeClient")
         self.channel = None
         self.stub = None
         self.transfer_stats = {
@@ -40,13 +91,16 @@ class DataNodeClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
     
-    def store_block(self, block_id: str, data: bytes) -> bool:
+    def store_block(self, block_id: str, data: bytes, check_existing: bool = False) -> bool:
         """
         Almacena un bloque en el DataNode.
         
         Args:
             block_id: Identificador único del bloque.
             data: Datos del bloque.
+            check_existing: Si es True (en los reintentos), se pregunta antes al
+                DataNode si ya tiene el bloque con el mismo contenido y, en ese
+                caso, no se reenvía.
             
         Returns:
             bool: True si el bloque se almacenó correctamente, False en caso contrario.
@@ -54,34 +108,36 @@ class DataNodeClient:
         start_time = time.time()
         original_size = len(data)
         
+        # En un reintento, el intento anterior pudo llegar al DataNode
+        if check_existing:
+            exists, size, checksum = self.check_block(block_id)
+            if exists and size == original_size and checksum == hashlib.sha256(data).hexdigest():
+                return True
+        
+        # Los bloques compresibles viajan comprimidos; el DataNode los descomprime
+        compressed = compress_block(data, self.compression)
+        payload = compressed if compressed is not None else data
+        
+        compression = self.compression if compressed is not None else None
+        total_size = len(payload)
+        
         def block_data_iterator():
-            # Tamaño de chunk optimizado para transferencia
-            chunk_size = 64 * 1024  # 64KB por chunk
-            total_size = len(data)
-            
-            # Primer chunk
-            first_chunk = data[:chunk_size]
-            
-            yield datanode_pb2.BlockData(
-                block_id=block_id,
-                data=first_chunk,
-                offset=0,
-                total_size=total_size
-            )
-            
-            # Resto de chunks
-            for i in range(len(first_chunk), total_size, chunk_size):
-                chunk = data[i:i+chunk_size]
+            # Los bloques pueden llegar como memoryview; solo se copian los chunks
+            view = memoryview(payload)
+            for offset in range(0, max(total_size, 1), self.chunk_size):
                 yield datanode_pb2.BlockData(
                     block_id=block_id,
-                    data=chunk,
-                    offset=i,
-                    total_size=total_size
+                    data=bytes(view[offset:offset + self.chunk_size]),
+                    offset=offset,
+                    total_size=total_size,
+                    original_size=original_size,
+                    compressed=compression is not None,
+                    compression_metadata=compression.encode() if compression else b''
                 )
         
         try:
             # Registrar estadísticas de transferencia
-            self.transfer_stats["bytes_sent"] += original_size
+            self.transfer_stats["bytes_sent"] += total_size
             
             # Enviar el bloque
             response = self.stub.StoreBlock(block_data_iterator())
@@ -91,28 +147,63 @@ class DataNodeClient:
             
             return response.status == datanode_pb2.BlockResponse.SUCCESS
         except grpc.RpcError as e:
-            print(f"Error al almacenar el bloque: {e}")
+            self.logger.error(f"Error al almacenar el bloque: {e}")
             return False
     
-    def retrieve_block(self, block_id: str) -> Optional[bytes]:
+    def retrieve_block(self, block_id: str, buf: Optional[bytearray] = None,
+                       cancel_event: Optional[CancelEvent] = None) -> Optional[bytes]:
         """
         Recupera un bloque del DataNode.
         
         Args:
             block_id: Identificador único del bloque.
+            buf: Buffer reutilizable donde recibir el bloque (opcional). Si se
+                indica, se devuelve una memoryview sobre él, válida hasta que el
+                buffer se vuelva a usar. Si el bloque no cabe, se usa uno nuevo.
+            cancel_event: Evento que, si se activa, cancela la descarga en curso
+                (opcional; p. ej. cuando otra réplica ya respondió)
             
         Returns:
             Optional[bytes]: Datos del bloque o None si no se encontró.
         """
         start_time = time.time()
+        response_iterator = None
         
         try:
             request = datanode_pb2.BlockRequest(block_id=block_id)
-            response_iterator = self.stub.RetrieveBlock(request)
+            metadata = ((ACCEPT_COMPRESSION_KEY, self.compression),) if self.compression else None
+            response_iterator = self.stub.RetrieveBlock(request, metadata=metadata)
+            if cancel_event is not None and not cancel_event.track(response_iterator):
+                response_iterator.cancel()
+                return None
             
-            block_data = b''
+            # Copiar cada chunk en su posición, sin concatenaciones sucesivas
+            target = buf if buf is not None else bytearray()
+            received = 0
+            compression = None
             for chunk in response_iterator:
-                block_data += chunk.data
+                if received == 0:
+                    # Reservar de una vez el tamaño anunciado en el primer chunk,
+                    # en lugar de ir ampliando el buffer a medida que llegan datos
+                    if chunk.compressed:
+                        # Los datos comprimidos se reciben aparte y se descomprimen al final
+                        compression = chunk.compression_metadata.decode()
+                        target = bytearray(chunk.total_size)
+                    elif chunk.total_size > len(target):
+                        target = bytearray(chunk.total_size)
+                end = received + len(chunk.data)
+                if end > len(target):
+                    grown = bytearray(max(end, 2 * len(target)))
+                    grown[:received] = memoryview(target)[:received]
+                    target = grown
+                target[received:end] = chunk.data
+                received = end
+            
+            block_data = memoryview(target)[:received]
+            if compression is not None:
+                block_data = decompress_block(block_data, compression)
+            elif buf is None:
+                block_data = bytes(block_data)
             
             # Registrar estadísticas
             self.transfer_stats["bytes_received"] += len(block_data)
@@ -122,8 +213,14 @@ class DataNodeClient:
             
             return block_data
         except grpc.RpcError as e:
-            print(f"Error al recuperar el bloque: {e}")
+            if cancel_event is not None and cancel_event.is_set():
+                # Cancelada porque ya no hace falta el bloque
+                return None
+            self.logger.error(f"Error al recuperar el bloque: {e}")
             return None
+        finally:
+            if cancel_event is not None and response_iterator is not None:
+                cancel_event.untrack(response_iterator)
     
     def get_transfer_stats(self) -> Dict[str, Any]:
         """
@@ -161,9 +258,37 @@ class DataNodeClient:
             
             return response.exists, response.size if response.exists else None, response.checksum if response.exists else None
         except grpc.RpcError as e:
-            print(f"Error al verificar el bloque: {e}")
+            self.logger.error(f"Error al verificar el bloque: {e}")
             return False, None, None
     
+    def replicate_block(self, block_id: str, target_node_id: str, target_hostname: str, target_port: int) -> bool:
+        """
+        Pide a este DataNode (el líder del bloque) que replique el bloque en otro
+        DataNode, sin que los datos vuelvan a pasar por el cliente.
+        
+        Args:
+            block_id: Identificador único del bloque.
+            target_node_id: ID del DataNode destino.
+            target_hostname: Host del DataNode destino.
+            target_port: Puerto del DataNode destino.
+            
+        Returns:
+            bool: True si el bloque quedó replicado y verificado en el destino.
+        """
+        try:
+            request = datanode_pb2.ReplicationRequest(
+                block_id=block_id,
+                target_datanode_id=target_node_id,
+                target_hostname=target_hostname,
+                target_port=int(target_port)
+            )
+            response = self.stub.ReplicateBlock(request)
+            
+            return response.status == datanode_pb2.BlockResponse.SUCCESS
+        except grpc.RpcError as e:
+            self.logger.error(f"Error al replicar el bloque: {e}")
+            return False
+    
     def delete_block(self, block_id: str) -> bool:
         """
         Elimina un bloque del DataNode.
@@ -180,5 +305,5 @@ class DataNodeClient:
             
             return response.status == datanode_pb2.BlockResponse.SUCCESS
         except grpc.RpcError as e:
-            print(f"Error al eliminar el bloque: {e}")
+            self.logger.error(f"Error al eliminar el bloque: {e}")
             return False
@@ -1,17 +1,31 @@
 import os
+import stat
+import random
+import socket
 import uuid
 import time
-import sys
-import hashlib
+import queue
+import threading
 import requests
 from typing import List, Dict, Optional, BinaryIO, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 import logging
 
 from src.client.namenode_client import NameNodeClient
-from src.client.datanode_client import DataNodeClient
+from src.client.datanode_client import DataNodeClient, CancelEvent
 from src.client.file_splitter import FileSplitter
 from src.client.block_distributor import BlockDistributor
+from src.client.buffer_pool import BufferPool
+from src.client.adaptive_concurrency import AdaptiveConcurrency
+from src.client.progress_bar import ProgressBar
+from src.client.retry_policy import RetryPolicy
+from src.common.checksum import BlockChecksum, block_checksum, verify_checksum
+from src.common.compression import DEFAULT_COMPRESSION
+
+# Nombres con los que un DataNode se considera en esta misma máquina: sus
+# réplicas se leen primero porque no cruzan la red
+_LOCAL_HOSTNAMES = {socket.gethostname(), 'localhost', '127.0.0.1'}
 
 
 class DFSClient:
@@ -30,35 +44,205 @@ class DFSClient:
         self.block_distributor = BlockDistributor(self.namenode_client)
         self.logger = logging.getLogger("DFSClient")
         
-        # Si no se especifica un tamaño de bloque, usar un valor más pequeño para pruebas (4KB)
-        # o intentar obtener el óptimo del sistema
+        # Si no se especifica un tamaño de bloque, usar el óptimo del sistema
         if block_size is None:
             try:
                 self.block_size = self.block_distributor.get_optimal_block_size()
             except:
-                # Si falla al obtener el tamaño óptimo, usar un valor predeterminado más pequeño para pruebas
-                self.block_size = 4 * 1024  # 4KB para pruebas (normalmente sería 64KB o más)
+                # Si falla al obtener el tamaño óptimo, usar el mismo valor por defecto
+                # que el distribuidor: con bloques de pocos KB, cada bloque pagaría una
+                # RPC, un registro y sus réplicas por muy pocos datos
+                self.block_size = 4 * 1024 * 1024
         else:
             self.block_size = block_size
         
         self.file_splitter = FileSplitter(self.block_size)
+        
+        # Transferencias en paralelo cuando no se indica max_workers: la variable de
+        # entorno DFS_MAX_WORKERS fija el valor (por ejemplo, a la profundidad de
+        # cola de los discos de los DataNodes); si no está, se ajusta automáticamente
+        self.default_max_workers = self._env_max_workers()
+        
+        # Directorios que ya se sabe que existen en el DFS
+        self._known_dirs = set()
+        
+        # Ubicaciones de bloques subidos pendientes de enviar al NameNode
+        self._pending_locations = []
+        self._locations_lock = threading.Lock()
+        # Registros de bloques en curso por archivo (las ubicaciones esperan a que terminen)
+        self._block_registrations = {}
+        self.location_batch_size = 64
+        # Las ubicaciones tampoco esperan en la cola más de este tiempo (segundos)
+        self.location_flush_interval = 0.1
+        self._pending_since = 0.0
+        
+        # Caché de información de DataNodes para las descargas (node_id -> info)
+        self._datanode_cache = {}
+        self._datanode_cache_time = 0.0
+        self.datanode_cache_ttl = 30.0
+        
+        # Buffer de recepción reutilizable por cada hilo de descarga
+        self._thread_buffers = threading.local()
+        
+        # Conexiones gRPC abiertas con los DataNodes ((hostname, port) -> cliente)
+        self._datanode_clients = {}
+        self._datanode_clients_lock = threading.Lock()
+        
+        # Transferencias simultáneas permitidas con cada DataNode, para que uno
+        # lento no acapare todos los hilos ((hostname, port) -> semáforo)
+        self.max_transfers_per_datanode = 8
+        self._datanode_slots = {}
+        
+        # Espera exponencial con jitter entre reintentos contra los DataNodes
+        self.retry_policy = RetryPolicy()
+        # Espera entre rondas de reintento de los bloques que no se pudieron descargar
+        self.round_retry_policy = RetryPolicy(base_delay=0.25, max_delay=8.0)
+        
+        # Tamaño de bloque por archivo: en archivos con muchos bloques se duplica
+        # (hasta max_block_size) mientras el enlace medido lo permita. Las
+        # descargas y los DataNodes mantienen bloques completos en memoria, así
+        # que el límite es el tamaño que esos caminos pueden retener sin riesgo
+        self.max_block_size = 128 * 1024 * 1024
+        self.target_blocks_per_file = 1000
+        self.upload_buffer_budget = 1024 * 1024 * 1024
+        # Memoria para los bloques que se están descargando (cada descarga en
+        # curso retiene su bloque completo, y su petición de respaldo otro más)
+        self.download_buffer_budget = 1024 * 1024 * 1024
+        self._upload_throughput = None  # bytes/s de la última subida
+        
+        # Descargas con peticiones de respaldo: si la réplica elegida tarda más de
+        # lo esperado se pide el bloque también a la siguiente. La espera sale de
+        # la latencia media (EWMA, segundos por byte) de cada DataNode
+        self.hedge_delay = 1.0
+        self.hedge_min_delay = 0.05
+        self._datanode_latency = {}
+        self._hedge_executor = None
+        
+        # Compresión de los bloques en la red (zstd o lz4 si están instalados; None para
+        # desactivarla). Solo se comprimen los bloques que se reducen de verdad
+        self.compression = DEFAULT_COMPRESSION
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def close(self):
+        """
+        Cierra las conexiones abiertas con el NameNode y con los DataNodes.
+        """
+        with self._datanode_clients_lock:
+            clients = list(self._datanode_clients.values())
+            self._datanode_clients.clear()
+        
+        for datanode_client in clients:
+            datanode_client.close()
+        
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+        
+        self.namenode_client.close()
+    
+    def _get_datanode_client(self, hostname: str, port: int) -> DataNodeClient:
+        """
+        Obtiene un cliente conectado al DataNode, reutilizando el canal gRPC si
+        ya existe uno abierto con ese host y puerto.
+        
+        Args:
+            hostname: Host del DataNode
+            port: Puerto del DataNode
+            
+        Returns:
+            Cliente conectado al DataNode
+        """
+        key = (hostname, int(port))
+        with self._datanode_clients_lock:
+            datanode_client = self._datanode_clients.get(key)
+            if datanode_client is None:
+                datanode_client = DataNodeClient(hostname, port, compression=self.compression).connect()
+                self._datanode_clients[key] = datanode_client
+        return datanode_client
+    
+    def _datanode_slot(self, hostname: str, port: int) -> threading.BoundedSemaphore:
+        """
+        Obtiene el semáforo que limita las transferencias simultáneas con un DataNode.
+        
+        Args:
+            hostname: Host del DataNode
+            port: Puerto del DataNode
+            
+        Returns:
+            Semáforo del DataNode (usar con 'with')
+        """
+        key = (hostname, int(port))
+        with self._datanode_clients_lock:
+            slot = self._datanode_slots.get(key)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_transfers_per_datanode)
+                self._datanode_slots[key] = slot
+        return slot
+    
+    def _env_max_workers(self) -> Optional[int]:
+        """
+        Lee el número de transferencias en paralelo de DFS_MAX_WORKERS.
+        
+        Returns:
+            Valor de la variable (al menos 1) o None si no está definida o no es válida
+        """
+        value = os.environ.get('DFS_MAX_WORKERS')
+        if not value:
+            return None
+        try:
+            return max(1, int(value))
+        except ValueError:
+            self.logger.warning(f"Valor inválido en DFS_MAX_WORKERS: {value}")
+            return None
+    
+    def _block_size_for(self, file_size: int) -> int:
+        """
+        Elige el tamaño de bloque para subir un archivo.
+        
+        Parte de block_size y lo duplica mientras el archivo tenga más de
+        target_blocks_per_file bloques, sin pasar de max_block_size y, si ya se
+        midió el enlace, solo mientras un bloque del doble de tamaño se pueda
+        subir en menos de un segundo.
+        
+        Args:
+            file_size: Tamaño del archivo en bytes
+            
+        Returns:
+            Tamaño de bloque en bytes
+        """
+        block_size = self.block_size
+        while (file_size > block_size * self.target_blocks_per_file
+               and block_size * 2 <= self.max_block_size
+               and (self._upload_throughput is None or self._upload_throughput >= 2 * block_size)):
+            block_size *= 2
+        return block_size
     
-    def put_file(self, local_path: str, dfs_path: str, max_workers: int = 4) -> bool:
+    def put_file(self, local_path: str, dfs_path: str, max_workers: Optional[int] = None) -> bool:
         """
         Sube un archivo al sistema de archivos distribuido.
         
         Args:
             local_path: Ruta local del archivo a subir
             dfs_path: Ruta destino en el DFS
-            max_workers: Número máximo de hilos para subir bloques en paralelo
+            max_workers: Número de subidas de bloques en paralelo. Si es None, se usa
+                DFS_MAX_WORKERS o se ajusta automáticamente según el rendimiento observado
             
         Returns:
             True si la operación fue exitosa, False en caso contrario
         """
         try:
-            # Verificar que el archivo local existe
-            if not os.path.exists(local_path) or not os.path.isfile(local_path):
-                print(f"Error: El archivo local {local_path} no existe o no es un archivo")
+            # Verificar que el archivo local existe (un único stat para tipo y tamaño)
+            try:
+                file_stat = os.stat(local_path)
+            except OSError:
+                file_stat = None
+            if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+                self.logger.error(f"Error: El archivo local {local_path} no existe o no es un archivo")
                 return False
             
             # Obtener el nombre del archivo
@@ -67,27 +251,34 @@ class DFSClient:
             # Verificar que el directorio padre existe
             parent_dir = os.path.dirname(dfs_path)
             if parent_dir and not self._ensure_directory_exists(parent_dir):
-                print(f"Error: No se pudo crear el directorio padre {parent_dir}")
+                self.logger.error(f"Error: No se pudo crear el directorio padre {parent_dir}")
                 return False
             
             # Obtener el tamaño del archivo para la barra de progreso
-            file_size = os.path.getsize(local_path)
-            print(f"Archivo: {file_name} ({self._format_size(file_size)})")
+            file_size = file_stat.st_size
+            self.logger.info(f"Archivo: {file_name} ({self._format_size(file_size)})")
+            
+            # Archivos de un solo bloque: registro y subida directos, sin particionar
+            if file_size <= self.block_size:
+                return self._put_small_file(local_path, dfs_path, file_size)
             
             # Dividir el archivo en bloques
-            print(f"Dividiendo el archivo en bloques...")
+            self.logger.info("Dividiendo el archivo en bloques...")
             start_time = time.time()
-            blocks = self._split_file_into_blocks(local_path)
-            print(f"Archivo dividido en {len(blocks)} bloques en {time.time() - start_time:.2f} segundos")
+            block_size = self._block_size_for(file_size)
+            if block_size != self.block_size:
+                self.logger.info(f"Usando bloques de {self._format_size(block_size)} para este archivo")
+            blocks = self._split_file_into_blocks(local_path, file_size, block_size)
+            self.logger.info(f"Archivo dividido en {len(blocks)} bloques en {time.time() - start_time:.2f} segundos")
             
             # Distribuir los bloques entre los DataNodes disponibles
-            print(f"Seleccionando DataNodes para los bloques...")
+            self.logger.info("Seleccionando DataNodes para los bloques...")
             block_distribution = self.block_distributor.distribute_blocks(blocks)
             
             # Verificar que todos los bloques tienen DataNodes asignados
             blocks_without_nodes = [b['block_id'] for b in blocks if b['block_id'] not in block_distribution]
             if blocks_without_nodes:
-                print(f"Error: {len(blocks_without_nodes)} bloques no tienen DataNodes asignados")
+                self.logger.error(f"Error: {len(blocks_without_nodes)} bloques no tienen DataNodes asignados")
                 return False
             
             # Crear el archivo en el NameNode
@@ -98,109 +289,196 @@ class DFSClient:
                 'size': file_size
             }
             
-            print(f"Registrando archivo en el NameNode...")
+            self.logger.info("Registrando archivo en el NameNode...")
             file_info = self.namenode_client.create_file(file_metadata)
             file_id = file_info.get('file_id')
             
             if not file_id:
-                print("Error: No se pudo crear el archivo en el NameNode")
+                self.logger.error("Error: No se pudo crear el archivo en el NameNode")
                 return False
             
+            for block in blocks:
+                block['file_id'] = file_id
+            
+            # Registrar todos los bloques en una sola petición, en el orden del archivo
+            # (el NameNode devuelve los bloques en el orden de registro, y la subida
+            # puede completarlos en desorden). El registro corre en segundo plano
+            # mientras empiezan las subidas; las ubicaciones esperan a que termine.
+            registration_executor = ThreadPoolExecutor(max_workers=1)
+            registration = registration_executor.submit(
+                self.namenode_client.register_blocks_bulk, file_id, blocks)
+            registration_executor.shutdown(wait=False)
+            self._block_registrations[file_id] = registration
+            
             # Subir bloques en paralelo con barra de progreso
-            print(f"Subiendo bloques a los DataNodes...")
+            self.logger.info("Subiendo bloques a los DataNodes...")
             
             # Inicializar variables para la barra de progreso
             uploaded_blocks = 0
-            total_blocks = len(blocks)
-            progress_bar_width = 50
             
-            # Función para subir un bloque a un DataNode con reintentos
-            def upload_block_to_datanode(block, node_info, is_leader=False, max_retries=2):
-                failed_nodes = []
-                for attempt in range(max_retries):
+            # Pipeline de dos etapas conectadas por una cola acotada: la lectura del
+            # disco (con el cálculo de checksums) y la subida por red se solapan en
+            # lugar de ejecutarse una tras otra. La cola acotada limita los bloques en memoria.
+            num_readers = 2
+            pending_q = queue.Queue()
+            hash_q = queue.Queue(maxsize=8)
+            results_q = queue.Queue()
+            readers_lock = threading.Lock()
+            active_readers = [num_readers]
+            # Límite de subidas simultáneas: fijo si se indicó max_workers; si no,
+            # empieza con dos por DataNode y se ajusta según los bloques por segundo
+            max_workers = max_workers or self.default_max_workers
+            if max_workers is None:
+                num_datanodes = len({node['node_id'] for nodes in block_distribution.values() for node in nodes})
+                limiter = AdaptiveConcurrency(min(num_datanodes * 2, 8), min(32, len(blocks)))
+            else:
+                limiter = AdaptiveConcurrency(max_workers, max_workers)
+            num_uploaders = limiter.maximum
+            
+            # Buffers reutilizables: se devuelven al pool cuando el bloque se subió.
+            # Su número también está limitado por upload_buffer_budget
+            buffer_size = min(block_size, file_size)
+            buffer_pool = BufferPool(buffer_size, max(2, min(2 * num_uploaders, self.upload_buffer_budget // buffer_size)))
+            
+            def read_blocks(fd):
+                # Etapa 1: leer cada bloque con pread (sin compartir la posición del
+                # descriptor) calculando su checksum a medida que se lee
+                try:
+                    while True:
+                        block = pending_q.get()
+                        if block is None:
+                            break
+                        
+                        buffer = data = checksum = None
+                        try:
+                            # Adelantar la lectura de los bloques que vienen detrás
+                            self._prefetch_range(fd, block['offset'] + block['size'], num_readers * block_size)
+                            buffer = buffer_pool.acquire()
+                            data = memoryview(buffer)[:block['size']]
+                            checksum = self._read_block_with_checksum(fd, data, block['offset'])
+                            self._drop_cached_range(fd, block['offset'], block['size'])
+                        except Exception as e:
+                            # El bloque sigue adelante sin datos: la etapa de subida
+                            # lo cuenta como fallido en todas sus réplicas
+                            self.logger.error(f"Error al leer el bloque {block['block_id']}: {str(e)}")
+                            if buffer is not None:
+                                buffer_pool.release(buffer)
+                            buffer = data = checksum = None
+                        hash_q.put((block, buffer, data, checksum))
+                finally:
+                    # El último lector en terminar avisa a todos los uploaders
+                    with readers_lock:
+                        active_readers[0] -= 1
+                        if active_readers[0] == 0:
+                            for _ in range(num_uploaders):
+                                hash_q.put(None)
+            
+            def upload_blocks():
+                # Etapa 2: subir cada bloque a sus réplicas
+                while True:
+                    item = hash_q.get()
+                    if item is None:
+                        return
+                    
+                    block, buffer, data, checksum = item
+                    # Cada bloque se sube una sola vez: su entrada ya no hace falta
+                    nodes = block_distribution.pop(block['block_id'])
+                    results = None
                     try:
-                        with DataNodeClient(node_info['hostname'], node_info['port']) as datanode:
-                            # Asegurarse de que el bloque tenga el file_id
-                            block['file_id'] = file_id
-                            block['checksum'] = ''  # Se calculará en _upload_block
-                            
-                            success = self._upload_block(local_path, block, [node_info], is_leader)
-                            
-                            if success:
-                                return True, block['block_id'], node_info['node_id']
-                            
-                            failed_nodes.append(node_info['node_id'])
-                            
-                            # Si falló y hay más intentos, intentar con un DataNode alternativo
-                            if attempt < max_retries - 1:
-                                alternative_nodes = self.block_distributor.get_alternative_datanodes(
-                                    block['size'], 
-                                    failed_nodes
-                                )
-                                if alternative_nodes:
-                                    node_info = alternative_nodes[0]
-                                    continue
+                        limiter.acquire()
+                        try:
+                            if data is None:
+                                raise IOError("el bloque no se pudo leer")
+                            # El bloque se sube una vez al líder, que lo replica en el resto
+                            results = self._upload_block_replicated(block, data, checksum, nodes)
+                        finally:
+                            limiter.release()
                     except Exception as e:
-                        print(f"\nError al subir bloque {block['block_id']}: {str(e)}")
-                        failed_nodes.append(node_info['node_id'])
-                        if attempt < max_retries - 1:
-                            alternative_nodes = self.block_distributor.get_alternative_datanodes(
-                                block['size'], 
-                                failed_nodes
-                            )
-                            if alternative_nodes:
-                                node_info = alternative_nodes[0]
-                                continue
-                
-                return False, block['block_id'], node_info['node_id']
+                        self.logger.error(f"Error al subir bloque {block['block_id']}: {str(e)}")
+                    finally:
+                        # Publicar siempre un resultado por réplica: put_file espera
+                        # exactamente total_uploads resultados
+                        if results is None:
+                            results = [(False, block['block_id'], node_info['node_id']) for node_info in nodes]
+                        for result in results:
+                            results_q.put(result)
+                        
+                        # Todas las réplicas terminaron: el buffer puede reutilizarse
+                        if buffer is not None:
+                            buffer_pool.release(buffer)
+                    # Soltar también las referencias al bloque mientras se espera el siguiente
+                    item = block = buffer = data = results = None
             
-            # Lista de tareas para subir bloques
-            upload_tasks = []
-            for block in blocks:
-                block_id = block['block_id']
-                # Para cada bloque, marcar el primer DataNode como líder
-                for i, node_info in enumerate(block_distribution[block_id]):
-                    is_leader = (i == 0)  # El primer DataNode es el líder
-                    upload_tasks.append((block, node_info, is_leader))
+            # Número total de subidas (bloque x réplica) para la barra de progreso
+            total_uploads = sum(len(block_distribution[b['block_id']]) for b in blocks)
             
-            # Subir bloques en paralelo
             successful_uploads = 0
             failed_uploads = 0
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(upload_block_to_datanode, block, node_info, is_leader) 
-                          for block, node_info, is_leader in upload_tasks]
+            upload_start = time.monotonic()
+            fd = self._open_for_upload(local_path)
+            try:
+                for block in blocks:
+                    pending_q.put(block)
+                for _ in range(num_readers):
+                    pending_q.put(None)
+                readers = [threading.Thread(target=read_blocks, args=(fd,), daemon=True) for _ in range(num_readers)]
+                for reader in readers:
+                    reader.start()
                 
-                for future in as_completed(futures):
-                    success, block_id, node_id = future.result()
+                with ThreadPoolExecutor(max_workers=num_uploaders) as executor:
+                    for _ in range(num_uploaders):
+                        executor.submit(upload_blocks)
                     
-                    if success:
-                        successful_uploads += 1
-                    else:
-                        failed_uploads += 1
-                        print(f"\nError al subir el bloque {block_id} al DataNode {node_id}")
-                    
-                    # Actualizar la barra de progreso
-                    uploaded_blocks += 1
-                    progress = uploaded_blocks / len(upload_tasks)
-                    filled_length = int(progress_bar_width * progress)
-                    bar = '█' * filled_length + '-' * (progress_bar_width - filled_length)
-                    percentage = progress * 100
-                    
-                    sys.stdout.write(f"\r[{bar}] {percentage:.1f}% ({uploaded_blocks}/{len(upload_tasks)})")
-                    sys.stdout.flush()
+                    progress_bar = ProgressBar(total_uploads)
+                    for _ in range(total_uploads):
+                        success, block_id, node_id = results_q.get()
+                        
+                        if success:
+                            successful_uploads += 1
+                        else:
+                            failed_uploads += 1
+                            self.logger.error(f"Error al subir el bloque {block_id} al DataNode {node_id}")
+                        
+                        # Actualizar la barra de progreso
+                        uploaded_blocks += 1
+                        progress_bar.update(uploaded_blocks)
+                    progress_bar.close()
+                
+                for reader in readers:
+                    reader.join()
+            finally:
+                os.close(fd)
+            
+            # Rendimiento medido, para elegir el tamaño de bloque de la próxima subida
+            if not failed_uploads:
+                self._upload_throughput = file_size / max(time.monotonic() - upload_start, 1e-6)
             
-            print("\n")
+            # Comprobar el registro de los bloques lanzado antes de las subidas
+            try:
+                registration.result()
+            except Exception as e:
+                self.logger.error(f"Error registrando los bloques en el NameNode: {e}")
+                self._discard_block_locations(file_id)
+                return False
+            
+            # Enviar las ubicaciones que quedan pendientes de este archivo
+            flushed = self._flush_block_locations(file_id)
+            self._block_registrations.pop(file_id, None)
+            if not flushed:
+                self.logger.error("Error: No se pudieron registrar las ubicaciones de los bloques en el NameNode")
+                self._discard_block_locations(file_id)
+                return False
             
             if failed_uploads > 0:
-                print(f"Advertencia: {failed_uploads} bloques no se pudieron subir correctamente")
-                print("El archivo podría no estar completo en el DFS")
+                self.logger.warning(f"Advertencia: {failed_uploads} bloques no se pudieron subir correctamente")
+                self.logger.warning("El archivo podría no estar completo en el DFS")
                 return False
             
             return True
             
         except Exception as e:
-            print(f"Error al subir el archivo: {str(e)}")
+            self.logger.error(f"Error al subir el archivo: {str(e)}")
             return False
             
     def _format_size(self, size_bytes: int) -> str:
@@ -213,16 +491,13 @@ class DFSClient:
         Returns:
             Tamaño formateado como una cadena legible
         """
-        if size_bytes < 1024:
+        # Cada unidad son 10 bits más: la unidad sale de la longitud en bits
+        unit = min(3, max(0, (size_bytes.bit_length() - 1) // 10))
+        if unit == 0:
             return f"{size_bytes} bytes"
-        elif size_bytes < 1024 * 1024:
-            return f"{size_bytes / 1024:.2f} KB"
-        elif size_bytes < 1024 * 1024 * 1024:
-            return f"{size_bytes / (1024 * 1024):.2f} MB"
-        else:
-            return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
+        return f"{size_bytes / (1 << (10 * unit)):.2f} {('KB', 'MB', 'GB')[unit - 1]}"
     
-    def get_file(self, dfs_path: str, local_path: str, max_workers: int = 4, max_retries: int = 3) -> bool:
+    def get_file(self, dfs_path: str, local_path: str, max_workers: Optional[int] = None, max_retries: int = 3) -> bool:
         """
         Descarga un archivo del sistema de archivos distribuido.
         
@@ -230,141 +505,304 @@ class DFSClient:
             dfs_path: Ruta del archivo en el DFS
             local_path: Ruta local donde se guardará el archivo
             max_workers: Número máximo de hilos para descargar bloques en paralelo
+                (si no se indica, DFS_MAX_WORKERS o 4 por cada DataNode con réplicas del
+                archivo, hasta 32), limitado por download_buffer_budget
             max_retries: Número máximo de reintentos para bloques fallidos
             
         Returns:
             True si la operación fue exitosa, False en caso contrario
         """
         try:
-            # Obtener información del archivo
-            file_info = self.namenode_client.get_file_info(dfs_path)
+            # Obtener información del archivo, con la dirección de cada DataNode una sola vez
+            file_info = self._resolve_compact_locations(
+                self.namenode_client.get_file_info(dfs_path, compact_locations=True))
             if not file_info:
-                print(f"Error: El archivo {dfs_path} no existe en el DFS")
+                self.logger.error(f"Error: El archivo {dfs_path} no existe en el DFS")
                 return False
             
             # Verificar que es un archivo y no un directorio
             if file_info.get('type') != 'file':
-                print(f"Error: {dfs_path} no es un archivo")
+                self.logger.error(f"Error: {dfs_path} no es un archivo")
                 return False
             
             # Obtener los bloques del archivo
             blocks = file_info.get('blocks', [])
             
             if not blocks:
-                print("Error: No se encontraron bloques para el archivo")
+                # Un archivo vacío no tiene bloques
+                if file_info.get('size', 0) == 0:
+                    os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+                    open(local_path, 'wb').close()
+                    self.logger.info(f"Archivo descargado exitosamente en {local_path}")
+                    return True
+                
+                self.logger.error("Error: No se encontraron bloques para el archivo")
                 return False
             
-            print(f"Archivo encontrado: {file_info.get('name')} ({len(blocks)} bloques)")
+            self.logger.info(f"Archivo encontrado: {file_info.get('name')} ({len(blocks)} bloques)")
             
             # Crear el directorio local si no existe
             os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
             
+            max_workers = max_workers or self.default_max_workers
+            if max_workers is None:
+                num_datanodes = len({location.get('datanode_id') for block in blocks
+                                     for location in block.get('locations', [])})
+                max_workers = min(32, max(4, 4 * num_datanodes), len(blocks))
+            max_workers = self._download_concurrency(max_workers, blocks)
+            buffer_size = max(block.get('size', 0) for block in blocks) or self.block_size
+            
             # Descargar bloques en paralelo
-            print(f"Descargando {len(blocks)} bloques...")
+            self.logger.info(f"Descargando {len(blocks)} bloques...")
             downloaded_blocks = 0
-            progress_bar_width = 50
+            progress_bar = ProgressBar(len(blocks))
+            
+            # Posición de cada bloque en el archivo final: cada bloque descargado se
+            # escribe directamente en su sitio, sin esperar a tener el archivo completo
+            block_offsets = {}
+            file_size = 0
+            for block in blocks:
+                block_offsets[block.get('block_id')] = file_size
+                file_size += block.get('size', 0)
             
             # Descargar bloques en paralelo
-            block_data_map = {}
+            downloaded_ids = set()
             failed_blocks = []
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(self.download_block, block) for block in blocks]
+            # Resolver de una vez los DataNodes cuyas ubicaciones no traen dirección,
+            # en lugar de consultar el NameNode por cada ubicación de cada bloque
+            unresolved_ids = {location['datanode_id'] for block in blocks for location in block.get('locations', [])
+                              if location.get('datanode_id') and not (location.get('hostname') and location.get('port'))}
+            datanode_map = self._get_datanode_map(unresolved_ids) if unresolved_ids else {}
+            
+            # Reservar el archivo de salida con su tamaño final; los bloques que no
+            # lleguen a descargarse quedan rellenos con ceros
+            fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                try:
+                    if file_size > 0:
+                        os.posix_fallocate(fd, 0, file_size)
+                except (AttributeError, OSError):
+                    os.ftruncate(fd, file_size)
                 
-                for future in as_completed(futures):
-                    success, block_id, data = future.result()
-                    
-                    if success and data:
-                        block_data_map[block_id] = data
-                    else:
-                        failed_blocks.append((block_id, next((block for block in blocks if block.get('block_id') == block_id), None)))
+                def download_and_write(block, block_info=None):
+                    # Cada hilo recibe sus bloques sobre un mismo buffer: el bloque se
+                    # escribe antes de descargar el siguiente
+                    buf = getattr(self._thread_buffers, 'buf', None)
+                    if buf is None or len(buf) < block.get('size', 0):
+                        buf = self._thread_buffers.buf = bytearray(max(block.get('size', 0), buffer_size))
                     
-                    # Actualizar la barra de progreso
-                    downloaded_blocks += 1
-                    progress = downloaded_blocks / len(blocks)
-                    filled_length = int(progress_bar_width * progress)
-                    bar = '█' * filled_length + '-' * (progress_bar_width - filled_length)
-                    percentage = progress * 100
+                    # Descargar el bloque y escribirlo en su posición (pwrite es seguro entre hilos)
+                    success, block_id, data = self.download_block(block_info or block, datanode_map, buf)
+                    if not (success and data):
+                        return False, block_id
                     
-                    sys.stdout.write(f"\r[{bar}] {percentage:.1f}% ({downloaded_blocks}/{len(blocks)})")
-                    sys.stdout.flush()
-            
-            print("\n")
-            
-            # Reintentar bloques fallidos
-            if failed_blocks and max_retries > 0:
-                print(f"Reintentando descargar {len(failed_blocks)} bloques fallidos...")
-                for retry in range(max_retries):
-                    still_failed = []
+                    self._pwrite_all(fd, data, block_offsets[block_id])
+                    return True, block_id
+                
+                def retry_and_write(block):
+                    # Consultar ubicaciones actualizadas antes de volver a intentarlo
+                    block_id = block.get('block_id')
+                    try:
+                        updated_block = self.namenode_client.get_block_info(block_id)
+                        if not (updated_block and updated_block.get('locations')):
+                            return False, block_id
+                        return download_and_write(block, updated_block)
+                    except Exception as e:
+                        self.logger.error(f"Error al reintentar bloque {block_id}: {e}")
+                        return False, block_id
+                
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # Ventana deslizante: como mucho window descargas pendientes a la vez,
+                    # en lugar de crear de golpe un futuro por cada bloque del archivo
+                    window = max_workers * 2
                     
-                    for block_id, block in failed_blocks:
-                        # Actualizar información del bloque para obtener ubicaciones actualizadas
-                        try:
-                            updated_block = self.namenode_client.get_block_info(block_id)
-                            if updated_block and 'locations' in updated_block and updated_block['locations']:
-                                # Usar la información actualizada del bloque
-                                success, _, data = self.download_block(updated_block)
-                                if success and data:
-                                    block_data_map[block_id] = data
-                                    print(f"Bloque {block_id} descargado exitosamente en el reintento {retry+1}")
-                                    continue
+                    def run_window(pending_blocks, fetch, retry=None):
+                        nonlocal downloaded_blocks
+                        pending_blocks = iter(pending_blocks)
+                        failed = []
+                        # Cada futuro conoce su bloque: sin búsquedas lineales al fallar
+                        futures = {executor.submit(fetch, block): block
+                                   for block in islice(pending_blocks, window)}
+                        
+                        while futures:
+                            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                block = futures.pop(future)
+                                success, block_id = future.result()
+                                
+                                if success:
+                                    downloaded_ids.add(block_id)
+                                    if retry is not None:
+                                        self.logger.info(f"Bloque {block_id} descargado exitosamente en el reintento {retry+1}")
+                                else:
+                                    failed.append((block_id, block))
+                                
+                                if retry is None:
+                                    # Actualizar la barra de progreso
+                                    downloaded_blocks += 1
+                                    progress_bar.update(downloaded_blocks)
                             
-                            still_failed.append((block_id, block))
-                        except Exception as e:
-                            print(f"Error al reintentar bloque {block_id}: {e}")
-                            still_failed.append((block_id, block))
-                    
-                    # Actualizar la lista de bloques fallidos
-                    failed_blocks = still_failed
+                            for block in islice(pending_blocks, len(done)):
+                                futures[executor.submit(fetch, block)] = block
+                        return failed
                     
-                    if not failed_blocks:
-                        break
+                    failed_blocks = run_window(blocks, download_and_write)
+                    progress_bar.close()
                     
-                    if retry < max_retries - 1:
-                        print(f"Reintentando {len(failed_blocks)} bloques aún fallidos (intento {retry+2}/{max_retries})...")
-                        time.sleep(1)  # Pequeña pausa antes del siguiente reintento
+                    # Reintentar los bloques fallidos en paralelo, con espera
+                    # exponencial y aleatoria entre rondas
+                    for retry in range(max_retries):
+                        if not failed_blocks:
+                            break
+                        if retry == 0:
+                            self.logger.info(f"Reintentando descargar {len(failed_blocks)} bloques fallidos...")
+                        else:
+                            self.logger.info(f"Reintentando {len(failed_blocks)} bloques aún fallidos (intento {retry+1}/{max_retries})...")
+                        self.round_retry_policy.sleep(retry)
+                        failed_blocks = run_window([block for _, block in failed_blocks], retry_and_write, retry)
+            finally:
+                os.close(fd)
             
             # Verificar si todavía hay bloques fallidos
             if failed_blocks:
                 failed_block_ids = [block_id for block_id, _ in failed_blocks if block_id]
-                print(f"Error: No se pudieron descargar {len(failed_blocks)} bloques")
-                print("Bloques fallidos:", failed_block_ids)
+                self.logger.error(f"Error: No se pudieron descargar {len(failed_blocks)} bloques")
+                self.logger.error(f"Bloques fallidos: {failed_block_ids}")
                 
                 # Verificar si tenemos suficientes bloques para continuar
-                if len(block_data_map) / len(blocks) >= 0.9:  # Si tenemos al menos 90% de los bloques
-                    print("Advertencia: Algunos bloques no pudieron ser recuperados, pero intentaremos reconstruir el archivo con los bloques disponibles.")
+                if len(downloaded_ids) / len(blocks) >= 0.9:  # Si tenemos al menos 90% de los bloques
+                    self.logger.warning("Advertencia: Algunos bloques no pudieron ser recuperados, pero intentaremos reconstruir el archivo con los bloques disponibles.")
+                    for block_id in failed_block_ids:
+                        self.logger.warning(f"Advertencia: Bloque {block_id} no disponible, se reemplazará con datos vacíos")
                 else:
+                    # No conservar un archivo parcial
+                    os.remove(local_path)
                     return False
             
-            # Escribir los bloques en orden al archivo local
-            print("Escribiendo bloques al archivo local...")
-            with open(local_path, 'wb') as f:
-                for block in blocks:
-                    block_id = block.get('block_id')
-                    if block_id in block_data_map:
-                        f.write(block_data_map[block_id])
-                    else:
-                        print(f"Advertencia: Bloque {block_id} no disponible, se reemplazará con datos vacíos")
-                        # Reemplazar con datos vacíos del tamaño aproximado del bloque
-                        if 'size' in block:
-                            f.write(b'\0' * block.get('size', 0))
-            
-            print(f"Archivo descargado exitosamente en {local_path}")
+            self.logger.info(f"Archivo descargado exitosamente en {local_path}")
             if failed_blocks:
-                print("Advertencia: El archivo puede estar incompleto o corrupto debido a bloques faltantes.")
+                self.logger.warning("Advertencia: El archivo puede estar incompleto o corrupto debido a bloques faltantes.")
                 return False
             return True
             
         except Exception as e:
-            print(f"Error al descargar el archivo: {e}")
+            self.logger.error(f"Error al descargar el archivo: {e}")
             return False
     
-    def delete_directory_recursive(self, dfs_path: str) -> bool:
+    # Tamaño a partir del cual un bloque leído se descarta de la caché de páginas
+    DROP_CACHE_MIN_SIZE = 1024 * 1024
+    
+    @staticmethod
+    def _open_for_upload(local_path: str) -> int:
+        """
+        Abre un archivo local para subirlo, indicando al kernel que se leerá
+        de forma secuencial (lectura anticipada más agresiva).
+        
+        Args:
+            local_path: Ruta del archivo
+            
+        Returns:
+            Descriptor del archivo abierto en solo lectura
+        """
+        fd = os.open(local_path, os.O_RDONLY)
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        return fd
+    
+    @staticmethod
+    def _prefetch_range(fd: int, offset: int, size: int):
+        """
+        Pide al kernel que empiece a leer en segundo plano el siguiente tramo
+        del archivo, para que esté en la caché de páginas cuando se pida.
+        
+        Args:
+            fd: Descriptor del archivo
+            offset: Posición del tramo
+            size: Tamaño del tramo
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            os.posix_fadvise(fd, offset, size, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+    
+    @classmethod
+    def _drop_cached_range(cls, fd: int, offset: int, size: int):
+        """
+        Pide al kernel que descarte de la caché de páginas un bloque ya leído:
+        el archivo se lee una sola vez para subirlo, y mantenerlo en caché
+        desplaza datos que sí se van a reutilizar. Solo para bloques grandes.
+        
+        Args:
+            fd: Descriptor del archivo
+            offset: Posición del bloque
+            size: Tamaño del bloque
+        """
+        if size < cls.DROP_CACHE_MIN_SIZE or not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            os.posix_fadvise(fd, offset, size, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+    
+    # Fragmentos en que se lee un bloque: cada uno se suma al checksum justo
+    # después de leerlo, mientras sigue en la caché del procesador
+    READ_CHECKSUM_CHUNK_SIZE = 256 * 1024
+    
+    @classmethod
+    def _read_block_with_checksum(cls, fd: int, data: memoryview, offset: int) -> str:
+        """
+        Lee un bloque del archivo sobre un buffer calculando su checksum a la
+        vez, en lugar de recorrer el bloque una segunda vez después de leerlo.
+        
+        Args:
+            fd: Descriptor del archivo
+            data: Vista del buffer, del tamaño del bloque
+            offset: Posición del bloque en el archivo
+            
+        Returns:
+            Checksum del bloque (ver src.common.checksum)
+        """
+        checksum = BlockChecksum()
+        for start in range(0, len(data), cls.READ_CHECKSUM_CHUNK_SIZE):
+            chunk = data[start:start + cls.READ_CHECKSUM_CHUNK_SIZE]
+            if os.preadv(fd, [chunk], offset + start) != len(chunk):
+                raise IOError(f"Lectura incompleta en la posición {offset + start}")
+            checksum.update(chunk)
+        return checksum.hexdigest()
+    
+    @staticmethod
+    def _pwrite_all(fd: int, data, offset: int):
+        """
+        Escribe todos los datos en la posición indicada, repitiendo pwrite si
+        el sistema escribe solo una parte.
+        
+        Args:
+            fd: Descriptor del archivo de salida
+            data: Datos a escribir (bytes o memoryview)
+            offset: Posición del archivo donde empieza la escritura
+        """
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    
+    def delete_directory_recursive(self, dfs_path: str, max_workers: int = 8) -> bool:
         """
         Elimina un directorio y todo su contenido recursivamente.
         
+        El NameNode borra el árbol completo en una sola petición; si no puede,
+        el cliente lo recorre nivel a nivel, borrando en paralelo.
+        
         Args:
             dfs_path: Ruta del directorio en el DFS a eliminar
+            max_workers: Número máximo de peticiones simultáneas al recorrer el árbol
             
         Returns:
             True si la operación fue exitosa, False en caso contrario
@@ -373,37 +811,78 @@ class DFSClient:
             # Verificar que el directorio existe
             dir_info = self.namenode_client.list_directory(dfs_path)
             if not dir_info:
-                print(f"Error: El directorio {dfs_path} no existe")
+                self.logger.error(f"Error: El directorio {dfs_path} no existe")
                 return False
             
-            # Obtener el contenido del directorio
-            contents = dir_info.get('contents', [])
-            
-            # Eliminar recursivamente todos los archivos y subdirectorios
-            for item in contents:
-                item_path = f"{dfs_path}/{item['name']}" if dfs_path.endswith('/') else f"{dfs_path}/{item['name']}"
-                if item['type'] == 'directory':
-                    # Eliminar subdirectorio recursivamente
-                    if not self.delete_directory_recursive(item_path):
-                        return False
-                else:
-                    # Eliminar archivo
-                    if not self.delete_file(item_path, silent=True):
-                        return False
-            
-            # Finalmente, eliminar el directorio vacío
             try:
-                self.namenode_client.delete_directory(dfs_path)
-                print(f"Directorio {dfs_path} eliminado exitosamente")
+                self.namenode_client.delete_directory(dfs_path, recursive=True)
+                self.forget_directory(dfs_path)
+                self.logger.info(f"Directorio {dfs_path} eliminado exitosamente")
                 return True
             except Exception as e:
-                print(f"Error al eliminar el directorio {dfs_path}: {e}")
-                return False
+                self.logger.debug(f"Borrado recursivo en el NameNode no disponible para {dfs_path}: {e}")
+            
+            return self._delete_directory_tree(dfs_path, dir_info, max_workers)
             
         except Exception as e:
-            print(f"Error al eliminar el directorio recursivamente: {e}")
+            self.logger.error(f"Error al eliminar el directorio recursivamente: {e}")
             return False
     
+    def _delete_directory_tree(self, dfs_path: str, dir_info: Dict, max_workers: int) -> bool:
+        """
+        Elimina un árbol de directorios desde el cliente. Se recorre por niveles
+        con una pila explícita (sin recursión); en cada nivel se listan los
+        subdirectorios y se borran los archivos en paralelo, y al final se
+        borran los directorios vacíos del más profundo al más superficial.
+        
+        Args:
+            dfs_path: Ruta del directorio raíz del árbol
+            dir_info: Listado ya obtenido del directorio raíz
+            max_workers: Número máximo de peticiones simultáneas
+            
+        Returns:
+            True si se eliminó todo el árbol, False en caso contrario
+        """
+        def join(parent, name):
+            return f"{parent.rstrip('/')}/{name}"
+        
+        def delete_file(item):
+            if item.get('file_id'):
+                self.namenode_client.delete_file(item['file_id'])
+                return True
+            return self.delete_file(item['path'], silent=True)
+        
+        directories = [dfs_path]
+        level = [(dfs_path, dir_info)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while level:
+                files = []
+                subdirs = []
+                for path, listing in level:
+                    for item in listing.get('contents', []):
+                        item = dict(item, path=item.get('path') or join(path, item['name']))
+                        (subdirs if item['type'] == 'directory' else files).append(item)
+                
+                if not all(executor.map(delete_file, files)):
+                    return False
+                
+                subdir_paths = [item['path'] for item in subdirs]
+                listings = list(executor.map(self.namenode_client.list_directory, subdir_paths))
+                directories.extend(subdir_paths)
+                level = list(zip(subdir_paths, listings))
+        
+        # Borrar los directorios, ya vacíos, empezando por los más profundos
+        for path in reversed(directories):
+            try:
+                self.namenode_client.delete_directory(path)
+            except Exception as e:
+                self.logger.error(f"Error al eliminar el directorio {path}: {e}")
+                return False
+        
+        self.forget_directory(dfs_path)
+        self.logger.info(f"Directorio {dfs_path} eliminado exitosamente")
+        return True
+    
     def delete_file(self, dfs_path: str, silent: bool = False) -> bool:
         """
         Elimina un archivo del sistema de archivos distribuido.
@@ -420,13 +899,13 @@ class DFSClient:
             file_info = self.namenode_client.get_file_by_path(dfs_path)
             if not file_info:
                 if not silent:
-                    print(f"Error: El archivo {dfs_path} no existe")
+                    self.logger.error(f"Error: El archivo {dfs_path} no existe")
                 return False
             
             # Verificar que es un archivo y no un directorio
             if file_info.get('type') == 'directory':
                 if not silent:
-                    print(f"Error: {dfs_path} es un directorio, use rmdir para eliminarlo")
+                    self.logger.error(f"Error: {dfs_path} es un directorio, use rmdir para eliminarlo")
                 return False
             
             # Obtener el ID del archivo
@@ -434,17 +913,29 @@ class DFSClient:
             
             # Eliminar el archivo del NameNode
             if not silent:
-                print(f"Eliminando archivo {dfs_path}...")
+                self.logger.info(f"Eliminando archivo {dfs_path}...")
             self.namenode_client.delete_file(file_id)
             
             if not silent:
-                print(f"Archivo {dfs_path} eliminado exitosamente")
+                self.logger.info(f"Archivo {dfs_path} eliminado exitosamente")
             return True
             
         except Exception as e:
-            print(f"Error al eliminar el archivo: {e}")
+            self.logger.error(f"Error al eliminar el archivo: {e}")
             return False
     
+    def forget_directory(self, directory_path: str):
+        """
+        Descarta de la caché de directorios conocidos una ruta y sus subdirectorios.
+        Debe llamarse cuando se elimina un directorio del DFS.
+        
+        Args:
+            directory_path: Ruta del directorio eliminado
+        """
+        prefix = '/' + directory_path.strip('/')
+        self._known_dirs = {d for d in self._known_dirs
+                            if d != prefix and not d.startswith(prefix.rstrip('/') + '/')}
+
     def _ensure_directory_exists(self, directory_path: str) -> bool:
         """
         Asegura que un directorio existe en el DFS, creándolo si es necesario.
@@ -456,89 +947,85 @@ class DFSClient:
             True si el directorio existe o se creó correctamente, False en caso contrario
         """
         try:
-            # Verificar si el directorio ya existe
-            dir_info = self.namenode_client.list_directory(directory_path)
-            if dir_info:
+            parts = [part for part in directory_path.strip('/').split('/') if part]
+            prefixes = ['/' + '/'.join(parts[:i + 1]) for i in range(len(parts))]
+            
+            # Directorios ya confirmados en operaciones anteriores
+            if all(prefix in self._known_dirs for prefix in prefixes):
                 return True
             
-            # Si no existe, crear el directorio y sus padres recursivamente
-            parts = directory_path.strip('/').split('/')
-            current_path = ""
+            # Crear el directorio y sus padres en una sola petición (mkdir -p)
+            if prefixes:
+                try:
+                    self.namenode_client.create_directory({
+                        'name': os.path.basename(prefixes[-1]),
+                        'path': prefixes[-1],
+                        'type': 'directory'
+                    }, parents=True)
+                    self._known_dirs.update(prefixes)
+                    return True
+                except Exception as e:
+                    self.logger.debug(f"Creación con padres no disponible para {directory_path}: {e}")
             
-            for part in parts:
-                if not part:
-                    continue
-                
-                current_path = f"{current_path}/{part}" if current_path else part
+            # NameNode sin soporte para 'parents': consultar todos los prefijos en una sola petición
+            try:
+                existing = set(self.namenode_client.list_directories_bulk(prefixes))
+            except Exception:
+                # NameNode sin el endpoint masivo: comprobar todos los prefijos a
+                # la vez; el más profundo que exista implica que existen sus padres
+                def probe(prefix):
+                    try:
+                        return bool(self.namenode_client.list_directory(prefix))
+                    except Exception:
+                        return False
                 
-                try:
-                    # Verificar si este nivel del directorio ya existe
-                    dir_info = self.namenode_client.list_directory(current_path)
-                    if not dir_info:
-                        # Crear el directorio
-                        self.namenode_client.create_directory({
-                            'name': part,
-                            'path': current_path,
-                            'type': 'directory'
-                        })
-                except Exception:
-                    # Crear el directorio
+                with ThreadPoolExecutor(max_workers=min(8, len(prefixes) or 1)) as executor:
+                    found = list(executor.map(probe, prefixes))
+                deepest = max((i + 1 for i, hit in enumerate(found) if hit), default=0)
+                existing = set(prefixes[:deepest])
+            
+            # Crear solo los que faltan, de padre a hijo
+            for prefix in prefixes:
+                if prefix not in existing:
                     self.namenode_client.create_directory({
-                        'name': part,
-                        'path': current_path,
+                        'name': os.path.basename(prefix),
+                        'path': prefix,
                         'type': 'directory'
                     })
+                self._known_dirs.add(prefix)
             
             return True
         except Exception as e:
-            print(f"Error al crear el directorio {directory_path}: {e}")
+            self.logger.error(f"Error al crear el directorio {directory_path}: {e}")
             return False
 
-    def _split_file_into_blocks(self, file_path: str) -> List[Dict]:
+    def _split_file_into_blocks(self, file_path: str, file_size: Optional[int] = None,
+                                block_size: Optional[int] = None) -> List[Dict]:
         """
-        Divide un archivo en bloques.
+        Divide un archivo en bloques descritos por su desplazamiento y tamaño,
+        sin leer su contenido.
         
         Args:
             file_path: Ruta al archivo a dividir
+            file_size: Tamaño del archivo, si ya se conoce (evita otro stat)
+            block_size: Tamaño de bloque (block_size del cliente por defecto)
             
         Returns:
             Lista de diccionarios con información de los bloques
         """
-        blocks = []
-        file_size = os.path.getsize(file_path)
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
         
-        # Si el archivo es más pequeño que el tamaño de bloque, crear un solo bloque
-        if file_size <= self.block_size:
-            blocks.append({
-                'offset': 0,
-                'size': file_size,
-                'block_id': str(uuid.uuid4())
-            })
-            return blocks
-        
-        # Dividir el archivo en bloques
-        offset = 0
-        while offset < file_size:
-            remaining = file_size - offset
-            block_size = min(remaining, self.block_size)
-            
-            blocks.append({
-                'offset': offset,
-                'size': block_size,
-                'block_id': str(uuid.uuid4())
-            })
-            
-            offset += block_size
-        
-        return blocks
+        return self.file_splitter.describe_blocks(file_size, block_size)
 
-    def _upload_block(self, file_path: str, block: Dict, datanodes: List[Dict], is_leader: bool = False) -> bool:
+    def _upload_block(self, block: Dict, data: bytes, checksum: str, datanodes: List[Dict], is_leader: bool = False) -> bool:
         """
         Sube un bloque a los DataNodes usando gRPC.
         
         Args:
-            file_path: Ruta al archivo
             block: Información del bloque
+            data: Contenido del bloque (bytes o memoryview)
+            checksum: Checksum del contenido del bloque
             datanodes: Lista de DataNodes donde subir el bloque
             is_leader: Si es True, el DataNode es el líder
             
@@ -546,47 +1033,22 @@ class DFSClient:
             True si la subida fue exitosa
         """
         try:
-            # Leer el contenido del bloque
-            with open(file_path, 'rb') as f:
-                f.seek(block['offset'])
-                data = f.read(block['size'])
-            
-            # Calcular checksum
-            checksum = hashlib.md5(data).hexdigest()
-            
-            # Primero, crear el bloque en el NameNode
-            try:
-                # Preparar la información del bloque para el NameNode
-                block_info = {
-                    'block_id': block['block_id'],
-                    'file_id': block.get('file_id', ''),  # Asegurarse de que file_id esté disponible
-                    'size': block['size'],
-                    'checksum': checksum,
-                    'locations': []
-                }
-                
-                # Registrar el bloque en el NameNode
-                self.namenode_client._make_request('post', '/blocks/', block_info)
-            except Exception as e:
-                self.logger.error(f"Error registrando bloque en NameNode: {e}")
-                # Continuamos con el intento de subida, ya que el error podría ser que el bloque ya existe
+            # El bloque ya está registrado en el NameNode; el checksum se envía
+            # junto con sus ubicaciones
+            block['checksum'] = checksum
             
             # Subir el bloque a cada DataNode usando gRPC
             for datanode in datanodes:
                 try:
-                    with DataNodeClient(datanode['hostname'], datanode['port']) as datanode_client:
-                        success = datanode_client.store_block(block['block_id'], data)
-                        
-                        if not success:
-                            self.logger.error(f"Error uploading block to DataNode {datanode['node_id']}")
-                            return False
-                        
-                        # Registrar la ubicación del bloque en el NameNode
-                        self.namenode_client.add_block_location(
-                            block['block_id'],
-                            datanode['node_id'],
-                            is_leader=is_leader
-                        )
+                    datanode_client = self._get_datanode_client(datanode['hostname'], datanode['port'])
+                    success = self._store_block_with_retry(datanode_client, block['block_id'], data)
+                    
+                    if not success:
+                        self.logger.error(f"Error uploading block to DataNode {datanode['node_id']}")
+                        return False
+                    
+                    # La ubicación se envía al NameNode en lotes
+                    self._queue_block_location(block, datanode['node_id'], is_leader)
                 except Exception as e:
                     self.logger.error(f"Error uploading block to DataNode {datanode['node_id']}: {e}")
                     return False
@@ -596,68 +1058,597 @@ class DFSClient:
             self.logger.error(f"Error uploading block: {e}")
             return False
 
-    def download_block(self, block_info):
+    def _upload_block_replicated(self, block: Dict, data: bytes, checksum: str,
+                                 nodes: List[Dict]) -> List[Tuple[bool, str, str]]:
+        """
+        Sube un bloque una sola vez, al líder (el primer DataNode), y le pide que
+        lo replique en los demás a la vez: los datos salen del cliente una vez en
+        lugar de una por réplica. Si el líder no puede replicar en algún DataNode,
+        el cliente sube esa réplica directamente.
+        
+        Args:
+            block: Información del bloque (con 'file_id')
+            data: Contenido del bloque
+            checksum: Checksum del contenido del bloque
+            nodes: DataNodes asignados al bloque; el primero es el líder
+            
+        Returns:
+            Lista de tuplas (éxito, block_id, node_id), una por réplica
+        """
+        if not nodes:
+            return []
+        
+        leader = nodes[0]
+        leader_result = self._upload_block_with_failover(block, data, checksum, leader, True)
+        results = [leader_result]
+        
+        # Si el bloque acabó en un DataNode alternativo, el cliente sube las demás réplicas
+        leader_client = None
+        if leader_result[0] and leader_result[2] == leader['node_id']:
+            leader_client = self._get_datanode_client(leader['hostname'], leader['port'])
+        
+        followers = nodes[1:]
+        if leader_client is not None and followers:
+            # Las réplicas en los seguidores se piden en paralelo, no una tras otra
+            replicated = list(self._get_hedge_executor().map(
+                lambda node_info: leader_client.replicate_block(
+                    block['block_id'], node_info['node_id'], node_info['hostname'], node_info['port']),
+                followers))
+        else:
+            replicated = [False] * len(followers)
+        
+        for node_info, success in zip(followers, replicated):
+            if success:
+                self._queue_block_location(block, node_info['node_id'], False)
+                results.append((True, block['block_id'], node_info['node_id']))
+            else:
+                results.append(self._upload_block_with_failover(block, data, checksum, node_info, False))
+        
+        return results
+
+    def _upload_block_with_failover(self, block: Dict, data: bytes, checksum: str, node_info: Dict,
+                                    is_leader: bool = False, max_retries: int = 2) -> Tuple[bool, str, str]:
+        """
+        Sube un bloque a un DataNode y, si falla, lo reintenta en un DataNode alternativo.
+        
+        Args:
+            block: Información del bloque (con 'file_id')
+            data: Contenido del bloque
+            checksum: Checksum del contenido del bloque
+            node_info: DataNode de destino
+            is_leader: Si es True, el DataNode es el líder
+            max_retries: Número máximo de intentos
+            
+        Returns:
+            Tupla (éxito, block_id, node_id del último DataNode intentado)
+        """
+        failed_nodes = []
+        for attempt in range(max_retries):
+            try:
+                success = self._upload_block(block, data, checksum, [node_info], is_leader)
+                
+                if success:
+                    return True, block['block_id'], node_info['node_id']
+                
+                failed_nodes.append(node_info['node_id'])
+                
+                # Si falló y hay más intentos, intentar con un DataNode alternativo
+                if attempt < max_retries - 1:
+                    self.retry_policy.sleep(attempt)
+                    alternative_nodes = self.block_distributor.get_alternative_datanodes(
+                        block['size'], 
+                        failed_nodes
+                    )
+                    if alternative_nodes:
+                        node_info = alternative_nodes[0]
+                        continue
+            except Exception as e:
+                self.logger.error(f"Error al subir bloque {block['block_id']}: {str(e)}")
+                failed_nodes.append(node_info['node_id'])
+                if attempt < max_retries - 1:
+                    self.retry_policy.sleep(attempt)
+                    alternative_nodes = self.block_distributor.get_alternative_datanodes(
+                        block['size'], 
+                        failed_nodes
+                    )
+                    if alternative_nodes:
+                        node_info = alternative_nodes[0]
+                        continue
+        
+        return False, block['block_id'], node_info['node_id']
+
+    def _put_small_file(self, local_path: str, dfs_path: str, file_size: int) -> bool:
+        """
+        Sube un archivo que cabe en un único bloque: registra el archivo y su
+        bloque en una sola petición y sube el bloque a sus réplicas.
+        
+        Args:
+            local_path: Ruta local del archivo a subir
+            dfs_path: Ruta destino en el DFS
+            file_size: Tamaño del archivo en bytes
+            
+        Returns:
+            True si la operación fue exitosa, False en caso contrario
+        """
+        file_metadata = {
+            'name': os.path.basename(dfs_path),
+            'path': dfs_path,
+            'type': 'file'
+        }
+        
+        # Un archivo vacío no tiene bloques
+        if file_size == 0:
+            if not self.namenode_client.create_file_with_block(file_metadata).get('file_id'):
+                self.logger.error("Error: No se pudo crear el archivo en el NameNode")
+                return False
+            return True
+        
+        with open(local_path, 'rb', buffering=0) as f:
+            data = f.read()
+        
+        block = {
+            'block_id': str(uuid.uuid4()),
+            'offset': 0,
+            'size': len(data),
+            'checksum': block_checksum(data)
+        }
+        
+        # Elegir los DataNodes antes de registrar el archivo: si no hay ninguno,
+        # no se deja en el NameNode un archivo con un bloque que no se subirá
+        try:
+            nodes = self.block_distributor.select_datanodes_for_block(block['size'])
+        except Exception as e:
+            self.logger.error(f"Error seleccionando DataNodes: {e}")
+            nodes = []
+        if not nodes:
+            self.logger.error(f"Error: No hay DataNodes disponibles para el bloque {block['block_id']}")
+            return False
+        
+        file_info = self.namenode_client.create_file_with_block(file_metadata, block)
+        block['file_id'] = file_info.get('file_id')
+        if not block['file_id']:
+            self.logger.error("Error: No se pudo crear el archivo en el NameNode")
+            return False
+        
+        # Subir el bloque al líder (el primer DataNode), que lo replica en el resto
+        results = self._upload_block_replicated(block, data, block['checksum'], nodes)
+        if not results:
+            self.logger.error(f"Error: No hay DataNodes disponibles para el bloque {block['block_id']}")
+            return False
+        
+        failed = [node_id for success, _, node_id in results if not success]
+        for node_id in failed:
+            self.logger.error(f"Error al subir el bloque {block['block_id']} al DataNode {node_id}")
+        
+        if not self._flush_block_locations(block['file_id']):
+            self.logger.error("Error: No se pudieron registrar las ubicaciones de los bloques en el NameNode")
+            self._discard_block_locations(block['file_id'])
+            return False
+        
+        return not failed
+
+    def _queue_block_location(self, block: Dict, node_id: str, is_leader: bool):
+        """
+        Encola la ubicación de un bloque subido. Cuando se acumulan
+        location_batch_size ubicaciones, o la más antigua lleva en cola más de
+        location_flush_interval segundos, se envían al NameNode en una sola petición.
+        
+        Args:
+            block: Información del bloque (con 'file_id' y 'checksum')
+            node_id: ID del DataNode que almacena el bloque
+            is_leader: Si el DataNode es el líder del bloque
+        """
+        now = time.monotonic()
+        with self._locations_lock:
+            if not self._pending_locations:
+                self._pending_since = now
+            self._pending_locations.append((block, node_id, is_leader))
+            batch_ready = (len(self._pending_locations) >= self.location_batch_size or
+                           now - self._pending_since >= self.location_flush_interval)
+        
+        if batch_ready and not self._flush_block_locations():
+            self.logger.warning("No se pudieron enviar las ubicaciones al NameNode; se reintentará al final de la subida")
+
+    def _flush_block_locations(self, file_id: Optional[str] = None) -> bool:
+        """
+        Envía al NameNode las ubicaciones pendientes, junto con el checksum de
+        cada bloque, usando el registro masivo de bloques. Si falla, las
+        ubicaciones vuelven a la cola pendiente.
+        
+        Args:
+            file_id: Enviar solo las ubicaciones de este archivo (todas si es None)
+        
+        Returns:
+            True si no quedan ubicaciones pendientes de enviar
+        """
+        with self._locations_lock:
+            if file_id is None:
+                batch = self._pending_locations
+                self._pending_locations = []
+            else:
+                batch = [entry for entry in self._pending_locations if entry[0].get('file_id') == file_id]
+                self._pending_locations = [
+                    entry for entry in self._pending_locations if entry[0].get('file_id') != file_id
+                ]
+        
+        if not batch:
+            return True
+        
+        # Agrupar las ubicaciones por archivo y bloque
+        files = {}
+        for block, node_id, is_leader in batch:
+            file_blocks = files.setdefault(block['file_id'], {})
+            entry = file_blocks.setdefault(block['block_id'], {
+                'block_id': block['block_id'],
+                'size': block['size'],
+                'checksum': block.get('checksum'),
+                'locations': []
+            })
+            entry['locations'].append({
+                'block_id': block['block_id'],
+                'datanode_id': node_id,
+                'is_leader': is_leader
+            })
+        
+        try:
+            for file_id, file_blocks in files.items():
+                # Los bloques del archivo deben estar registrados antes que sus ubicaciones
+                registration = self._block_registrations.get(file_id)
+                if registration is not None:
+                    registration.result()
+                self.namenode_client.register_blocks_bulk(file_id, list(file_blocks.values()))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error registrando ubicaciones de bloques en el NameNode: {e}")
+            with self._locations_lock:
+                self._pending_locations = batch + self._pending_locations
+            return False
+
+    def _discard_block_locations(self, file_id: str):
+        """
+        Descarta las ubicaciones pendientes de un archivo cuyo registro de
+        bloques o de ubicaciones falló, para que no se envíen en subidas posteriores.
+        
+        Args:
+            file_id: ID del archivo
+        """
+        with self._locations_lock:
+            self._pending_locations = [
+                entry for entry in self._pending_locations if entry[0].get('file_id') != file_id
+            ]
+        self._block_registrations.pop(file_id, None)
+
+    def _store_block_with_retry(self, datanode_client: DataNodeClient, block_id: str, data: bytes,
+                                max_attempts: int = 3) -> bool:
+        """
+        Envía un bloque a un DataNode reintentando con la espera de retry_policy.
+        
+        En los reintentos se pregunta antes al DataNode si ya tiene el bloque,
+        así que un bloque que llegó en un intento anterior no se vuelve a transferir.
+        
+        Args:
+            datanode_client: Cliente conectado al DataNode
+            block_id: ID del bloque
+            data: Contenido del bloque
+            max_attempts: Número máximo de intentos
+            
+        Returns:
+            True si el bloque quedó almacenado en el DataNode
+        """
+        for attempt in range(max_attempts):
+            try:
+                with self._datanode_slot(datanode_client.hostname, datanode_client.port):
+                    stored = datanode_client.store_block(block_id, data, check_existing=attempt > 0)
+                if stored:
+                    return True
+            except Exception as e:
+                self.logger.warning(f"Error enviando el bloque {block_id} (intento {attempt + 1}/{max_attempts}): {e}")
+            
+            if attempt < max_attempts - 1:
+                self.retry_policy.sleep(attempt)
+        
+        return False
+
+    @staticmethod
+    def _resolve_compact_locations(file_info: Optional[Dict]) -> Optional[Dict]:
+        """
+        Completa las ubicaciones de una respuesta compacta de get_file_info: cada
+        bloque recibe en 'locations' las entradas de sus DataNodes, construidas
+        una sola vez por DataNode y compartidas entre bloques.
+        
+        Args:
+            file_info: Respuesta de get_file_info con compact_locations=True
+            
+        Returns:
+            La misma información, con 'locations' en cada bloque
+        """
+        if not file_info or 'datanodes' not in file_info:
+            return file_info
+        
+        locations = {datanode_id: {'datanode_id': datanode_id, **address}
+                     for datanode_id, address in file_info['datanodes'].items()}
+        for block in file_info.get('blocks', []):
+            if 'location_ids' in block:
+                block['locations'] = [locations[datanode_id] for datanode_id in block['location_ids']
+                                      if datanode_id in locations]
+        return file_info
+    
+    def _get_datanode_map(self, node_ids) -> Dict[str, Dict]:
+        """
+        Devuelve la información de los DataNodes indicados, usando una caché con
+        caducidad para no repetir la consulta en descargas consecutivas.
+        
+        Args:
+            node_ids: IDs de los DataNodes necesarios
+            
+        Returns:
+            Diccionario node_id -> información del DataNode
+        """
+        now = time.time()
+        if now - self._datanode_cache_time > self.datanode_cache_ttl:
+            self._datanode_cache = {}
+            self._datanode_cache_time = now
+        
+        missing = set(node_ids) - self._datanode_cache.keys()
+        if missing:
+            try:
+                # La consulta devuelve todos los DataNodes: guardarlos todos, no solo los que faltan
+                self._datanode_cache.update(self.namenode_client.get_datanodes())
+            except Exception as e:
+                self.logger.warning(f"No se pudo obtener la información de los DataNodes: {e}")
+        
+        return self._datanode_cache
+
+    def _order_targets(self, targets: List[Tuple[str, str, int]]):
+        """
+        Ordena las réplicas de un bloque según el orden en que se probarán:
+        primero las de esta máquina y después las más rápidas (las no medidas
+        van delante). Los empates se deshacen al azar para que las descargas
+        concurrentes no empiecen todas por el mismo DataNode.
+        
+        Args:
+            targets: Lista de tuplas (datanode_id, hostname, port), ordenada en el sitio
+        """
+        random.shuffle(targets)
+        targets.sort(key=lambda target: (target[1] not in _LOCAL_HOSTNAMES,
+                                         self._datanode_latency.get(target[0], 0.0)))
+    
+    def _download_concurrency(self, requested: int, blocks: List[Dict]) -> int:
+        """
+        Limita las descargas simultáneas para que sus buffers quepan en
+        download_buffer_budget.
+        
+        Args:
+            requested: Descargas simultáneas pedidas
+            blocks: Bloques del archivo a descargar
+            
+        Returns:
+            Número de descargas simultáneas (al menos 1)
+        """
+        block_bytes = max((block.get('size', 0) for block in blocks), default=0) or self.block_size
+        return max(1, min(requested, self.download_buffer_budget // (2 * block_bytes)))
+    
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """
+        Obtiene el pool de hilos compartido para las peticiones auxiliares a los
+        DataNodes (descargas de respaldo y replicaciones de un mismo bloque).
+        
+        Returns:
+            Pool de hilos de descarga
+        """
+        with self._datanode_clients_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=64)
+            return self._hedge_executor
+    
+    def _record_datanode_latency(self, datanode_id: str, elapsed: float, size: int, alpha: float = 0.2):
+        """
+        Actualiza la media móvil exponencial del tiempo por byte de un DataNode.
+        
+        Args:
+            datanode_id: ID del DataNode
+            elapsed: Segundos que tardó la descarga
+            size: Bytes descargados
+            alpha: Peso de la nueva medida
+        """
+        per_byte = elapsed / max(size, 1)
+        previous = self._datanode_latency.get(datanode_id)
+        self._datanode_latency[datanode_id] = per_byte if previous is None else previous + alpha * (per_byte - previous)
+    
+    def _hedge_timeout(self, datanode_id: str, size: int) -> float:
+        """
+        Calcula cuánto esperar a una réplica antes de pedir el bloque a la siguiente.
+        
+        Args:
+            datanode_id: ID del DataNode al que se pidió el bloque
+            size: Tamaño del bloque en bytes
+            
+        Returns:
+            Segundos de espera (el triple del tiempo esperado, o hedge_delay si
+            el DataNode aún no se ha medido)
+        """
+        per_byte = self._datanode_latency.get(datanode_id)
+        if per_byte is None:
+            return self.hedge_delay
+        return max(self.hedge_min_delay, 3 * per_byte * size)
+    
+    def download_block(self, block_info, datanode_map: Optional[Dict[str, Dict]] = None,
+                       buf: Optional[bytearray] = None):
+        """
+        Descarga un bloque de la réplica más rápida conocida. Si no responde en
+        el tiempo esperado, se pide también a la siguiente réplica y se usa la
+        primera respuesta válida; si una réplica falla, se pasa a la siguiente.
+        
+        Args:
+            block_info: Información del bloque con sus ubicaciones
+            datanode_map: Información de DataNodes ya resuelta (node_id -> info)
+            buf: Buffer del hilo donde recibir el bloque (opcional). Lo usa la
+                petición principal, que corre en el hilo que llama; las de
+                respaldo reservan el suyo
+            
+        Returns:
+            Tupla (éxito, block_id, datos del bloque o None)
+        """
         block_id = block_info.get('block_id')
         locations = block_info.get('locations', [])
         
         if not locations:
-            print(f"Error: No hay ubicaciones disponibles para el bloque {block_id}")
+            self.logger.warning(f"No hay ubicaciones disponibles para el bloque {block_id}")
             # Intentar obtener información actualizada del bloque directamente
             try:
                 updated_block_info = self.namenode_client.get_block_info(block_id)
                 if updated_block_info and updated_block_info.get('locations'):
                     locations = updated_block_info.get('locations')
-                    print(f"Recuperadas {len(locations)} ubicaciones para el bloque {block_id}")
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"Recuperadas {len(locations)} ubicaciones para el bloque {block_id}")
                 else:
-                    print(f"No se pudieron recuperar ubicaciones para el bloque {block_id}")
+                    self.logger.error(f"No se pudieron recuperar ubicaciones para el bloque {block_id}")
                     return False, block_id, None
             except Exception as e:
-                print(f"Error al actualizar información del bloque {block_id}: {e}")
+                self.logger.error(f"Error al actualizar información del bloque {block_id}: {e}")
                 return False, block_id, None
         
-        # Intentar descargar de cada ubicación hasta que una funcione
+        # Resolver la dirección de cada ubicación
         errors = []
+        targets = []
         for location in locations:
-            try:
-                # Obtener información completa del DataNode
-                datanode_id = location.get('datanode_id')
-                hostname = location.get('hostname')
-                port = location.get('port')
-                
-                if not datanode_id:
-                    errors.append("DataNode ID no disponible en la ubicación del bloque")
-                    continue
-                
-                if not hostname or not port:
-                    # Si no tenemos la información completa, intentar obtenerla del NameNode
-                    try:
-                        datanode_info = self.namenode_client.get_datanode(datanode_id)
-                        if not datanode_info:
-                            errors.append(f"No se pudo obtener información del DataNode {datanode_id}")
-                            continue
-                        
-                        hostname = datanode_info.get('hostname')
-                        port = datanode_info.get('port')
-                        
-                        if not hostname or not port:
-                            errors.append(f"Información incompleta del DataNode {datanode_id}")
-                            continue
-                    except Exception as e:
-                        errors.append(f"Error al obtener información del DataNode {datanode_id}: {e}")
+            datanode_id = location.get('datanode_id')
+            hostname = location.get('hostname')
+            port = location.get('port')
+            
+            if not datanode_id:
+                errors.append("DataNode ID no disponible en la ubicación del bloque")
+                continue
+            
+            if (not hostname or not port) and datanode_map and datanode_id in datanode_map:
+                # Usar la información del DataNode obtenida previamente
+                hostname = datanode_map[datanode_id].get('hostname')
+                port = datanode_map[datanode_id].get('port')
+            
+            if not hostname or not port:
+                # Si no tenemos la información completa, intentar obtenerla del NameNode
+                try:
+                    datanode_info = self.namenode_client.get_datanode(datanode_id)
+                    if not datanode_info:
+                        errors.append(f"No se pudo obtener información del DataNode {datanode_id}")
                         continue
-                
-                # Intentar descargar el bloque
-                print(f"Intentando descargar el bloque {block_id} desde {hostname}:{port}")
-                with DataNodeClient(hostname, port) as datanode:
-                    block_data = datanode.retrieve_block(block_id)
-                    if block_data:
-                        print(f"Bloque {block_id} descargado correctamente ({len(block_data)} bytes)")
-                        return True, block_id, block_data
-                    else:
-                        errors.append(f"El DataNode {datanode_id} ({hostname}:{port}) devolvió datos vacíos")
+                    
+                    hostname = datanode_info.get('hostname')
+                    port = datanode_info.get('port')
+                    
+                    if not hostname or not port:
+                        errors.append(f"Información incompleta del DataNode {datanode_id}")
+                        continue
+                    # Guardarla para los demás bloques de ese DataNode
+                    self._datanode_cache[datanode_id] = datanode_info
+                except Exception as e:
+                    errors.append(f"Error al obtener información del DataNode {datanode_id}: {e}")
+                    continue
+            
+            targets.append((datanode_id, hostname, port))
+        
+        self._order_targets(targets)
+        
+        checksum = block_info.get('checksum')
+        size = block_info.get('size') or self.block_size
+        
+        # Se activa cuando una réplica entrega el bloque: las demás peticiones
+        # en curso, incluida la del hilo que llama, se cancelan al momento
+        answered = CancelEvent()
+        answer_lock = threading.Lock()
+        targets_lock = threading.Lock()
+        next_target = 0
+        
+        def claim_target():
+            # La siguiente réplica sin pedir, compartida entre el hilo que llama y el respaldo
+            nonlocal next_target
+            with targets_lock:
+                if next_target >= len(targets):
+                    return None
+                next_target += 1
+                return targets[next_target - 1]
+        
+        def fetch(target, buffer):
+            datanode_id, hostname, port = target
+            if answered.is_set():
+                return None, None
+            try:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Intentando descargar el bloque {block_id} desde {hostname}:{port}")
+                start = time.monotonic()
+                datanode = self._get_datanode_client(hostname, port)
+                with self._datanode_slot(hostname, port):
+                    block_data = datanode.retrieve_block(
+                        block_id, buffer if buffer is not None else bytearray(size), answered)
+                if answered.is_set():
+                    return None, None
+                if not block_data:
+                    return None, f"El DataNode {datanode_id} ({hostname}:{port}) devolvió datos vacíos"
+                if verify_checksum(block_data, checksum) is False:
+                    # Réplica corrupta: probar con la siguiente ubicación
+                    return None, f"El DataNode {datanode_id} ({hostname}:{port}) devolvió datos con checksum incorrecto"
+                # Solo una respuesta gana, aunque dos réplicas terminen a la vez
+                with answer_lock:
+                    if answered.is_set():
+                        return None, None
+                    answered.set()
+                self._record_datanode_latency(datanode_id, time.monotonic() - start, len(block_data))
+                return block_data, None
             except Exception as e:
-                errors.append(f"Error con DataNode {datanode_id} ({hostname}:{port}): {str(e)}")
+                # La dirección guardada puede estar obsoleta (el DataNode pudo volver a
+                # registrarse en otro puerto): consultarla de nuevo la próxima vez
+                self._datanode_cache.pop(datanode_id, None)
+                return None, f"Error con DataNode {datanode_id} ({hostname}:{port}): {str(e)}"
+        
+        def hedge(attempt_done, timeout):
+            # Si la petición en curso no termina a tiempo, pedir el bloque a la
+            # siguiente réplica, con un buffer propio
+            if attempt_done.wait(timeout):
+                return None, None
+            target = claim_target()
+            if target is None:
+                return None, None
+            return fetch(target, None)
+        
+        # La petición principal corre en el hilo que llama, sobre su buffer; al
+        # pool compartido solo van las peticiones de respaldo
+        executor = self._get_hedge_executor()
+        hedges = []
+        failures = 0
+        while not answered.is_set() and next_target < len(targets):
+            # Tras un fallo, esperar antes de la siguiente réplica (salvo que
+            # responda antes una petición de respaldo)
+            if failures and answered.wait(self.retry_policy.delay(failures - 1)):
+                break
+            target = claim_target()
+            if target is None:
+                break
+            attempt_done = threading.Event()
+            if next_target < len(targets):
+                hedges.append(executor.submit(hedge, attempt_done, self._hedge_timeout(target[0], size)))
+            try:
+                block_data, error = fetch(target, buf)
+            finally:
+                attempt_done.set()
+            if block_data is not None:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Bloque {block_id} descargado correctamente ({len(block_data)} bytes)")
+                return True, block_id, block_data
+            if error is not None:
+                errors.append(error)
+                failures += 1
+        
+        # Esperar a las peticiones de respaldo que llegaron a empezar
+        for future in hedges:
+            if future.cancel():
                 continue
+            block_data, error = future.result()
+            if block_data is not None:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Bloque {block_id} descargado correctamente ({len(block_data)} bytes)")
+                return True, block_id, block_data
+            if error is not None:
+                errors.append(error)
         
-        print(f"No se pudo descargar el bloque {block_id}. Errores: {'; '.join(errors)}")
+        self.logger.error(f"No se pudo descargar el bloque {block_id}. Errores: {'; '.join(errors)}")
         return False, block_id, None
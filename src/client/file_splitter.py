@@ -1,13 +1,22 @@
 import os
+import logging
+import mmap
 import uuid
-import hashlib
-from typing import List, Dict, Tuple, BinaryIO
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, BinaryIO, Optional
+
+from src.common.checksum import block_checksum
 
 
 class FileSplitter:
     """
     Clase encargada de particionar archivos en bloques de tamaño fijo.
     """
+    # Número de bloques escritos por cada llamada a writev al unir bloques
+    WRITEV_BATCH = 8
+    # Hilos que calculan a la vez los checksums de los bloques de un archivo
+    HASH_WORKERS = min(8, os.cpu_count() or 1)
+    
     def __init__(self, block_size: int = 4 * 1024 * 1024):  # 4MB por defecto
         """
         Inicializa el particionador de archivos.
@@ -16,50 +25,87 @@ class FileSplitter:
             block_size: Tamaño de cada bloque en bytes (4MB por defecto)
         """
         self.block_size = block_size
+        self.logger = logging.getLogger("FileSplitter")
     
-    def split_file(self, file_path: str) -> List[Dict]:
+    def split_file(self, file_path: str, file_stat: Optional[os.stat_result] = None) -> List[Dict]:
         """
         Divide un archivo en bloques de tamaño fijo.
         
         Args:
             file_path: Ruta al archivo a dividir
+            file_stat: Resultado de os.stat del archivo, si ya se tiene (evita otro stat)
             
         Returns:
             Lista de diccionarios con información de cada bloque:
             - block_id: Identificador único del bloque
-            - data: Contenido binario del bloque
+            - data: Contenido binario del bloque (memoryview sobre el archivo mapeado)
             - size: Tamaño del bloque en bytes
-            - checksum: Hash SHA-256 del contenido del bloque
+            - checksum: Checksum del contenido del bloque (ver src.common.checksum)
             - index: Índice del bloque en el archivo (0-based)
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"El archivo {file_path} no existe")
+        if file_stat is None:
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"El archivo {file_path} no existe")
         
-        file_size = os.path.getsize(file_path)
+        file_size = file_stat.st_size
         total_blocks = (file_size + self.block_size - 1) // self.block_size  # Redondeo hacia arriba
         
-        blocks = []
+        if total_blocks == 0:
+            return []
         
+        # Mapear el archivo una sola vez: cada bloque es una vista sobre el mapeo,
+        # sin copiar los datos a un objeto bytes nuevo. El mapeo sigue siendo
+        # válido tras cerrar el archivo y se libera cuando ya no quedan vistas.
         with open(file_path, 'rb') as file:
-            for i in range(total_blocks):
-                # Generar un ID único para el bloque
-                block_id = self._generate_block_id()
-                
-                # Leer el bloque
-                data = file.read(self.block_size)
-                
-                # Calcular el checksum
-                checksum = self._calculate_checksum(data)
-                
-                blocks.append({
-                    'block_id': block_id,
-                    'data': data,
-                    'size': len(data),
-                    'checksum': checksum,
-                    'index': i
-                })
-        
-        return blocks
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            # Lectura anticipada agresiva: los bloques se recorren en orden
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        if hasattr(mmap, 'MADV_WILLNEED'):
+            # Empezar a leer el archivo en segundo plano mientras se calculan
+            # los checksums de los primeros bloques
+            mapped.madvise(mmap.MADV_WILLNEED)
+        view = memoryview(mapped)
+        
+        # Vistas de los bloques sobre el archivo mapeado; los checksums de
+        # bloques independientes se calculan en paralelo
+        views = [view[offset:offset + self.block_size] for offset in range(0, file_size, self.block_size)]
+        checksums = self._calculate_checksums(views)
+        block_ids = self._generate_block_ids(total_blocks)
+        
+        return [{
+            'block_id': block_id,
+            'data': data,
+            'size': len(data),
+            'checksum': checksum,
+            'index': i
+        } for i, (block_id, data, checksum) in enumerate(zip(block_ids, views, checksums))]
+    
+    def describe_blocks(self, file_size: int, block_size: Optional[int] = None) -> List[Dict]:
+        """
+        Calcula los bloques de un archivo sin leer su contenido.
+        
+        Cada bloque se lee después con os.pread(fd, size, offset) justo antes de
+        enviarlo, así que la memoria usada no depende del tamaño del archivo.
+        
+        Args:
+            file_size: Tamaño del archivo en bytes
+            block_size: Tamaño de bloque (el del particionador por defecto)
+            
+        Returns:
+            Lista de diccionarios con block_id, offset, size e index de cada bloque
+        """
+        block_size = block_size or self.block_size
+        offsets = range(0, file_size, block_size)
+        block_ids = self._generate_block_ids(len(offsets))
+        return [{
+            'block_id': block_id,
+            'offset': offset,
+            'size': min(block_size, file_size - offset),
+            'index': index
+        } for index, (offset, block_id) in enumerate(zip(offsets, block_ids))]
     
     def split_file_stream(self, file: BinaryIO, file_size: int) -> List[Dict]:
         """
@@ -73,27 +119,19 @@ class FileSplitter:
             Lista de diccionarios con información de cada bloque
         """
         total_blocks = (file_size + self.block_size - 1) // self.block_size
-        blocks = []
         
-        for i in range(total_blocks):
-            # Generar un ID único para el bloque
-            block_id = self._generate_block_id()
-            
-            # Leer el bloque
-            data = file.read(self.block_size)
-            
-            # Calcular el checksum
-            checksum = self._calculate_checksum(data)
-            
-            blocks.append({
-                'block_id': block_id,
-                'data': data,
-                'size': len(data),
-                'checksum': checksum,
-                'index': i
-            })
-        
-        return blocks
+        # Leer los bloques en orden y calcular después sus checksums en paralelo
+        chunks = [file.read(self.block_size) for _ in range(total_blocks)]
+        checksums = self._calculate_checksums(chunks)
+        block_ids = self._generate_block_ids(total_blocks)
+        
+        return [{
+            'block_id': block_id,
+            'data': data,
+            'size': len(data),
+            'checksum': checksum,
+            'index': i
+        } for i, (block_id, data, checksum) in enumerate(zip(block_ids, chunks, checksums))]
     
     def join_blocks(self, blocks: List[Dict], output_path: str) -> bool:
         """
@@ -107,18 +145,46 @@ class FileSplitter:
             True si la operación fue exitosa, False en caso contrario
         """
         try:
-            # Ordenar los bloques por índice
-            sorted_blocks = sorted(blocks, key=lambda x: x['index'])
+            # Colocar cada bloque en su posición: los índices van de 0 a N-1,
+            # así que no hace falta ordenar
+            sorted_blocks = [None] * len(blocks)
+            for block in blocks:
+                sorted_blocks[block['index']] = block
+            if None in sorted_blocks:
+                raise ValueError("los índices de los bloques no son consecutivos")
             
             with open(output_path, 'wb') as output_file:
-                for block in sorted_blocks:
-                    output_file.write(block['data'])
+                # Escribir los bloques en grupos con writev: una llamada al sistema
+                # por cada grupo en lugar de una por bloque
+                fd = output_file.fileno()
+                for i in range(0, len(sorted_blocks), self.WRITEV_BATCH):
+                    group = sorted_blocks[i:i + self.WRITEV_BATCH]
+                    self._writev_all(fd, [memoryview(block['data']) for block in group])
             
             return True
         except Exception as e:
-            print(f"Error al unir los bloques: {e}")
+            self.logger.error(f"Error al unir los bloques: {e}")
             return False
     
+    def _writev_all(self, fd: int, views: List[memoryview]):
+        """
+        Escribe varias vistas consecutivas con writev, continuando si el sistema
+        escribe solo una parte.
+        
+        Args:
+            fd: Descriptor del archivo de salida
+            views: Datos a escribir, en orden
+        """
+        views = [view.cast('B') for view in views if view.nbytes]
+        while views:
+            written = os.writev(fd, views)
+            # Descartar lo ya escrito y recortar la primera vista pendiente
+            while views and written >= views[0].nbytes:
+                written -= views[0].nbytes
+                views.pop(0)
+            if views and written:
+                views[0] = views[0][written:]
+    
     def _generate_block_id(self) -> str:
         """
         Genera un identificador único para un bloque.
@@ -128,16 +194,51 @@ class FileSplitter:
         """
         return str(uuid.uuid4())
     
+    def _generate_block_ids(self, count: int) -> List[str]:
+        """
+        Genera los identificadores de los bloques de un archivo.
+        
+        Todos comparten un prefijo aleatorio de 12 bytes (una sola lectura de
+        entropía por archivo) y terminan en un contador de 4 bytes, así que
+        cada identificador solo cuesta formatear un número. Conservan el
+        formato de un UUID versión 4.
+        
+        Args:
+            count: Número de identificadores
+            
+        Returns:
+            Lista de identificadores únicos como string
+        """
+        prefix = str(uuid.UUID(bytes=os.urandom(12) + bytes(4), version=4))[:-8]
+        return [f"{prefix}{i:08x}" for i in range(count)]
+    
+    def _calculate_checksums(self, blocks: List) -> List[str]:
+        """
+        Calcula los checksums de varios bloques independientes en paralelo.
+        
+        zlib y crc32c liberan el GIL durante el cálculo, así que varios hilos
+        procesan bloques distintos a la vez, cada uno en un núcleo.
+        
+        Args:
+            blocks: Datos de cada bloque (bytes o memoryview)
+            
+        Returns:
+            Checksums en el mismo orden que los bloques
+        """
+        workers = min(self.HASH_WORKERS, len(blocks))
+        if workers <= 1:
+            return [self._calculate_checksum(data) for data in blocks]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._calculate_checksum, blocks))
+    
     def _calculate_checksum(self, data: bytes) -> str:
         """
-        Calcula el checksum SHA-256 de los datos del bloque.
+        Calcula el checksum de los datos del bloque (CRC32C si está disponible).
         
         Args:
             data: Datos binarios del bloque
             
         Returns:
-            Checksum SHA-256 como string hexadecimal
+            Checksum con el algoritmo como prefijo (ej: 'crc32c:1a2b3c4d')
         """
-        sha256 = hashlib.sha256()
-        sha256.update(data)
-        return sha256.hexdigest()
+        return block_checksum(data)
@@ -1,25 +1,170 @@
+import logging
+import posixpath
+import threading
+import time
 import requests
-from typing import Dict, List, Optional, Any, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Any, Tuple, Union
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson (opcional) serializa y analiza JSON en C, bastante más rápido que el
+# módulo json estándar para los cuerpos pequeños de las peticiones al NameNode
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgpack (opcional) codifica las peticiones y respuestas en binario, más
+# compacto y rápido de procesar que JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+# Cuerpos en JSON, pero aceptando respuestas en msgpack si el NameNode lo tiene
+JSON_ACCEPT_MSGPACK_HEADERS = {'Content-Type': 'application/json',
+                               'Accept': f'{MSGPACK_CONTENT_TYPE}, application/json'}
+MSGPACK_HEADERS = {'Content-Type': MSGPACK_CONTENT_TYPE, 'Accept': MSGPACK_CONTENT_TYPE}
+
+
+def _json_dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(content: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _is_missing_route(error: Exception) -> bool:
+    """
+    Indica si un error de _make_request se debe a que el NameNode no tiene el
+    endpoint (versión anterior): 404 genérico de FastAPI o 405 por método.
+    """
+    message = str(error)
+    return message.startswith("Error 405") or (message.startswith("Error 404") and '"Not Found"' in message)
+
 
 class NameNodeClient:
     def __init__(self, base_url: str):
         self.base_url = base_url.rstrip('/')
+        self.logger = logging.getLogger("NameNodeClient")
+        
+        # Sesión compartida con keep-alive: las peticiones reutilizan las
+        # conexiones TCP abiertas en lugar de abrir una nueva cada vez
+        self.session = requests.Session()
+        # Reintentar los fallos de conexión (por ejemplo, una conexión del pool
+        # que el NameNode ya cerró); las lecturas solo en métodos idempotentes
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64,
+                              max_retries=Retry(total=3, backoff_factor=0.1, raise_on_status=False))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Formato de los cuerpos: JSON hasta que el NameNode responda en msgpack
+        # (solo si está instalado aquí), para no enviarle cuerpos que no entienda
+        self.codec = 'json'
+        
+        # Caché con caducidad de listados de directorios, metadatos de archivos,
+        # descriptores de DataNodes y estadísticas del sistema
+        self.directory_cache_ttl = 30.0
+        self.file_cache_ttl = 2.0
+        self.datanode_cache_ttl = 5.0
+        self.stats_cache_ttl = 1.0
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+    
+    def close(self):
+        """Cierra las conexiones abiertas con el NameNode."""
+        self.session.close()
+    
+    def _cached(self, kind: str, key: str, ttl: float, loader):
+        """
+        Devuelve el valor en caché si no ha caducado; si no, lo obtiene con loader.
+        
+        Args:
+            kind: Tipo de entrada ('dir', 'file', 'info', 'compact_info', 'datanode' o 'stats')
+            key: Clave de la entrada
+            ttl: Segundos de validez del valor
+            loader: Función que obtiene el valor del NameNode
+            
+        Returns:
+            Valor en caché u obtenido del NameNode
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get((kind, key))
+        if entry and entry[1] > now:
+            return entry[0]
+        
+        value = loader()
+        with self._cache_lock:
+            self._cache[(kind, key)] = (value, now + ttl)
+        return value
+    
+    @staticmethod
+    def _normalize_path(path: str) -> str:
+        return '/' + path.strip('/')
+    
+    def invalidate_path(self, path: Optional[str] = None,
+                        kinds: Tuple[str, ...] = ('dir', 'file', 'info', 'compact_info')):
+        """
+        Descarta las entradas en caché por ruta afectadas por un cambio en una
+        ruta: las de la propia ruta, su directorio padre y sus subdirectorios.
+        Sin ruta, descarta todas las entradas de esos tipos.
+        
+        Args:
+            path: Ruta creada, modificada o eliminada
+            kinds: Tipos de entrada a descartar
+        """
+        with self._cache_lock:
+            if path is None:
+                stale = [key for key in self._cache if key[0] in kinds]
+            else:
+                path = self._normalize_path(path)
+                parent = posixpath.dirname(path)
+                prefix = path.rstrip('/') + '/'
+                stale = [key for key in self._cache
+                         if key[0] in kinds and (key[1] in (path, parent) or key[1].startswith(prefix))]
+            for key in stale:
+                del self._cache[key]
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                      codec: Optional[str] = None) -> Dict:
         url = f"{self.base_url}{endpoint}"
+        codec = codec or self.codec
+        
+        # Serializar el cuerpo directamente, sin pasar por el codificador de requests
+        if codec == 'msgpack':
+            body = msgpack.packb(data, use_bin_type=True) if data is not None else None
+            headers = MSGPACK_HEADERS
+        else:
+            body = _json_dumps(data) if data is not None else None
+            headers = JSON_ACCEPT_MSGPACK_HEADERS if msgpack is not None else JSON_HEADERS
         
         if method.lower() == 'get':
-            response = requests.get(url)
+            response = self.session.get(url, headers=headers)
         elif method.lower() == 'post':
-            response = requests.post(url, json=data)
+            response = self.session.post(url, data=body, headers=headers)
         elif method.lower() == 'put':
-            response = requests.put(url, json=data)
+            response = self.session.put(url, data=body, headers=headers)
         elif method.lower() == 'delete':
-            response = requests.delete(url)
+            response = self.session.delete(url, headers=headers)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
         
+        if response.status_code in (415, 422) and codec == 'msgpack':
+            # El NameNode no tiene msgpack (415) o no acepta cuerpos en msgpack
+            # (422, versiones anteriores): seguir con JSON
+            self.codec = 'json'
+            return self._make_request(method, endpoint, data, codec='json')
+        
         if response.status_code >= 400:
             error_message = f"Error {response.status_code}: {response.text}"
             raise Exception(error_message)
@@ -27,20 +172,64 @@ class NameNodeClient:
         if response.status_code == 204:  # No content
             return {}
         
-        return response.json()
+        if response.headers.get('content-type', '').startswith(MSGPACK_CONTENT_TYPE):
+            # El NameNode entiende msgpack: usarlo también en los cuerpos que se envían
+            self.codec = 'msgpack'
+            return msgpack.unpackb(response.content, raw=False)
+        return _json_loads(response.content)
     
     # Operaciones de archivos
     def create_file(self, file_metadata: Dict) -> Dict:
-        return self._make_request('post', '/files/', data=file_metadata)
+        try:
+            return self._make_request('post', '/files/', data=file_metadata)
+        finally:
+            self.invalidate_path(file_metadata.get('path', '/'))
+    
+    def create_file_with_block(self, file_metadata: Dict, block: Optional[Dict] = None) -> Dict:
+        """
+        Registra un archivo pequeño junto con su único bloque en una sola petición.
+        
+        Si el NameNode no tiene el endpoint, crea el archivo y registra el bloque
+        por separado.
+        
+        Args:
+            file_metadata: Metadatos del archivo (name, path, type)
+            block: Bloque del archivo con 'block_id', 'size' y 'checksum' (None si está vacío)
+            
+        Returns:
+            Metadatos del archivo creado
+        """
+        try:
+            return self._make_request('post', '/files/with-block', data={'file': file_metadata, 'block': block})
+        except Exception as e:
+            if not _is_missing_route(e):
+                raise
+            file_info = self._make_request('post', '/files/', data=file_metadata)
+            if block is not None and file_info.get('file_id'):
+                self._make_request('post', '/blocks/', data={
+                    'block_id': block['block_id'],
+                    'file_id': file_info['file_id'],
+                    'size': block['size'],
+                    'checksum': block.get('checksum'),
+                    'locations': []
+                })
+            return file_info
+        finally:
+            self.invalidate_path(file_metadata.get('path', '/'))
     
     def get_file(self, file_id: str) -> Dict:
         return self._make_request('get', f'/files/{file_id}')
     
     def get_file_by_path(self, path: str) -> Dict:
-        return self._make_request('get', f'/files/path/{path}')
+        return self._cached('file', self._normalize_path(path), self.file_cache_ttl,
+                            lambda: self._make_request('get', f'/files/path/{path}'))
     
     def delete_file(self, file_id: str) -> None:
-        self._make_request('delete', f'/files/{file_id}')
+        try:
+            self._make_request('delete', f'/files/{file_id}')
+        finally:
+            # Solo se conoce el ID del archivo: descartar todas las entradas por ruta
+            self.invalidate_path()
     
     # Operaciones de bloques
     def get_block_info(self, block_id: str) -> Dict:
@@ -55,33 +244,117 @@ class NameNodeClient:
         """
         try:
             response = self._make_request('get', f'/blocks/{block_id}')
-            
-            # Asegurarse de que la respuesta contiene información de ubicaciones completa
-            if 'locations' in response:
-                # Verificar que cada ubicación tiene información completa del DataNode
-                for i, location in enumerate(response['locations']):
-                    if not all(k in location for k in ['hostname', 'port']):
-                        # Si falta información, intentar obtener el DataNode completo
-                        try:
-                            datanode_id = location.get('datanode_id')
-                            if datanode_id:
-                                datanode_info = self.get_datanode(datanode_id)
-                                if datanode_info:
-                                    # Actualizar información en la ubicación
-                                    response['locations'][i].update({
-                                        'hostname': datanode_info.get('hostname'),
-                                        'port': datanode_info.get('port'),
-                                        'status': datanode_info.get('status')
-                                    })
-                        except Exception:
-                            # Si no se puede obtener la información completa, continuar con la siguiente ubicación
-                            continue
+            self._complete_locations(response)
             
             return response
         except Exception as e:
-            print(f"Error al obtener información del bloque {block_id}: {e}")
+            self.logger.error(f"Error al obtener información del bloque {block_id}: {e}")
             return {}
     
+    def _complete_locations(self, block: Dict) -> None:
+        """
+        Añade hostname, puerto y estado del DataNode a las ubicaciones de un bloque que no los traen.
+        
+        Args:
+            block: Diccionario con la información del bloque; se modifica en el sitio
+        """
+        # Asegurarse de que la respuesta contiene información de ubicaciones completa
+        if 'locations' in block:
+            # Verificar que cada ubicación tiene información completa del DataNode
+            for i, location in enumerate(block['locations']):
+                if not all(k in location for k in ['hostname', 'port']):
+                    # Si falta información, intentar obtener el DataNode completo
+                    try:
+                        datanode_id = location.get('datanode_id')
+                        if datanode_id:
+                            datanode_info = self.get_datanode(datanode_id)
+                            if datanode_info:
+                                # Actualizar información en la ubicación
+                                block['locations'][i].update({
+                                    'hostname': datanode_info.get('hostname'),
+                                    'port': datanode_info.get('port'),
+                                    'status': datanode_info.get('status')
+                                })
+                    except Exception:
+                        # Si no se puede obtener la información completa, continuar con la siguiente ubicación
+                        continue
+    
+    def _prefetch_datanodes(self, blocks: List[Dict]) -> None:
+        """
+        Carga en la caché, con una sola petición, los DataNodes de las ubicaciones
+        de varios bloques que aún no están en ella.
+        
+        Args:
+            blocks: Bloques cuyas ubicaciones se van a completar
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            node_ids = {location.get('datanode_id') for block in blocks for location in block.get('locations', [])
+                        if not self._cache_fresh(('datanode', location.get('datanode_id')), now)}
+        node_ids.discard(None)
+        if len(node_ids) < 2:
+            return
+        
+        nodes = self.get_datanodes(node_ids)
+        with self._cache_lock:
+            for node_id, node in nodes.items():
+                self._cache[('datanode', node_id)] = (node, now + self.datanode_cache_ttl)
+    
+    def _cache_fresh(self, key: Tuple[str, str], now: float) -> bool:
+        entry = self._cache.get(key)
+        return entry is not None and entry[1] > now
+    
+    def get_blocks_info_bulk(self, block_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Obtiene en una sola petición la información detallada de varios bloques.
+        
+        Args:
+            block_ids: IDs de los bloques a consultar
+            
+        Returns:
+            Diccionario block_id -> información del bloque; los bloques que el
+            NameNode no conoce no aparecen
+        """
+        response = self._make_request('post', '/blocks/batch', data=block_ids)
+        self._prefetch_datanodes(response or [])
+        by_id = {}
+        for block in response or []:
+            self._complete_locations(block)
+            by_id[block['block_id']] = block
+        return by_id
+    
+    def register_blocks_bulk(self, file_id: str, blocks: List[Dict]) -> None:
+        """
+        Registra todos los bloques de un archivo en una sola petición.
+        
+        Si el NameNode no tiene el endpoint masivo, registra los bloques uno a uno.
+        El registro es secuencial porque el NameNode devuelve los bloques de un
+        archivo en el orden en que se registraron.
+        
+        Args:
+            file_id: ID del archivo al que pertenecen los bloques
+            blocks: Bloques en orden, cada uno con 'block_id', 'size' y opcionalmente
+                'checksum' y 'locations'
+        """
+        payload = [{
+            'block_id': block['block_id'],
+            'file_id': file_id,
+            'size': block['size'],
+            'checksum': block.get('checksum'),
+            'locations': block.get('locations', [])
+        } for block in blocks]
+        
+        try:
+            self._make_request('post', '/blocks/bulk', data=payload)
+        except Exception as e:
+            if not _is_missing_route(e):
+                raise
+            for block_info in payload:
+                self._make_request('post', '/blocks/', data=block_info)
+        finally:
+            # Cambian el tamaño y los bloques del archivo, del que solo se conoce el ID
+            self.invalidate_path()
+    
     def add_block_location(self, block_id: str, datanode_id: str, is_leader: bool = False) -> Dict:
         """
         Registra la ubicación de un bloque en un DataNode específico.
@@ -104,50 +377,69 @@ class NameNodeClient:
         except Exception as e:
             # Si el error es 404 (bloque no encontrado), intentamos crear el bloque primero
             if "404" in str(e) and "Block not found" in str(e):
-                print(f"El bloque {block_id} no existe en el NameNode. Intente registrar el bloque primero.")
+                self.logger.warning(f"El bloque {block_id} no existe en el NameNode. Intente registrar el bloque primero.")
             raise e
+        finally:
+            # Cambian las ubicaciones de los bloques en la información de archivos
+            self.invalidate_path(kinds=('info', 'compact_info'))
     
-    def get_file_blocks(self, path: str) -> List[Dict]:
+    def get_file_blocks(self, path: str, file_info: Optional[Dict] = None) -> List[Dict]:
         """
         Obtiene información de los bloques de un archivo.
         
         Args:
             path: Ruta del archivo en el DFS
+            file_info: Resultado previo de get_file_info para la misma ruta (opcional),
+                para no volver a pedirlo
             
         Returns:
             Lista de diccionarios con información de los bloques
         """
         try:
             # Primero obtener la información del archivo para verificar que existe
-            file_info = self.get_file_info(path)
+            if file_info is None:
+                file_info = self.get_file_info(path)
             if not file_info:
                 return []
             
-            # Obtener los bloques y sus ubicaciones
-            response = self._make_request('get', f'/files/blocks/{path}')
-            if isinstance(response, dict) and 'blocks' in response:
-                blocks = response['blocks']
-            elif isinstance(response, list):
-                blocks = response
-            else:
-                blocks = []
+            # La información del archivo ya incluye los bloques con sus ubicaciones
+            blocks = file_info.get('blocks')
+            if blocks is None:
+                response = self._make_request('get', f'/files/blocks/{path}')
+                if isinstance(response, dict) and 'blocks' in response:
+                    blocks = response['blocks']
+                elif isinstance(response, list):
+                    blocks = response
+                else:
+                    blocks = []
+            
+            # Consultar en detalle, en una sola petición, solo los bloques sin ubicaciones
+            missing = [block.get('block_id') for block in blocks if block.get('block_id') and not block.get('locations')]
+            by_id = {}
+            if missing:
+                try:
+                    by_id = self.get_blocks_info_bulk(missing)
+                    by_id.update((block_id, {}) for block_id in missing if block_id not in by_id)
+                except Exception as e:
+                    # NameNode sin el endpoint masivo: consultar los bloques en paralelo
+                    self.logger.debug(f"Consulta masiva de bloques no disponible ({e}), consultando uno a uno")
+                    with ThreadPoolExecutor(max_workers=min(16, len(missing))) as executor:
+                        by_id = dict(zip(missing, executor.map(self.get_block_info, missing)))
             
-            # Para cada bloque, obtener información detallada
             detailed_blocks = []
             for block in blocks:
                 block_id = block.get('block_id')
-                if block_id:
-                    try:
-                        block_info = self.get_block_info(block_id)
-                        if block_info:
-                            detailed_blocks.append(block_info)
-                    except Exception as e:
-                        print(f"Error al obtener información del bloque {block_id}: {e}")
-                        continue
+                if not block_id:
+                    continue
+                if block_id in by_id:
+                    if by_id[block_id]:
+                        detailed_blocks.append(by_id[block_id])
+                else:
+                    detailed_blocks.append(block)
             
             return detailed_blocks
         except Exception as e:
-            print(f"Error al obtener información de los bloques: {e}")
+            self.logger.error(f"Error al obtener información de los bloques: {e}")
             return []
     
     def report_block_status(self, block_reports: List[Dict]) -> None:
@@ -155,7 +447,21 @@ class NameNodeClient:
     
     # Operaciones de DataNodes
     def register_datanode(self, registration: Dict) -> Dict:
-        return self._make_request('post', '/datanodes/register', data=registration)
+        try:
+            return self._make_request('post', '/datanodes/register', data=registration)
+        finally:
+            self.invalidate_datanode(registration.get('node_id'))
+    
+    def invalidate_datanode(self, node_id: Optional[str]) -> None:
+        """
+        Descarta el descriptor en caché de un DataNode, p. ej. tras registrarse
+        de nuevo con otra dirección.
+        
+        Args:
+            node_id: ID del DataNode
+        """
+        with self._cache_lock:
+            self._cache.pop(('datanode', node_id), None)
     
     def list_datanodes(self, status: Optional[str] = None) -> List[Dict]:
         """
@@ -174,51 +480,101 @@ class NameNodeClient:
             response = self._make_request('get', endpoint)
             return response if isinstance(response, list) else []
         except Exception as e:
-            print(f"Error al obtener lista de DataNodes: {e}")
+            self.logger.error(f"Error al obtener lista de DataNodes: {e}")
             return []
     
     def get_datanode(self, node_id: str) -> Dict:
-        return self._make_request('get', f'/datanodes/{node_id}')
+        return self._cached('datanode', node_id, self.datanode_cache_ttl,
+                            lambda: self._make_request('get', f'/datanodes/{node_id}'))
+    
+    def get_datanodes(self, node_ids=None) -> Dict[str, Dict]:
+        """
+        Obtiene la información de varios DataNodes con una sola petición.
+        
+        Args:
+            node_ids: IDs de los DataNodes buscados (None para todos)
+            
+        Returns:
+            Diccionario node_id -> información del DataNode (solo los encontrados)
+        """
+        wanted = set(node_ids) if node_ids is not None else None
+        return {node['node_id']: node for node in self.list_datanodes()
+                if node.get('node_id') and (wanted is None or node['node_id'] in wanted)}
     
     def datanode_heartbeat(self, node_id: str, available_space: int) -> None:
-        self._make_request('post', f'/datanodes/{node_id}/heartbeat', data={'available_space': available_space})
+        try:
+            self._make_request('post', f'/datanodes/{node_id}/heartbeat', data={'available_space': available_space})
+        finally:
+            self.invalidate_datanode(node_id)
     
     # Operaciones de directorios
-    def create_directory(self, directory: Dict) -> Dict:
-        return self._make_request('post', '/directories/', data=directory)
+    def create_directory(self, directory: Dict, parents: bool = False) -> Dict:
+        endpoint = '/directories/'
+        if parents:
+            # Crea los directorios intermedios y no falla si ya existe
+            endpoint += '?parents=true'
+        try:
+            return self._make_request('post', endpoint, data=directory)
+        finally:
+            # Con parents pueden haberse creado varios niveles: descartar todos los listados
+            self.invalidate_path(None if parents else directory.get('path', '/'))
     
     def list_directory(self, path: str) -> Dict:
-        return self._make_request('get', f'/directories/{path}')
+        return self._cached('dir', self._normalize_path(path), self.directory_cache_ttl,
+                            lambda: self._make_request('get', f'/directories/{path}'))
+    
+    def list_directories_bulk(self, paths: List[str]) -> List[str]:
+        """
+        Consulta en una sola petición cuáles de las rutas existen como directorios.
+        
+        Args:
+            paths: Rutas de directorios a comprobar
+            
+        Returns:
+            Lista con las rutas (normalizadas, con '/' inicial) que existen
+        """
+        return self._make_request('post', '/directories/exists', data=paths)
     
     def delete_directory(self, path: str, recursive: bool = False) -> None:
         endpoint = f'/directories/{path}'
         if recursive:
             endpoint += '?recursive=true'
-        self._make_request('delete', endpoint)
+        try:
+            self._make_request('delete', endpoint)
+        finally:
+            self.invalidate_path(path)
 
-    def get_file_info(self, path: str) -> Optional[Dict]:
+    def get_file_info(self, path: str, compact_locations: bool = False) -> Optional[Dict]:
         """
         Obtiene información detallada de un archivo.
         
         Args:
             path: Ruta del archivo en el DFS
+            compact_locations: Si es True, los bloques traen solo los IDs de sus
+                DataNodes ('location_ids') y sus direcciones vienen una sola vez
+                en 'datanodes'
             
         Returns:
             Diccionario con la información del archivo o None si no existe
         """
         try:
             # Obtener información detallada, incluyendo ubicaciones de bloques en DataNodes activos
-            response = self._make_request('get', f'/files/info/{path}')
+            if compact_locations:
+                response = self._cached('compact_info', self._normalize_path(path), self.file_cache_ttl,
+                                        lambda: self._make_request('get', f'/files/info/{path}?compact_locations=true'))
+            else:
+                response = self._cached('info', self._normalize_path(path), self.file_cache_ttl,
+                                        lambda: self._make_request('get', f'/files/info/{path}'))
             if isinstance(response, dict):
                 # Verificar si hay bloques sin ubicaciones disponibles
                 if 'blocks' in response:
                     for block in response['blocks']:
-                        if 'locations' in block and len(block['locations']) == 0:
-                            print(f"Advertencia: El bloque {block['block_id']} no tiene ubicaciones disponibles")
+                        if len(block.get('locations', block.get('location_ids', [None]))) == 0:
+                            self.logger.warning(f"El bloque {block['block_id']} no tiene ubicaciones disponibles")
                 return response
             return None
         except Exception as e:
-            print(f"Error al obtener información del archivo: {e}")
+            self.logger.error(f"Error al obtener información del archivo: {e}")
             return None
 
     def get_system_stats(self) -> Dict:
@@ -229,7 +585,8 @@ class NameNodeClient:
             Diccionario con estadísticas del sistema
         """
         try:
-            response = self._make_request('get', '/system/stats')
+            response = self._cached('stats', '', self.stats_cache_ttl,
+                                    lambda: self._make_request('get', '/system/stats'))
             return response if response else {
                 'namenode_active': False,
                 'total_files': 0,
@@ -237,7 +594,7 @@ class NameNodeClient:
                 'replication_factor': 2
             }
         except Exception as e:
-            print(f"Error al obtener estadísticas del sistema: {e}")
+            self.logger.error(f"Error al obtener estadísticas del sistema: {e}")
             return {
                 'namenode_active': False,
                 'total_files': 0,
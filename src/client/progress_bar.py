@@ -0,0 +1,75 @@
+import sys
+import time
+from typing import Optional, TextIO
+
+# tqdm, si está instalado, dibuja la barra con su propio control de frecuencia
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+
+class ProgressBar:
+    """
+    Barra de progreso de consola que limita la frecuencia de dibujo.
+
+    Con miles de bloques pequeños, redibujar la barra y vaciar stdout por cada
+    bloque cuesta más que el propio progreso; aquí solo se dibuja como mucho
+    una vez cada `min_interval` segundos, y siempre al llegar al total. Si tqdm
+    está instalado y no se indica otro flujo de salida, la barra se delega en él.
+    """
+    def __init__(self, total: int, width: int = 50, min_interval: float = 0.033,
+                 stream: Optional[TextIO] = None):
+        """
+        Inicializa la barra de progreso.
+
+        Args:
+            total: Número total de unidades de trabajo
+            width: Ancho de la barra en caracteres
+            min_interval: Segundos mínimos entre dos dibujos de la barra
+            stream: Flujo de salida (sys.stdout por defecto)
+        """
+        self.total = total
+        self.width = width
+        self.min_interval = min_interval
+        self.stream = stream or sys.stdout
+        self._bar_full = '█' * width
+        self._bar_empty = '-' * width
+        self._last_render = 0.0
+        self._tqdm = None
+        if tqdm is not None and stream is None:
+            self._tqdm = tqdm(total=total, unit='blk', mininterval=min_interval, file=sys.stdout)
+
+    def update(self, done: int):
+        """
+        Actualiza el progreso y redibuja la barra si pasó el intervalo mínimo.
+
+        Args:
+            done: Unidades completadas hasta ahora
+        """
+        if self._tqdm is not None:
+            self._tqdm.update(done - self._tqdm.n)
+            if done >= self.total:
+                self._tqdm.close()
+            return
+
+        now = time.monotonic()
+        if done < self.total and now - self._last_render < self.min_interval:
+            return
+        self._last_render = now
+
+        progress = done / self.total if self.total else 1.0
+        filled_length = int(self.width * progress)
+        bar = self._bar_full[:filled_length] + self._bar_empty[filled_length:]
+
+        self.stream.write(f"\r[{bar}] {progress * 100:.1f}% ({done}/{self.total})")
+        self.stream.flush()
+
+    def close(self):
+        """Termina la línea de la barra para que la salida siguiente empiece en una línea nueva."""
+        if self._tqdm is not None:
+            self._tqdm.close()
+            return
+        if self._last_render:
+            self.stream.write("\n")
+            self.stream.flush()
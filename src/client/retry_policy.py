@@ -0,0 +1,46 @@
+import random
+import time
+
+
+class RetryPolicy:
+    """
+    Espera exponencial con jitter entre reintentos.
+
+    La espera máxima de cada intento crece como base_delay * multiplier**intento,
+    hasta max_delay, y la espera real es un valor aleatorio entre 0 y ese máximo.
+    Así, cuando muchos hilos fallan a la vez, no reintentan todos al mismo tiempo
+    contra el mismo DataNode o el NameNode.
+    """
+    def __init__(self, base_delay: float = 0.05, multiplier: float = 2.0, max_delay: float = 5.0):
+        """
+        Inicializa la política de reintentos.
+
+        Args:
+            base_delay: Espera máxima en segundos tras el primer fallo
+            multiplier: Factor por el que se multiplica la espera en cada intento
+            max_delay: Límite superior de la espera en segundos
+        """
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """
+        Calcula la espera antes del siguiente intento.
+
+        Args:
+            attempt: Número del intento fallido (0 para el primero)
+
+        Returns:
+            Segundos a esperar
+        """
+        return random.random() * min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+
+    def sleep(self, attempt: int):
+        """
+        Espera el tiempo correspondiente al intento fallido.
+
+        Args:
+            attempt: Número del intento fallido (0 para el primero)
+        """
+        time.sleep(self.delay(attempt))
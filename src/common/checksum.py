@@ -0,0 +1,96 @@
+import hashlib
+import zlib
+from typing import Optional
+
+# CRC32C usa la instrucción crc32 de SSE4.2 (o CRC32X en ARM) cuando la
+# biblioteca está instalada; si no, se usa el CRC32 de zlib, también en C
+try:
+    import google_crc32c
+except ImportError:
+    google_crc32c = None
+
+CHECKSUM_ALGO = 'crc32c' if google_crc32c is not None else 'crc32'
+
+
+def block_checksum(data) -> str:
+    """
+    Calcula el checksum de un bloque con el algoritmo más rápido disponible.
+
+    El resultado lleva el algoritmo como prefijo (por ejemplo 'crc32c:1a2b3c4d')
+    para que cualquier cliente sepa cómo verificarlo.
+
+    Args:
+        data: Datos del bloque (bytes, bytearray o memoryview)
+
+    Returns:
+        Checksum con el formato '<algoritmo>:<valor hexadecimal>'
+    """
+    if google_crc32c is not None:
+        return f"crc32c:{google_crc32c.value(data):08x}"
+    return f"crc32:{zlib.crc32(data) & 0xffffffff:08x}"
+
+
+class BlockChecksum:
+    """
+    Checksum incremental de un bloque: el resultado es el mismo que el de
+    block_checksum sobre todos los fragmentos concatenados.
+    """
+
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data) -> None:
+        """
+        Añade un fragmento del bloque al checksum.
+
+        Args:
+            data: Siguiente fragmento del bloque (bytes, bytearray o memoryview)
+        """
+        if google_crc32c is not None:
+            self._value = google_crc32c.extend(self._value, data)
+        else:
+            self._value = zlib.crc32(data, self._value)
+
+    def hexdigest(self) -> str:
+        """
+        Returns:
+            Checksum con el formato '<algoritmo>:<valor hexadecimal>'
+        """
+        return f"{CHECKSUM_ALGO}:{self._value & 0xffffffff:08x}"
+
+
+def verify_checksum(data, checksum: Optional[str]) -> Optional[bool]:
+    """
+    Comprueba los datos de un bloque contra su checksum registrado.
+
+    Acepta los checksums con prefijo de block_checksum y, por compatibilidad,
+    los MD5 y SHA-256 hexadecimales sin prefijo de versiones anteriores.
+
+    Args:
+        data: Datos del bloque
+        checksum: Checksum registrado del bloque
+
+    Returns:
+        True si coincide, False si no coincide y None si no se puede verificar
+        (sin checksum o algoritmo no disponible)
+    """
+    if not checksum:
+        return None
+
+    algo, _, value = checksum.partition(':')
+    if not value:
+        # Checksums antiguos sin prefijo: se distinguen por su longitud
+        algo, value = {32: 'md5', 64: 'sha256'}.get(len(checksum), ''), checksum
+
+    if algo == 'crc32c':
+        if google_crc32c is None:
+            return None
+        actual = f"{google_crc32c.value(data):08x}"
+    elif algo == 'crc32':
+        actual = f"{zlib.crc32(data) & 0xffffffff:08x}"
+    elif algo in ('md5', 'sha256'):
+        actual = hashlib.new(algo, data).hexdigest()
+    else:
+        return None
+
+    return actual == value.lower()
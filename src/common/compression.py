@@ -0,0 +1,120 @@
+import threading
+import zlib
+from typing import Optional
+
+# zstd a nivel 1 comprime a más de 1 GB/s, más rápido que la red: es el algoritmo
+# por defecto si la biblioteca está instalada. lz4 comprime menos pero aún más
+# rápido y es la alternativa si no hay zstd. zlib (nivel 1) siempre está
+# disponible, pero es bastante más lento y solo se usa si se pide expresamente
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+SUPPORTED_COMPRESSIONS = tuple(algo for algo, available in (('zstd', zstandard is not None),
+                                                            ('lz4', lz4_frame is not None),
+                                                            ('zlib', True)) if available)
+DEFAULT_COMPRESSION = next((algo for algo in SUPPORTED_COMPRESSIONS if algo != 'zlib'), None)
+
+# Metadato gRPC con el que el cliente indica qué algoritmos acepta en las descargas
+ACCEPT_COMPRESSION_KEY = 'accept-compression'
+
+# Se comprime una muestra del inicio del bloque; si no reduce al menos un 15 %,
+# el bloque (probablemente ya comprimido o aleatorio) se envía tal cual
+PROBE_SIZE = 4096
+MAX_PROBE_RATIO = 0.85
+
+# Contextos de zstd reutilizados por hilo: crear uno por bloque cuesta más que
+# comprimir un bloque pequeño, y un mismo contexto no puede usarse desde dos
+# hilos a la vez
+_zstd_contexts = threading.local()
+
+
+def _zstd_compressor():
+    compressor = getattr(_zstd_contexts, 'compressor', None)
+    if compressor is None:
+        compressor = _zstd_contexts.compressor = zstandard.ZstdCompressor(level=1)
+    return compressor
+
+
+def _zstd_decompressor():
+    decompressor = getattr(_zstd_contexts, 'decompressor', None)
+    if decompressor is None:
+        decompressor = _zstd_contexts.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+
+def _compress(data, algo: str) -> bytes:
+    if algo == 'zstd' and zstandard is not None:
+        return _zstd_compressor().compress(data)
+    if algo == 'lz4' and lz4_frame is not None:
+        return lz4_frame.compress(data, compression_level=0)
+    if algo == 'zlib':
+        return zlib.compress(data, 1)
+    raise ValueError(f"Algoritmo de compresión no disponible: {algo}")
+
+
+def compress_block(data, algo: Optional[str]) -> Optional[bytes]:
+    """
+    Comprime un bloque para enviarlo por la red, si merece la pena.
+
+    Args:
+        data: Datos del bloque (bytes, bytearray o memoryview)
+        algo: Algoritmo a usar ('zstd', 'lz4' o 'zlib'); None para no comprimir
+
+    Returns:
+        Datos comprimidos, o None si no se comprime (sin algoritmo, bloque vacío
+        o datos que apenas se reducen)
+    """
+    if not algo or len(data) == 0:
+        return None
+
+    probe = memoryview(data)[:PROBE_SIZE]
+    if len(_compress(probe, algo)) >= MAX_PROBE_RATIO * len(probe):
+        return None
+
+    compressed = _compress(data, algo)
+    return compressed if len(compressed) < len(data) else None
+
+
+def decompress_block(data, algo: str) -> bytes:
+    """
+    Descomprime un bloque recibido por la red.
+
+    Args:
+        data: Datos comprimidos
+        algo: Algoritmo con el que se comprimieron
+
+    Returns:
+        Datos originales del bloque
+    """
+    if algo == 'zstd' and zstandard is not None:
+        return _zstd_decompressor().decompress(data)
+    if algo == 'lz4' and lz4_frame is not None:
+        return lz4_frame.decompress(data)
+    if algo == 'zlib':
+        return zlib.decompress(data)
+    raise ValueError(f"Algoritmo de compresión no disponible: {algo}")
+
+
+def choose_compression(accepted: Optional[str]) -> Optional[str]:
+    """
+    Elige el primer algoritmo de una lista aceptada por el otro extremo que
+    también esté disponible aquí.
+
+    Args:
+        accepted: Algoritmos separados por comas, en orden de preferencia
+
+    Returns:
+        Algoritmo elegido o None si no hay ninguno en común
+    """
+    for algo in (accepted or '').split(','):
+        algo = algo.strip()
+        if algo in SUPPORTED_COMPRESSIONS:
+            return algo
+    return None
@@ -20,6 +20,8 @@ class DataNodeRegistration:
         self.registration_interval = registration_interval
         self.is_registered = False
         self.logger = logging.getLogger("DataNodeRegistration")
+        # Sesión con keep-alive: los heartbeats periódicos reutilizan la conexión
+        self.session = requests.Session()
     
     def register(self) -> bool:
         try:
@@ -31,7 +33,7 @@ class DataNodeRegistration:
                 "available_space": self.storage_capacity
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.namenode_url}/datanodes/register",
                 json=registration_data
             )
@@ -75,7 +77,7 @@ class DataNodeRegistration:
             self.logger.debug(f"Enviando heartbeat al NameNode para {self.node_id} con {len(blocks_info)} bloques")
             
             # Enviar heartbeat al NameNode
-            response = requests.post(
+            response = self.session.post(
                 f"{self.namenode_url}/datanodes/{self.node_id}/heartbeat",
                 json=heartbeat_data
             )
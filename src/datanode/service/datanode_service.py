@@ -1,9 +1,11 @@
 import grpc
 from concurrent import futures
 import os
+import hashlib
 import shutil
 import logging
 import time
+import threading
 from typing import Dict, Optional, Iterator, Any, Tuple
 
 # Importamos los módulos necesarios
@@ -12,6 +14,7 @@ from src.datanode.registration import DataNodeRegistration
 
 # Importamos los módulos generados por gRPC
 from src.common.proto import datanode_pb2, datanode_pb2_grpc
+from src.common.compression import ACCEPT_COMPRESSION_KEY, choose_compression, compress_block, decompress_block
 
 class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
     def __init__(self, storage_dir: str, node_id: str, hostname: str, port: int, namenode_url: str = None):
@@ -21,6 +24,19 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
         self.storage = BlockStorage(storage_dir)
         self.logger = logging.getLogger(f"DataNode-{node_id}")
         
+        # Canales gRPC abiertos con otros DataNodes ((hostname, port) -> stub),
+        # reutilizados entre replicaciones y transferencias
+        self._peer_stubs = {}
+        self._peer_stubs_lock = threading.Lock()
+        
+        # Cada replicación ocupa un hilo del servidor mientras espera al DataNode
+        # destino. Si todos los hilos de dos DataNodes replican el uno hacia el
+        # otro, ninguno atiende los StoreBlock del otro y se bloquean entre sí:
+        # por encima de este límite las replicaciones se rechazan y el cliente
+        # sube la réplica directamente
+        self.max_concurrent_replications = 4
+        self._replication_slots = threading.BoundedSemaphore(self.max_concurrent_replications)
+        
         # Estadísticas de transferencia
         self.transfer_stats = {
             "bytes_sent": 0,
@@ -48,6 +64,49 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
             )
             self.registration.start_heartbeat_thread(self._get_storage_stats)
     
+    STORED_CHECKSUM_PREFIX = "Block stored successfully with checksum "
+    
+    @classmethod
+    def _stored_checksum(cls, message: str) -> Optional[str]:
+        """
+        Extrae el checksum del mensaje de respuesta de StoreBlock, para los
+        DataNodes que aún no lo devuelven en el campo checksum.
+        
+        Args:
+            message: Mensaje devuelto por el DataNode destino
+            
+        Returns:
+            Checksum del bloque almacenado o None si el mensaje no lo incluye
+        """
+        if message.startswith(cls.STORED_CHECKSUM_PREFIX):
+            return message[len(cls.STORED_CHECKSUM_PREFIX):].strip() or None
+        return None
+    
+    def _get_peer_stub(self, hostname: str, port: int) -> datanode_pb2_grpc.DataNodeServiceStub:
+        """
+        Obtiene un stub para otro DataNode, reutilizando su canal gRPC si ya existe.
+        
+        Args:
+            hostname: Host del DataNode destino
+            port: Puerto del DataNode destino
+            
+        Returns:
+            Stub del servicio del DataNode destino
+        """
+        key = (hostname, int(port))
+        with self._peer_stubs_lock:
+            stub = self._peer_stubs.get(key)
+            if stub is None:
+                # Configurar opciones del canal con límites más grandes
+                options = [
+                    ('grpc.max_send_message_length', 8 * 1024 * 1024),  # 8MB
+                    ('grpc.max_receive_message_length', 8 * 1024 * 1024)  # 8MB
+                ]
+                channel = grpc.insecure_channel(f"{hostname}:{port}", options=options)
+                stub = datanode_pb2_grpc.DataNodeServiceStub(channel)
+                self._peer_stubs[key] = stub
+        return stub
+    
     def _get_storage_capacity(self, storage_dir: str) -> int:
         try:
             stats = shutil.disk_usage(storage_dir)
@@ -81,8 +140,10 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
     def StoreBlock(self, request_iterator, context):
         """Almacena un bloque de datos enviado por el cliente."""
         block_id = None
-        data = bytearray()
+        # Los trozos se guardan tal cual llegan y se escriben juntos con writev
+        chunks = []
         total_size = 0
+        compression = None
         start_time = time.time()
         
         try:
@@ -92,9 +153,11 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
                 if first_chunk:
                     block_id = chunk.block_id
                     total_size = chunk.total_size
+                    if chunk.compressed:
+                        compression = chunk.compression_metadata.decode()
                     first_chunk = False
                 
-                data.extend(chunk.data)
+                chunks.append(chunk.data)
             
             if not block_id:
                 return datanode_pb2.BlockResponse(
@@ -104,11 +167,22 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
                 )
             
             # Actualizar estadísticas de transferencia
-            self.transfer_stats["bytes_received"] += len(data)
-            self.transfer_stats["blocks_uncompressed"] += 1
+            if compression:
+                # El bloque se guarda descomprimido: el checksum es el de los datos originales
+                data = b''.join(chunks)
+                self.transfer_stats["compressed_bytes_received"] += len(data)
+                start_decompression = time.time()
+                data = decompress_block(data, compression)
+                self.transfer_stats["decompression_time"] += time.time() - start_decompression
+                self.transfer_stats["blocks_compressed"] += 1
+                self.transfer_stats["bytes_received"] += len(data)
+            else:
+                data = chunks
+                self.transfer_stats["blocks_uncompressed"] += 1
+                self.transfer_stats["bytes_received"] += sum(len(chunk) for chunk in chunks)
             
             # Almacenar el bloque y obtener el checksum
-            success, checksum = self.storage.store_block(block_id, bytes(data))
+            success, checksum = self.storage.store_block(block_id, data)
             
             # Actualizar tiempo de transferencia
             self.transfer_stats["transfer_time"] += time.time() - start_time
@@ -117,8 +191,9 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
                 self.transfer_stats["blocks_transferred"] += 1
                 return datanode_pb2.BlockResponse(
                     status=datanode_pb2.BlockResponse.SUCCESS,
-                    message=f"Block stored successfully with checksum {checksum}",
-                    block_id=block_id
+                    message=f"{self.STORED_CHECKSUM_PREFIX}{checksum}",
+                    block_id=block_id,
+                    checksum=checksum
                 )
             else:
                 self.transfer_stats["blocks_transfer_failed"] += 1
@@ -150,37 +225,66 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
                 context.set_details(f"Block {block_id} not found")
                 return
             
-            # Obtener los datos del bloque
-            block_data = self.storage.retrieve_block(block_id)
-            if not block_data:
+            chunk_size = 4 * 1024 * 1024  # 4MB
+            original_size = self.storage.get_block_size(block_id)
+            if not original_size:
                 self.logger.error(f"Failed to retrieve block {block_id}")
                 context.set_code(grpc.StatusCode.INTERNAL)
                 context.set_details(f"Failed to retrieve block {block_id}")
                 return
             
             # Actualizar estadísticas
-            self.transfer_stats["bytes_sent"] += len(block_data)
+            self.transfer_stats["bytes_sent"] += original_size
+            total_size = original_size
+            
+            # Comprimir el bloque si el cliente lo acepta y los datos se reducen;
+            # para eso hace falta el bloque completo en memoria
+            compression = choose_compression(dict(context.invocation_metadata()).get(ACCEPT_COMPRESSION_KEY))
+            if compression:
+                block_data = self.storage.retrieve_block(block_id)
+                if not block_data:
+                    self.logger.error(f"Failed to retrieve block {block_id}")
+                    context.set_code(grpc.StatusCode.INTERNAL)
+                    context.set_details(f"Failed to retrieve block {block_id}")
+                    return
+                start_compression = time.time()
+                compressed = compress_block(block_data, compression)
+                self.transfer_stats["compression_time"] += time.time() - start_compression
+                if compressed is not None:
+                    block_data = compressed
+                    self.transfer_stats["compressed_bytes_sent"] += len(block_data)
+                    self.transfer_stats["blocks_compressed"] += 1
+                else:
+                    compression = None
+                total_size = len(block_data)
+                chunks = (block_data[i:i + chunk_size] for i in range(0, total_size, chunk_size))
+            else:
+                # Sin compresión, cada trozo se lee del disco directamente con pread
+                chunks = self.storage.read_block_chunks(block_id, chunk_size)
             
             # Enviar el bloque en chunks
-            chunk_size = 4 * 1024 * 1024  # 4MB
-            total_size = len(block_data)
+            offset = 0
             chunks_sent = 0
-            
-            for i in range(0, total_size, chunk_size):
-                chunk = block_data[i:i+chunk_size]
+            for chunk in chunks:
                 chunks_sent += 1
                 yield datanode_pb2.BlockData(
                     block_id=block_id,
                     data=chunk,
-                    offset=i,
-                    total_size=total_size
+                    offset=offset,
+                    total_size=total_size,
+                    original_size=original_size,
+                    compressed=compression is not None,
+                    compression_metadata=compression.encode() if compression else b''
                 )
+                offset += len(chunk)
             
             # Actualizar estadísticas finales
             self.transfer_stats["blocks_transferred"] += 1
             self.transfer_stats["transfer_time"] += time.time() - start_time
             
-            self.logger.info(f"Block {block_id} retrieved successfully: {total_size} bytes in {chunks_sent} chunks")
+            # Mensajes por bloque solo en DEBUG: el registro se serializa entre los hilos del servidor
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Block {block_id} retrieved successfully: {total_size} bytes in {chunks_sent} chunks")
             
         except Exception as e:
             self.logger.error(f"Error retrieving block {block_id}: {str(e)}")
@@ -191,6 +295,19 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
     
     def ReplicateBlock(self, request, context):
         """Replica un bloque a otro DataNode siguiendo el protocolo Leader-Follower."""
+        if not self._replication_slots.acquire(blocking=False):
+            return datanode_pb2.BlockResponse(
+                status=datanode_pb2.BlockResponse.ERROR,
+                message="Too many replications in progress",
+                block_id=request.block_id
+            )
+        try:
+            return self._replicate_block(request)
+        finally:
+            self._replication_slots.release()
+    
+    def _replicate_block(self, request):
+        """Envía el bloque al DataNode destino y verifica la copia."""
         block_id = request.block_id
         target_datanode_id = request.target_datanode_id
         target_hostname = request.target_hostname
@@ -215,22 +332,15 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
                 )
             
             # Calcular checksum del bloque
-            import hashlib
             checksum = hashlib.sha256(block_data).hexdigest()
             
             # Establecer conexión con el DataNode objetivo
             try:
-                # Configurar opciones del canal con límites más grandes
-                options = [
-                    ('grpc.max_send_message_length', 8 * 1024 * 1024),  # 8MB
-                    ('grpc.max_receive_message_length', 8 * 1024 * 1024)  # 8MB
-                ]
-                channel = grpc.insecure_channel(f"{target_hostname}:{target_port}", options=options)
-                stub = datanode_pb2_grpc.DataNodeServiceStub(channel)
+                stub = self._get_peer_stub(target_hostname, target_port)
                 
                 # Enviar el bloque al DataNode objetivo
                 def block_data_iterator():
-                    chunk_size = 4096
+                    chunk_size = 1024 * 1024  # 1MB por chunk, igual que el cliente
                     total_size = len(block_data)
                     
                     for i in range(0, total_size, chunk_size):
@@ -246,12 +356,19 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
                 response = stub.StoreBlock(block_data_iterator())
                 
                 if response.status == datanode_pb2.BlockResponse.SUCCESS:
-                    # Verificar la integridad del bloque replicado
-                    verify_request = datanode_pb2.BlockRequest(block_id=block_id)
-                    verify_response = stub.CheckBlock(verify_request)
+                    # Verificar la integridad del bloque replicado. StoreBlock ya devuelve
+                    # el checksum de lo que almacenó el destino; los DataNodes anteriores al
+                    # campo checksum solo lo incluyen en el mensaje, y los más antiguos ni
+                    # eso: entonces se pide con CheckBlock, que relee y recalcula el bloque
+                    stored_checksum = response.checksum or self._stored_checksum(response.message)
+                    if stored_checksum is None:
+                        verify_request = datanode_pb2.BlockRequest(block_id=block_id)
+                        verify_response = stub.CheckBlock(verify_request)
+                        stored_checksum = verify_response.checksum if verify_response.exists else None
                     
-                    if verify_response.exists and verify_response.checksum == checksum:
-                        self.logger.info(f"Block {block_id} replicated successfully to {target_datanode_id} with verified integrity")
+                    if stored_checksum == checksum:
+                        if self.logger.isEnabledFor(logging.DEBUG):
+                            self.logger.debug(f"Block {block_id} replicated successfully to {target_datanode_id} with verified integrity")
                         return datanode_pb2.BlockResponse(
                             status=datanode_pb2.BlockResponse.SUCCESS,
                             message=f"Block {block_id} replicated to {target_datanode_id} with verified integrity",
@@ -323,13 +440,7 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
             try:
                 # Establecer conexión con el DataNode destino
                 self.logger.info(f"Conectando con DataNode destino {target_hostname}:{target_port}")
-                # Configurar opciones del canal con límites más grandes
-                options = [
-                    ('grpc.max_send_message_length', 8 * 1024 * 1024),  # 8MB
-                    ('grpc.max_receive_message_length', 8 * 1024 * 1024)  # 8MB
-                ]
-                target_channel = grpc.insecure_channel(f"{target_hostname}:{target_port}", options=options)
-                target_stub = datanode_pb2_grpc.DataNodeServiceStub(target_channel)
+                target_stub = self._get_peer_stub(target_hostname, target_port)
                 
                 # Preparar datos para envío
                 chunk_size = 4 * 1024 * 1024  # 4MB por chunk
@@ -350,7 +461,6 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
                 # Enviar el bloque al DataNode destino
                 self.logger.info(f"Enviando bloque {block_id} ({total_size/1024/1024:.2f} MB) a {target_datanode_id}")
                 response = target_stub.StoreBlock(block_data_iterator())
-                target_channel.close()
                 
                 # Verificar respuesta
                 if response.status == datanode_pb2.BlockResponse.SUCCESS:
@@ -469,7 +579,8 @@ class DataNodeServicer(datanode_pb2_grpc.DataNodeServiceServicer):
         success = self.storage.delete_block(block_id)
         
         if success:
-            self.logger.info(f"Block {block_id} deleted successfully")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Block {block_id} deleted successfully")
             return datanode_pb2.BlockResponse(
                 status=datanode_pb2.BlockResponse.SUCCESS,
                 message=f"Block {block_id} deleted successfully",
@@ -2,12 +2,22 @@ import os
 import hashlib
 import logging
 import shutil
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Iterator, Optional, List, Tuple
 
 class BlockStorage:
+    # Los bloques se leen en trozos de 1 MB para calcular su checksum: sin
+    # cargarlos enteros en memoria y con trozos lo bastante grandes para que
+    # hashlib suelte el GIL durante casi todo el cálculo
+    CHECKSUM_CHUNK_SIZE = 1024 * 1024
+    # Máximo de trozos por llamada a writev (IOV_MAX en Linux)
+    WRITEV_MAX_BUFFERS = 1024
+    
     def __init__(self, storage_dir: str):
         self.storage_dir = storage_dir
         self.logger = logging.getLogger("BlockStorage")
+        # Checksums de los bloques para los informes periódicos, junto con el
+        # tamaño y la fecha de modificación del archivo con que se calcularon
+        self._checksum_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
         os.makedirs(self.storage_dir, exist_ok=True)
         
     def _get_block_path(self, block_id: str) -> str:
@@ -16,52 +26,110 @@ class BlockStorage:
     def _calculate_checksum(self, data: bytes) -> str:
         return hashlib.sha256(data).hexdigest()
     
-    def store_block(self, block_id: str, data: bytes) -> Tuple[bool, str]:
+    def store_block(self, block_id: str, data) -> Tuple[bool, str]:
         """
         Almacena un bloque y devuelve una tupla (success, checksum).
+        
+        data puede ser el bloque completo o la lista de trozos recibidos por la
+        red: los trozos se escriben con writev, sin unirlos antes en memoria.
         """
         try:
             block_path = self._get_block_path(block_id)
+            chunks = [memoryview(chunk) for chunk in data] if isinstance(data, list) else [memoryview(data)]
+            size = sum(chunk.nbytes for chunk in chunks)
             
             # Calcular checksum antes de almacenar
-            checksum = self._calculate_checksum(data)
+            hasher = hashlib.sha256()
+            for chunk in chunks:
+                hasher.update(chunk)
+            checksum = hasher.hexdigest()
             
-            # Almacenar el bloque
-            with open(block_path, 'wb') as f:
-                f.write(data)
+            # Si el bloque ya existe con el mismo contenido, no reescribirlo. Solo
+            # se compara el checksum si coincide el tamaño, y se reutiliza el
+            # guardado si el archivo no cambió desde que se calculó
+            try:
+                existing = os.stat(block_path)
+            except FileNotFoundError:
+                existing = None
+            if (existing is not None and existing.st_size == size
+                    and self._report_checksum(block_id, existing) == checksum):
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Block {block_id} already stored with the same checksum")
+                return True, checksum
+            
+            # Almacenar el bloque y releerlo con el mismo descriptor (pread no
+            # depende de la posición), sin volver a abrir el archivo
+            fd = os.open(block_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                self._writev_all(fd, chunks)
+                stored_data = os.pread(fd, size, 0)
+            finally:
+                os.close(fd)
             
             # Verificar integridad después de almacenar
-            with open(block_path, 'rb') as f:
-                stored_data = f.read()
-                stored_checksum = self._calculate_checksum(stored_data)
-                
-                if stored_checksum != checksum:
-                    self.logger.error(f"Block integrity check failed for {block_id}")
-                    os.remove(block_path)
-                    return False, ""
+            stored_checksum = self._calculate_checksum(stored_data)
+            if stored_checksum != checksum:
+                self.logger.error(f"Block integrity check failed for {block_id}")
+                os.remove(block_path)
+                return False, ""
             
+            self._remember_checksum(block_id, os.stat(block_path), checksum)
             return True, checksum
         except Exception as e:
             self.logger.error(f"Error storing block {block_id}: {str(e)}")
             return False, ""
     
+    def _writev_all(self, fd: int, views: List[memoryview]):
+        """
+        Escribe varias vistas consecutivas con writev (como mucho IOV_MAX por
+        llamada), continuando si el sistema escribe solo una parte.
+        """
+        views = [view.cast('B') for view in views if view.nbytes]
+        while views:
+            written = os.writev(fd, views[:self.WRITEV_MAX_BUFFERS])
+            # Descartar lo ya escrito y recortar la primera vista pendiente
+            while views and written >= views[0].nbytes:
+                written -= views[0].nbytes
+                views.pop(0)
+            if views and written:
+                views[0] = views[0][written:]
+    
     def retrieve_block(self, block_id: str) -> Optional[bytes]:
         """
         Recupera un bloque y verifica su integridad.
         """
         try:
             block_path = self._get_block_path(block_id)
-            if not os.path.exists(block_path):
-                return None
             
-            with open(block_path, 'rb') as f:
-                data = f.read()
+            # Sin buffer intermedio: el archivo se lee entero con una sola llamada
+            try:
+                with open(block_path, 'rb', buffering=0) as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return None
             
             return data
         except Exception as e:
             self.logger.error(f"Error retrieving block {block_id}: {str(e)}")
             return None
     
+    def read_block_chunks(self, block_id: str, chunk_size: int) -> Iterator[bytes]:
+        """
+        Lee un bloque en trozos de chunk_size bytes con pread, sin cargarlo
+        entero en memoria ni copiar cada trozo de un buffer mayor.
+        """
+        fd = os.open(self._get_block_path(block_id), os.O_RDONLY)
+        try:
+            offset = 0
+            while True:
+                chunk = os.pread(fd, chunk_size, offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                yield chunk
+        finally:
+            os.close(fd)
+    
     def block_exists(self, block_id: str) -> bool:
         return os.path.exists(self._get_block_path(block_id))
     
@@ -70,21 +138,18 @@ class BlockStorage:
         Obtiene información del bloque incluyendo su checksum.
         """
         try:
-            block_path = self._get_block_path(block_id)
-            if not os.path.exists(block_path):
+            size = self.get_block_size(block_id)
+            if size is None:
                 return {
                     "exists": False,
                     "size": 0,
                     "checksum": ""
                 }
             
-            with open(block_path, 'rb') as f:
-                data = f.read()
-            
             return {
                 "exists": True,
-                "size": len(data),
-                "checksum": self._calculate_checksum(data)
+                "size": size,
+                "checksum": self.calculate_checksum(block_id)
             }
         except Exception as e:
             self.logger.error(f"Error getting block info for {block_id}: {str(e)}")
@@ -97,10 +162,12 @@ class BlockStorage:
     def delete_block(self, block_id: str) -> bool:
         try:
             block_path = self._get_block_path(block_id)
-            if os.path.exists(block_path):
+            self._checksum_cache.pop(block_id, None)
+            try:
                 os.remove(block_path)
-                return True
-            return False
+            except FileNotFoundError:
+                return False
+            return True
         except Exception as e:
             self.logger.error(f"Error deleting block {block_id}: {str(e)}")
             return False
@@ -115,19 +182,22 @@ class BlockStorage:
             block_sizes = {}
             block_checksums = {}
             
-            for filename in os.listdir(self.storage_dir):
-                block_path = os.path.join(self.storage_dir, filename)
-                if os.path.isfile(block_path):
-                    with open(block_path, 'rb') as f:
-                        data = f.read()
-                        size = len(data)
-                        checksum = self._calculate_checksum(data)
+            with os.scandir(self.storage_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        filename = entry.name
+                        stat = entry.stat()
+                        checksum = self._report_checksum(filename, stat)
                         
-                        total_size += size
+                        total_size += stat.st_size
                         blocks.append(filename)
-                        block_sizes[filename] = size
+                        block_sizes[filename] = stat.st_size
                         block_checksums[filename] = checksum
             
+            # Olvidar los checksums de los bloques que ya no están
+            for block_id in set(self._checksum_cache) - set(block_checksums):
+                self._checksum_cache.pop(block_id, None)
+            
             return {
                 "total_size": total_size,
                 "blocks": blocks,
@@ -143,23 +213,45 @@ class BlockStorage:
                 "block_checksums": {}
             }
     
+    def _report_checksum(self, block_id: str, stat: os.stat_result) -> Optional[str]:
+        """
+        Checksum de un bloque para los informes periódicos al NameNode y para
+        detectar bloques ya almacenados: solo se vuelve a leer el bloque si su
+        archivo cambió (tamaño o fecha de modificación) desde la última vez, en
+        lugar de releer todos los bloques en cada informe.
+        """
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._checksum_cache.get(block_id)
+        if cached and cached[0] == key:
+            return cached[1]
+        
+        checksum = self.calculate_checksum(block_id)
+        if checksum is not None:
+            self._checksum_cache[block_id] = (key, checksum)
+        return checksum
+    
+    def _remember_checksum(self, block_id: str, stat: os.stat_result, checksum: str):
+        self._checksum_cache[block_id] = ((stat.st_size, stat.st_mtime_ns), checksum)
+    
     def get_block_size(self, block_id: str) -> Optional[int]:
-        block_path = self._get_block_path(block_id)
-        if not os.path.exists(block_path):
+        # Una sola llamada a stat en lugar de comprobar antes si existe
+        try:
+            return os.stat(self._get_block_path(block_id)).st_size
+        except FileNotFoundError:
             return None
-        
-        return os.path.getsize(block_path)
     
     def calculate_checksum(self, block_id: str) -> Optional[str]:
         block_path = self._get_block_path(block_id)
-        if not os.path.exists(block_path):
-            return None
-        
         sha256 = hashlib.sha256()
         try:
-            with open(block_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    sha256.update(chunk)
+            with open(block_path, 'rb', buffering=0) as f:
+                buffer = bytearray(self.CHECKSUM_CHUNK_SIZE)
+                view = memoryview(buffer)
+                while True:
+                    size = f.readinto(buffer)
+                    if not size:
+                        break
+                    sha256.update(view[:size])
             return sha256.hexdigest()
         except Exception:
             return None
@@ -190,14 +282,14 @@ class BlockStorage:
     
     def stream_block(self, block_id: str, chunk_size: int = 4096) -> Optional[List[Tuple[bytes, int, int]]]:
         block_path = self._get_block_path(block_id)
-        if not os.path.exists(block_path):
+        total_size = self.get_block_size(block_id)
+        if total_size is None:
             return None
         
-        total_size = os.path.getsize(block_path)
         chunks = []
         
         try:
-            with open(block_path, 'rb') as f:
+            with open(block_path, 'rb', buffering=0) as f:
                 offset = 0
                 while True:
                     chunk = f.read(chunk_size)
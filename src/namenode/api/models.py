@@ -72,6 +72,17 @@ class FileMetadata(BaseModel):
     owner: Optional[str] = None
 
 
+class InlineBlock(BaseModel):
+    block_id: str
+    size: int  # in bytes
+    checksum: Optional[str] = None
+
+
+class FileWithBlock(BaseModel):
+    file: FileMetadata
+    block: Optional[InlineBlock] = None  # None for empty files
+
+
 class DirectoryListing(BaseModel):
     path: str
     contents: List[FileMetadata]
@@ -0,0 +1,88 @@
+import contextvars
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+# msgpack (opcional) codifica las peticiones y respuestas del NameNode en binario,
+# más compacto y rápido de procesar que JSON; sin él la API solo habla JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# orjson (opcional) analiza y genera en C los cuerpos que siguen siendo JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+
+# Indica, durante el procesamiento de una petición, si el cliente acepta msgpack
+_accepts_msgpack = contextvars.ContextVar('accepts_msgpack', default=False)
+
+
+class MsgpackRequest(Request):
+    """Petición cuyo cuerpo msgpack se entrega a FastAPI como si fuera JSON ya analizado."""
+    async def json(self) -> Any:
+        if not hasattr(self, '_json'):
+            self._json = msgpack.unpackb(await self.body(), raw=False)
+        return self._json
+
+
+class OrjsonRequest(Request):
+    """Petición cuyo cuerpo JSON se analiza con orjson."""
+    async def json(self) -> Any:
+        if not hasattr(self, '_json'):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class MsgpackResponse(JSONResponse):
+    """Respuesta que se codifica en msgpack si el cliente lo acepta y en JSON si no."""
+    def __init__(self, content: Any = None, *args, **kwargs):
+        self._use_msgpack = _accepts_msgpack.get()
+        if self._use_msgpack:
+            self.media_type = MSGPACK_CONTENT_TYPE
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if self._use_msgpack:
+            return msgpack.packb(content, use_bin_type=True)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+class MsgpackRoute(APIRoute):
+    """
+    Ruta que acepta cuerpos en msgpack (Content-Type: application/msgpack) y
+    responde en msgpack a los clientes que lo piden con Accept. Usar junto con
+    MsgpackResponse como clase de respuesta por defecto del router.
+    """
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+
+        async def handler(request: Request) -> Response:
+            if request.headers.get('content-type', '').startswith(MSGPACK_CONTENT_TYPE):
+                if msgpack is None:
+                    return JSONResponse(status_code=415,
+                                        content={'detail': 'msgpack no está disponible en el NameNode'})
+                # FastAPI solo analiza el cuerpo con request.json() si es JSON
+                scope = dict(request.scope)
+                scope['headers'] = [(name, value) for name, value in request.scope['headers']
+                                    if name != b'content-type'] + [(b'content-type', b'application/json')]
+                request = MsgpackRequest(scope, request.receive)
+            elif orjson is not None:
+                request = OrjsonRequest(request.scope, request.receive)
+
+            token = _accepts_msgpack.set(msgpack is not None and
+                                         MSGPACK_CONTENT_TYPE in request.headers.get('accept', ''))
+            try:
+                return await original_handler(request)
+            finally:
+                _accepts_msgpack.reset(token)
+
+        return handler
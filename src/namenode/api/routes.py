@@ -12,6 +12,7 @@ from src.namenode.api.models import (
     BlockInfo, 
     BlockLocation,
     FileMetadata, 
+    FileWithBlock,
     DirectoryListing,
     ErrorResponse,
     FileType,
@@ -21,13 +22,15 @@ from src.namenode.api.models import (
 )
 from src.namenode.metadata.manager import MetadataManager
 from src.namenode.api.dependencies import get_metadata_manager
+from src.namenode.api.msgpack_codec import MsgpackResponse, MsgpackRoute
 
-# Routers
-files_router = APIRouter(prefix="/files", tags=["Files"])
-blocks_router = APIRouter(prefix="/blocks", tags=["Blocks"])
-datanodes_router = APIRouter(prefix="/datanodes", tags=["DataNodes"])
-directories_router = APIRouter(prefix="/directories", tags=["Directories"])
-system_router = APIRouter(tags=["System"])  # Sin prefijo para que funcione con la ruta /system/stats
+# Routers: aceptan y devuelven msgpack a los clientes que lo usan, JSON al resto
+_codec = dict(route_class=MsgpackRoute, default_response_class=MsgpackResponse)
+files_router = APIRouter(prefix="/files", tags=["Files"], **_codec)
+blocks_router = APIRouter(prefix="/blocks", tags=["Blocks"], **_codec)
+datanodes_router = APIRouter(prefix="/datanodes", tags=["DataNodes"], **_codec)
+directories_router = APIRouter(prefix="/directories", tags=["Directories"], **_codec)
+system_router = APIRouter(tags=["System"], **_codec)  # Sin prefijo para que funcione con la ruta /system/stats
 
 # Registrar los routers
 app.include_router(files_router)
@@ -66,6 +69,46 @@ async def create_file(file_metadata: FileMetadata, manager: MetadataManager = De
     
     return created_file
 
+@files_router.post("/with-block", response_model=FileMetadata, status_code=201)
+async def create_file_with_block(request: FileWithBlock, manager: MetadataManager = Depends(get_metadata_manager)):
+    """
+    Register a small file together with its only block in a single request.
+    """
+    file_metadata = request.file
+    
+    # Verificar si ya existe un archivo con la misma ruta
+    if manager.get_file_by_path(file_metadata.path):
+        raise HTTPException(status_code=409, detail=f"File already exists at path: {file_metadata.path}")
+    
+    # Verificar que el directorio padre existe
+    parent_path = os.path.dirname(file_metadata.path)
+    if parent_path and not manager.get_file_by_path(parent_path):
+        raise HTTPException(status_code=404, detail=f"Parent directory does not exist: {parent_path}")
+    
+    # El tamaño del archivo se acumula al crear su bloque
+    created_file = manager.create_file(
+        name=file_metadata.name,
+        path=file_metadata.path,
+        file_type=FileType.FILE,
+        size=0,
+        owner=file_metadata.owner
+    )
+    
+    if not created_file:
+        raise HTTPException(status_code=500, detail="Failed to create file")
+    
+    if request.block:
+        block_id = manager.create_block(
+            file_id=created_file.file_id,
+            size=request.block.size,
+            checksum=request.block.checksum,
+            block_id=request.block.block_id
+        )
+        if not block_id:
+            raise HTTPException(status_code=500, detail="Failed to create block")
+    
+    return manager.get_file(created_file.file_id)
+
 @files_router.get("/{file_id}", response_model=FileMetadata)
 async def get_file(file_id: str = Path(..., description="The ID of the file to retrieve"), manager: MetadataManager = Depends(get_metadata_manager)):
     """
@@ -107,9 +150,13 @@ async def get_file_by_path(path: str = Path(..., description="The path of the fi
     return file
 
 @files_router.get("/info/{path:path}")
-async def get_file_info(path: str, manager: MetadataManager = Depends(get_metadata_manager)):
+async def get_file_info(path: str, compact_locations: bool = False,
+                        manager: MetadataManager = Depends(get_metadata_manager)):
     """
     Obtiene información detallada de un archivo.
+    
+    Con compact_locations=true, cada bloque trae solo los IDs de sus DataNodes
+    y sus direcciones se envían una sola vez en 'datanodes'.
     """
     try:
         # Primero verificar si el archivo existe
@@ -121,7 +168,7 @@ async def get_file_info(path: str, manager: MetadataManager = Depends(get_metada
             )
         
         # Obtener información detallada
-        file_info = manager.get_file_info(path)
+        file_info = manager.get_file_info(path, compact_locations=compact_locations)
         if not file_info:
             raise HTTPException(
                 status_code=500,
@@ -274,6 +321,43 @@ async def create_block(block_info: BlockInfo = Body(..., description="Block info
         print(error_detail)
         raise HTTPException(status_code=500, detail=error_detail)
 
+@blocks_router.post("/bulk", status_code=204)
+async def create_blocks_bulk(blocks: List[BlockInfo] = Body(..., description="Blocks to register, in file order"), manager: MetadataManager = Depends(get_metadata_manager)):
+    """
+    Register several blocks, and optionally their locations, in a single request.
+    Blocks are stored in the order received, which is the order in which they
+    are returned for the file.
+    """
+    # Verificar una sola vez cada archivo al que pertenecen los bloques
+    for file_id in {block.file_id for block in blocks}:
+        file = manager.get_file(file_id)
+        if not file:
+            raise HTTPException(status_code=404, detail=f"File not found with ID: {file_id}")
+        
+        if file.type == FileType.DIRECTORY:
+            raise HTTPException(status_code=400, detail="Cannot add blocks to directories")
+    
+    # Bloques y ubicaciones se guardan en una sola transacción
+    try:
+        manager.register_blocks_bulk(blocks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error registering blocks: {str(e)}")
+    
+    return None
+
+@blocks_router.post("/batch", response_model=List[BlockInfo])
+async def get_blocks_info_batch(block_ids: List[str] = Body(..., description="IDs of the blocks to retrieve"), manager: MetadataManager = Depends(get_metadata_manager)):
+    """
+    Get information about several blocks in a single request. Unknown IDs are skipped.
+    """
+    blocks = []
+    for block_id in block_ids:
+        block = manager.get_block_info(block_id)
+        if block:
+            blocks.append(block)
+    
+    return blocks
+
 @blocks_router.post("/report", status_code=204)
 async def report_block_status(block_reports: List[BlockInfo], manager: MetadataManager = Depends(get_metadata_manager)):
     """
@@ -460,7 +544,9 @@ async def datanode_heartbeat(
 
 # Directories Endpoints
 @directories_router.post("/", response_model=FileMetadata, status_code=201)
-async def create_directory(directory: FileMetadata, manager: MetadataManager = Depends(get_metadata_manager)):
+async def create_directory(directory: FileMetadata,
+                           parents: bool = Query(False, description="Create missing parent directories and succeed if the directory already exists"),
+                           manager: MetadataManager = Depends(get_metadata_manager)):
     """
     Create a new directory.
     """
@@ -475,6 +561,8 @@ async def create_directory(directory: FileMetadata, manager: MetadataManager = D
     # Verificar si ya existe un directorio con la misma ruta
     existing_dir = manager.get_file_by_path(normalized_path)
     if existing_dir:
+        if parents and existing_dir.type == FileType.DIRECTORY:
+            return existing_dir
         raise HTTPException(status_code=409, detail=f"Directory already exists at path: {normalized_path}")
     
     # Caso especial para el directorio raíz
@@ -493,6 +581,28 @@ async def create_directory(directory: FileMetadata, manager: MetadataManager = D
     parent_path = os.path.dirname(normalized_path)
     parent_dir = manager.get_file_by_path(parent_path)
     
+    if not parent_dir and parents:
+        # Crear los directorios intermedios que falten, de padre a hijo
+        missing = []
+        while parent_path != "/" and not parent_dir:
+            missing.append(parent_path)
+            parent_path = os.path.dirname(parent_path)
+            parent_dir = manager.get_file_by_path(parent_path)
+        
+        for missing_path in reversed(missing):
+            if parent_dir and parent_dir.type != FileType.DIRECTORY:
+                raise HTTPException(status_code=400, detail=f"Parent path is not a directory: {parent_path}")
+            
+            parent_dir = manager.create_file(
+                name=os.path.basename(missing_path),
+                path=missing_path,
+                file_type=FileType.DIRECTORY,
+                owner=directory.owner
+            )
+            if not parent_dir:
+                raise HTTPException(status_code=500, detail=f"Failed to create directory {missing_path}")
+            parent_path = missing_path
+    
     if not parent_dir:
         raise HTTPException(status_code=404, detail=f"Parent directory does not exist: {parent_path}")
     
@@ -512,6 +622,22 @@ async def create_directory(directory: FileMetadata, manager: MetadataManager = D
     
     return created_dir
 
+@directories_router.post("/exists", response_model=List[str])
+async def check_directories_exist(paths: List[str] = Body(..., description="Directory paths to check"), manager: MetadataManager = Depends(get_metadata_manager)):
+    """
+    Return which of the given paths exist as directories, in a single request.
+    """
+    existing = []
+    for path in paths:
+        # Normalizar la ruta
+        normalized_path = "/" + path.strip("/")
+        
+        dir_info = manager.get_file_by_path(normalized_path)
+        if dir_info and dir_info.type == FileType.DIRECTORY:
+            existing.append(normalized_path)
+    
+    return existing
+
 @directories_router.get("/{path:path}", response_model=DirectoryListing)
 async def list_directory(path: str = Path(..., description="The path of the directory to list"), manager: MetadataManager = Depends(get_metadata_manager)):
     """
@@ -393,6 +393,75 @@ class MetadataDatabase:
             logging.error(f"Error creating block: {str(e)}")
             return False
     
+    def register_blocks_bulk(self, blocks: List[Dict[str, Any]]) -> None:
+        """
+        Registra varios bloques y sus ubicaciones en una sola transacción.
+
+        Los bloques nuevos se insertan en el orden recibido y suman su tamaño al
+        de su archivo; los ya existentes solo actualizan tamaño y checksum. Las
+        ubicaciones en DataNodes inactivos o ya registradas se omiten.
+
+        Args:
+            blocks: Bloques con 'block_id', 'file_id', 'size', 'checksum' y
+                'locations' (lista de diccionarios con 'datanode_id' e 'is_leader')
+        """
+        if not blocks:
+            return
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            existing = set()
+            block_ids = [block['block_id'] for block in blocks]
+            for i in range(0, len(block_ids), 500):
+                chunk = block_ids[i:i + 500]
+                cursor.execute(
+                    f"SELECT block_id FROM blocks WHERE block_id IN ({', '.join('?' * len(chunk))})", chunk)
+                existing.update(row['block_id'] for row in cursor.fetchall())
+
+            cursor.execute("SELECT node_id FROM datanodes WHERE status = 'active'")
+            active_datanodes = {row['node_id'] for row in cursor.fetchall()}
+
+            size_by_file = {}
+            locations = []
+            for block in blocks:
+                if block['block_id'] in existing:
+                    cursor.execute('UPDATE blocks SET size = ?, checksum = ? WHERE block_id = ?',
+                                   (block['size'], block.get('checksum'), block['block_id']))
+                else:
+                    cursor.execute('''
+                    INSERT INTO blocks (block_id, file_id, size, checksum)
+                    VALUES (?, ?, ?, ?)
+                    ''', (block['block_id'], block['file_id'], block['size'], block.get('checksum')))
+                    existing.add(block['block_id'])
+                    size_by_file[block['file_id']] = size_by_file.get(block['file_id'], 0) + block['size']
+
+                for location in block.get('locations') or []:
+                    if location['datanode_id'] in active_datanodes:
+                        locations.append((block['block_id'], location['datanode_id'], location.get('is_leader', False)))
+
+            now = datetime.now()
+            cursor.executemany('UPDATE files SET size = size + ?, modified_at = ? WHERE file_id = ?',
+                               [(size, now, file_id) for file_id, size in size_by_file.items()])
+
+            cursor.executemany('''
+            INSERT OR IGNORE INTO block_locations (block_id, datanode_id, is_leader)
+            VALUES (?, ?, ?)
+            ''', locations)
+
+            # Recalcular una sola vez el contador de cada DataNode afectado
+            cursor.executemany('''
+            UPDATE datanodes SET blocks_stored = (
+                SELECT COUNT(*) FROM block_locations WHERE datanode_id = ?
+            ) WHERE node_id = ?
+            ''', [(node_id, node_id) for node_id in {location[1] for location in locations}])
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
     def get_block(self, block_id: str) -> Optional[Dict[str, Any]]:
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -477,6 +546,31 @@ class MetadataDatabase:
         
         return [dict(row) for row in cursor.fetchall()]
     
+    def get_file_block_locations(self, file_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Obtiene en una sola consulta las ubicaciones de todos los bloques de un archivo.
+        
+        Args:
+            file_id: ID del archivo
+            
+        Returns:
+            Diccionario block_id -> lista de ubicaciones del bloque
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT bl.*, d.hostname, d.port, d.status
+        FROM block_locations bl
+        JOIN blocks b ON bl.block_id = b.block_id
+        JOIN datanodes d ON bl.datanode_id = d.node_id
+        WHERE b.file_id = ?
+        ''', (file_id,))
+        
+        locations = {}
+        for row in cursor.fetchall():
+            locations.setdefault(row['block_id'], []).append(dict(row))
+        return locations
+    
     def remove_block_location(self, block_id: str, datanode_id: str) -> bool:
         conn = self.get_connection()
         cursor = conn.cursor()
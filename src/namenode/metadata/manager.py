@@ -4,6 +4,7 @@ import json
 import pickle
 import uuid
 import logging
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -32,6 +33,9 @@ class MetadataManager:
         self.node_id = node_id or str(uuid.uuid4())
         self.known_nodes = set()  # Set of (node_id, hostname, port) tuples
         self.logger = logging.getLogger("MetadataManager")
+        # Un cliente (canal gRPC) por DataNode, reutilizado entre borrados
+        self._datanode_clients = {}
+        self._datanode_clients_lock = threading.Lock()
         self._ensure_root_directory_exists()
         self._cleanup_stale_datanodes()
     
@@ -300,28 +304,31 @@ class MetadataManager:
         
         # Obtener todos los bloques y sus ubicaciones antes de eliminarlos
         blocks = self.db.get_file_blocks(file_id)
-        block_locations = {}
+        blocks_by_datanode = {}
         
-        # Recopilar todas las ubicaciones de bloques
+        # Recopilar todas las ubicaciones de bloques, agrupadas por DataNode
         for block in blocks:
             block_id = block["block_id"]
-            locations = self.db.get_block_locations(block_id)
-            block_locations[block_id] = locations
+            for location in self.db.get_block_locations(block_id):
+                blocks_by_datanode.setdefault(location["datanode_id"], []).append(block_id)
             
             # Eliminar el bloque de la base de datos
             self.db.delete_block(block_id)
-            
-            # Eliminar las ubicaciones del bloque
-            for location in locations:
-                datanode = self.get_datanode(location["datanode_id"])
-                if datanode and datanode.status == DataNodeStatus.ACTIVE:
+        
+        # Eliminar los bloques de cada DataNode usando una sola conexión por DataNode
+        for datanode_id, block_ids in blocks_by_datanode.items():
+            datanode = self.get_datanode(datanode_id)
+            if not datanode or datanode.status != DataNodeStatus.ACTIVE:
+                continue
+            try:
+                datanode_client = self._get_datanode_client(datanode.hostname, datanode.port)
+                for block_id in block_ids:
                     try:
-                        # Crear cliente DataNode y eliminar el bloque
-                        with DataNodeClient(datanode.hostname, datanode.port) as datanode_client:
-                            datanode_client.delete_block(block_id)
+                        datanode_client.delete_block(block_id)
                     except Exception as e:
                         self.logger.error(f"Error al eliminar bloque {block_id} del DataNode {datanode.node_id}: {e}")
-                        continue
+            except Exception as e:
+                self.logger.error(f"Error al conectar con el DataNode {datanode.node_id}: {e}")
         
         # Finalmente eliminar el archivo
         return self.db.delete_file(file_id)
@@ -389,6 +396,24 @@ class MetadataManager:
             return block_id
         return None
     
+    def register_blocks_bulk(self, blocks: List[BlockInfo]) -> None:
+        """
+        Registra varios bloques y sus ubicaciones en una sola transacción.
+
+        Args:
+            blocks: Bloques a registrar, en el orden del archivo
+        """
+        self.db.register_blocks_bulk([{
+            'block_id': block.block_id,
+            'file_id': block.file_id,
+            'size': block.size,
+            'checksum': block.checksum,
+            'locations': [
+                {'datanode_id': loc.datanode_id, 'is_leader': loc.is_leader}
+                for loc in block.locations
+            ]
+        } for block in blocks])
+
     def get_block_info(self, block_id: str) -> Optional[BlockInfo]:
         block_data = self.db.get_block_with_locations(block_id)
         if not block_data:
@@ -417,11 +442,13 @@ class MetadataManager:
     
     def get_file_blocks(self, file_id: str) -> List[BlockInfo]:
         blocks_data = self.db.get_file_blocks(file_id)
+        # Ubicaciones de todos los bloques en una sola consulta, indexadas por bloque
+        locations_by_block = self.db.get_file_block_locations(file_id) if blocks_data else {}
         
         result = []
         for block_data in blocks_data:
             block_id = block_data["block_id"]
-            locations = self.db.get_block_locations(block_id)
+            locations = locations_by_block.get(block_id, [])
             
             block_locations = [
                 BlockLocation(
@@ -501,7 +528,32 @@ class MetadataManager:
         """
         return self.db.update_block(block_id, **kwargs)
     
+    def _get_datanode_client(self, hostname: str, port: int) -> DataNodeClient:
+        """
+        Obtiene un cliente conectado al DataNode, reutilizando el canal gRPC si
+        ya existe uno abierto con ese host y puerto.
+        
+        Args:
+            hostname: Host del DataNode
+            port: Puerto del DataNode
+            
+        Returns:
+            Cliente conectado al DataNode
+        """
+        key = (hostname, int(port))
+        with self._datanode_clients_lock:
+            datanode_client = self._datanode_clients.get(key)
+            if datanode_client is None:
+                datanode_client = DataNodeClient(hostname, port).connect()
+                self._datanode_clients[key] = datanode_client
+        return datanode_client
+    
     def close(self):
+        with self._datanode_clients_lock:
+            clients = list(self._datanode_clients.values())
+            self._datanode_clients.clear()
+        for datanode_client in clients:
+            datanode_client.close()
         self.db.close_connection()
         
     # Métodos para gestión de nodos conocidos
@@ -728,12 +780,15 @@ class MetadataManager:
                 "replication_factor": getattr(self, 'replication_factor', 2)
             }
 
-    def get_file_info(self, path: str) -> Optional[Dict]:
+    def get_file_info(self, path: str, compact_locations: bool = False) -> Optional[Dict]:
         """
         Obtiene información detallada de un archivo incluyendo sus bloques y ubicaciones.
         
         Args:
             path: Ruta del archivo
+            compact_locations: Si es True, cada bloque lleva solo los IDs de sus
+                DataNodes ('location_ids') y la dirección de cada DataNode aparece
+                una única vez en 'datanodes', en lugar de repetirse en cada bloque
             
         Returns:
             Diccionario con la información del archivo o None si no existe
@@ -747,31 +802,50 @@ class MetadataManager:
             # Obtener información de los bloques
             blocks = self.get_file_blocks(file_data.file_id)
             block_info = []
+            datanodes = {}
             
             # Primero obtenemos todos los DataNodes activos para tener un acceso más rápido
             all_active_datanodes = {dn.node_id: dn for dn in self.list_datanodes(status="active")}
             
             for block in blocks:
-                # Obtener ubicaciones del bloque
-                locations = self.db.get_block_locations(block.block_id)
+                if compact_locations:
+                    location_ids = [loc.datanode_id for loc in block.locations
+                                    if loc.datanode_id in all_active_datanodes]
+                    for datanode_id in location_ids:
+                        if datanode_id not in datanodes:
+                            datanode = all_active_datanodes[datanode_id]
+                            datanodes[datanode_id] = {"hostname": datanode.hostname, "port": datanode.port}
+                    
+                    if not location_ids:
+                        self.logger.warning(f"No hay DataNodes activos para el bloque {block.block_id}")
+                    
+                    block_info.append({
+                        "block_id": block.block_id,
+                        "size": block.size,
+                        "checksum": block.checksum,
+                        "location_ids": location_ids
+                    })
+                    continue
+                
+                # Las ubicaciones ya vienen con cada bloque: sin otra consulta por bloque
                 active_locations = []
                 
-                for loc in locations:
+                for loc in block.locations:
                     try:
-                        datanode_id = loc["datanode_id"]
+                        datanode_id = loc.datanode_id
                         # Verificar si el DataNode está activo usando el diccionario
                         if datanode_id in all_active_datanodes:
                             datanode = all_active_datanodes[datanode_id]
                             # Incluir toda la información necesaria del DataNode
                             active_locations.append({
                                 "datanode_id": datanode_id,
-                                "is_leader": loc["is_leader"],
+                                "is_leader": loc.is_leader,
                                 "hostname": datanode.hostname,
                                 "port": datanode.port,
                                 "status": "active"  # Ya sabemos que está activo
                             })
                     except Exception as e:
-                        self.logger.error(f"Error al obtener información del DataNode {loc.get('datanode_id', 'unknown')}: {str(e)}")
+                        self.logger.error(f"Error al obtener información del DataNode {loc.datanode_id}: {str(e)}")
                         continue
                 
                 if not active_locations:
@@ -784,8 +858,10 @@ class MetadataManager:
                     "locations": active_locations
                 })
             
+            locations_key = "location_ids" if compact_locations else "locations"
+            
             # Construir la respuesta
-            return {
+            file_info = {
                 "file_id": file_data.file_id,
                 "name": file_data.name,
                 "path": file_data.path,
@@ -796,9 +872,12 @@ class MetadataManager:
                 "owner": file_data.owner,
                 "blocks": block_info,
                 "total_blocks": len(block_info),
-                "active_replicas": sum(len(block["locations"]) for block in block_info),
-                "is_healthy": all(len(block["locations"]) >= 1 for block in block_info)
+                "active_replicas": sum(len(block[locations_key]) for block in block_info),
+                "is_healthy": all(len(block[locations_key]) >= 1 for block in block_info)
             }
+            if compact_locations:
+                file_info["datanodes"] = datanodes
+            return file_info
             
         except Exception as e:
             import traceback
@@ -1,4 +1,5 @@
 import logging
+import threading
 from typing import List, Dict, Optional
 import grpc
 from concurrent import futures
@@ -19,6 +20,9 @@ class BlockReplicator:
         self.metadata_manager = metadata_manager
         self.replication_factor = replication_factor
         self.logger = logging.getLogger("BlockReplicator")
+        # Stubs de los DataNodes fuente, reutilizando su canal gRPC entre réplicas
+        self._datanode_stubs = {}
+        self._datanode_stubs_lock = threading.Lock()
     
     def handle_block_replication(self, block_id: str, failed_node_id: str) -> bool:
         """
@@ -141,9 +145,8 @@ class BlockReplicator:
             bool: True si la replicación fue exitosa, False en caso contrario
         """
         try:
-            # Establecer conexión con el DataNode fuente
-            source_channel = grpc.insecure_channel(f"{source_datanode.hostname}:{source_datanode.port}")
-            source_stub = datanode_pb2_grpc.DataNodeServiceStub(source_channel)
+            # Conexión con el DataNode fuente (reutilizada si ya existe)
+            source_stub = self._get_datanode_stub(source_datanode.hostname, source_datanode.port)
             
             # Crear la solicitud de replicación
             replication_request = datanode_pb2.ReplicationRequest(
@@ -156,11 +159,28 @@ class BlockReplicator:
             # Realizar la replicación
             response = source_stub.ReplicateBlock(replication_request)
             
-            # Cerrar la conexión
-            source_channel.close()
-            
             return response.status == datanode_pb2.BlockResponse.SUCCESS
             
         except Exception as e:
             self.logger.error(f"Error during block replication: {str(e)}")
-            return False 
\ No newline at end of file
+            return False 
+    
+    def _get_datanode_stub(self, hostname: str, port: int) -> datanode_pb2_grpc.DataNodeServiceStub:
+        """
+        Obtiene un stub para un DataNode, reutilizando su canal gRPC si ya existe.
+        
+        Args:
+            hostname: Host del DataNode
+            port: Puerto del DataNode
+            
+        Returns:
+            Stub del servicio del DataNode
+        """
+        key = (hostname, int(port))
+        with self._datanode_stubs_lock:
+            stub = self._datanode_stubs.get(key)
+            if stub is None:
+                channel = grpc.insecure_channel(f"{hostname}:{port}")
+                stub = datanode_pb2_grpc.DataNodeServiceStub(channel)
+                self._datanode_stubs[key] = stub
+        return stub
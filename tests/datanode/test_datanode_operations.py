@@ -180,6 +180,26 @@ class TestDataNodeOperations(unittest.TestCase):
         non_existent_block = str(uuid.uuid4())
         self.assertIsNone(self.storage.stream_block(non_existent_block))
 
+    def test_storage_stats_checksums(self):
+        """Prueba que las estadísticas reflejan los checksums actuales de los bloques"""
+        import hashlib
+        block_id = str(uuid.uuid4())
+        self.storage.store_block(block_id, b"contenido original")
+
+        stats = self.storage.get_storage_stats()
+        self.assertEqual(stats["block_checksums"][block_id], hashlib.sha256(b"contenido original").hexdigest())
+
+        # Un bloque reescrito (otro tamaño) se vuelve a leer
+        with open(os.path.join(self.test_dir, block_id), 'wb') as f:
+            f.write(b"contenido modificado en disco")
+        stats = self.storage.get_storage_stats()
+        self.assertEqual(stats["block_checksums"][block_id],
+                         hashlib.sha256(b"contenido modificado en disco").hexdigest())
+
+        # Un bloque eliminado desaparece de las estadísticas
+        self.storage.delete_block(block_id)
+        self.assertNotIn(block_id, self.storage.get_storage_stats()["block_checksums"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -40,6 +40,24 @@ class TestBlockStorage(unittest.TestCase):
         checksum = self.storage.calculate_checksum(block_id)
         self.assertIsNotNone(checksum)
     
+    def test_store_existing_block_is_idempotent(self):
+        block_id = "test_block_idempotent"
+        block_data = b"Same block sent twice"
+        
+        success, checksum = self.storage.store_block(block_id, block_data)
+        self.assertTrue(success)
+        block_path = self.storage._get_block_path(block_id)
+        os.utime(block_path, (0, 0))
+        
+        # Storing the same content again must not rewrite the file
+        self.assertEqual(self.storage.store_block(block_id, block_data), (True, checksum))
+        self.assertEqual(os.path.getmtime(block_path), 0)
+        
+        # Different content under the same id is still written
+        success, _ = self.storage.store_block(block_id, b"New content")
+        self.assertTrue(success)
+        self.assertEqual(self.storage.retrieve_block(block_id), b"New content")
+    
     def test_delete_block(self):
         block_id = "test_block_2"
         block_data = b"This is another test block"
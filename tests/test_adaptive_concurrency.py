@@ -0,0 +1,56 @@
+import os
+import sys
+import threading
+import unittest
+
+# Agregar el directorio raíz al path para poder importar los módulos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.client.adaptive_concurrency import AdaptiveConcurrency
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """Pruebas para el límite de concurrencia adaptativo del cliente"""
+
+    def test_acquire_waits_at_limit(self):
+        """Prueba que acquire espera cuando se alcanzó el límite"""
+        limiter = AdaptiveConcurrency(1, 4)
+        limiter.acquire()
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(limiter.acquire()))
+        waiter.start()
+        waiter.join(timeout=0.1)
+        self.assertEqual(acquired, [])
+
+        limiter.release()
+        waiter.join(timeout=1)
+        self.assertEqual(len(acquired), 1)
+
+    def _complete(self, limiter, count, now):
+        for _ in range(count):
+            limiter.acquire()
+            limiter.release(now=now)
+
+    def test_limit_follows_throughput(self):
+        """Prueba que el límite sube mientras el ritmo mejora y baja cuando empeora"""
+        limiter = AdaptiveConcurrency(2, 4, interval=1.0)
+        start = limiter._window_start
+
+        # Primer intervalo: se explora con una operación más
+        self._complete(limiter, 9, start + 0.5)
+        self._complete(limiter, 1, start + 1.0)
+        self.assertEqual(limiter.limit, 3)
+
+        # Ritmo estable: el límite no cambia
+        self._complete(limiter, 9, start + 1.5)
+        self._complete(limiter, 1, start + 2.0)
+        self.assertEqual(limiter.limit, 3)
+
+        # Ritmo mucho menor: el límite baja
+        self._complete(limiter, 1, start + 3.0)
+        self.assertEqual(limiter.limit, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import threading
+import unittest
+
+# Agregar el directorio raíz al path para poder importar los módulos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.client.buffer_pool import BufferPool
+
+
+class TestBufferPool(unittest.TestCase):
+    """Pruebas para el pool de buffers del cliente"""
+
+    def test_buffers_are_reused(self):
+        """Prueba que un buffer liberado se vuelve a entregar"""
+        pool = BufferPool(1024, 2)
+        buffer = pool.acquire()
+        self.assertEqual(len(buffer), 1024)
+
+        pool.release(buffer)
+        self.assertIs(pool.acquire(), buffer)
+
+    def test_acquire_waits_when_exhausted(self):
+        """Prueba que acquire espera a que se libere un buffer si se alcanzó el máximo"""
+        pool = BufferPool(16, 1)
+        buffer = pool.acquire()
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        waiter.join(timeout=0.1)
+        self.assertEqual(acquired, [])
+
+        pool.release(buffer)
+        waiter.join(timeout=1)
+        self.assertEqual(acquired, [buffer])
+
+
+if __name__ == '__main__':
+    unittest.main()
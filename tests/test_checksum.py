@@ -0,0 +1,44 @@
+import hashlib
+import os
+import sys
+import unittest
+
+# Agregar el directorio raíz al path para poder importar los módulos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.common.checksum import CHECKSUM_ALGO, BlockChecksum, block_checksum, verify_checksum
+
+
+class TestChecksum(unittest.TestCase):
+    """Pruebas para los checksums de bloques"""
+
+    def test_checksum_roundtrip(self):
+        """Prueba que el checksum lleva su algoritmo y verifica los datos"""
+        data = os.urandom(4096)
+        checksum = block_checksum(memoryview(data))
+
+        self.assertTrue(checksum.startswith(CHECKSUM_ALGO + ':'))
+        self.assertTrue(verify_checksum(data, checksum))
+        self.assertFalse(verify_checksum(data[:-1] + b'x', checksum))
+
+    def test_incremental_checksum(self):
+        """Prueba que el checksum por fragmentos coincide con el del bloque completo"""
+        data = os.urandom(10000)
+        checksum = BlockChecksum()
+        for offset in range(0, len(data), 4096):
+            checksum.update(memoryview(data)[offset:offset + 4096])
+
+        self.assertEqual(checksum.hexdigest(), block_checksum(data))
+
+    def test_legacy_checksums(self):
+        """Prueba la compatibilidad con checksums MD5 y SHA-256 sin prefijo"""
+        data = b'contenido del bloque'
+
+        self.assertTrue(verify_checksum(data, hashlib.md5(data).hexdigest()))
+        self.assertTrue(verify_checksum(data, hashlib.sha256(data).hexdigest()))
+        self.assertIsNone(verify_checksum(data, 'abc123'))
+        self.assertIsNone(verify_checksum(data, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
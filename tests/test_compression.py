@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+
+# Agregar el directorio raíz al path para poder importar los módulos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.common import compression
+from src.common.compression import choose_compression, compress_block, decompress_block
+
+
+class TestCompression(unittest.TestCase):
+    """Pruebas para la compresión de bloques en la red"""
+
+    def test_compressible_block_roundtrip(self):
+        """Prueba que un bloque compresible se comprime y se recupera intacto"""
+        data = b'linea de log repetida\n' * 1000
+        compressed = compress_block(memoryview(data), 'zlib')
+
+        self.assertIsNotNone(compressed)
+        self.assertLess(len(compressed), len(data))
+        self.assertEqual(decompress_block(compressed, 'zlib'), data)
+
+    def test_incompressible_block_is_sent_as_is(self):
+        """Prueba que los bloques que no se reducen o sin algoritmo no se comprimen"""
+        self.assertIsNone(compress_block(os.urandom(64 * 1024), 'zlib'))
+        self.assertIsNone(compress_block(b'a' * 4096, None))
+        self.assertIsNone(compress_block(b'', 'zlib'))
+
+    def test_choose_compression(self):
+        """Prueba que se elige el primer algoritmo aceptado que está disponible"""
+        self.assertEqual(choose_compression('brotli, zlib'), 'zlib')
+        self.assertIsNone(choose_compression('brotli'))
+        self.assertIsNone(choose_compression(None))
+
+    def _assert_roundtrip(self, algo):
+        data = b'linea de log repetida\n' * 1000
+        compressed = compress_block(memoryview(data), algo)
+
+        self.assertIsNotNone(compressed)
+        self.assertLess(len(compressed), len(data))
+        self.assertEqual(decompress_block(compressed, algo), data)
+
+    @unittest.skipUnless(compression.zstandard is not None, "zstandard no está instalado")
+    def test_zstd_roundtrip(self):
+        """Prueba la compresión y descompresión de un bloque con zstd"""
+        self._assert_roundtrip('zstd')
+
+    @unittest.skipUnless(compression.lz4_frame is not None, "lz4 no está instalado")
+    def test_lz4_roundtrip(self):
+        """Prueba la compresión y descompresión de un bloque con lz4"""
+        self._assert_roundtrip('lz4')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ import unittest
 import shutil
 import random
 import string
+import uuid
 
 # Agregar el directorio raíz al path para poder importar los módulos
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -110,6 +111,27 @@ class TestFileSplitter(unittest.TestCase):
                 self.assertEqual(chunk1, chunk2, 
                                  "El contenido del archivo reconstruido no coincide con el original")
     
+    def test_describe_blocks(self):
+        """Prueba que describe_blocks cubre el archivo igual que split_file"""
+        blocks = self.file_splitter.split_file(self.test_file_path)
+        descriptors = self.file_splitter.describe_blocks(os.path.getsize(self.test_file_path))
+        
+        self.assertEqual(len(descriptors), len(blocks))
+        with open(self.test_file_path, 'rb') as f:
+            fd = f.fileno()
+            for block, descriptor in zip(blocks, descriptors):
+                self.assertEqual(descriptor['index'], block['index'])
+                self.assertEqual(descriptor['size'], block['size'])
+                data = os.pread(fd, descriptor['size'], descriptor['offset'])
+                self.assertEqual(data, bytes(block['data']))
+        
+        # Identificadores únicos y con formato de UUID versión 4
+        block_ids = [descriptor['block_id'] for descriptor in descriptors]
+        self.assertEqual(len(set(block_ids)), len(block_ids))
+        self.assertTrue(all(uuid.UUID(block_id).version == 4 for block_id in block_ids))
+        
+        self.assertEqual(self.file_splitter.describe_blocks(0), [])
+    
     def test_small_file(self):
         """Prueba con un archivo más pequeño que el tamaño de bloque"""
         # Crear un archivo pequeño
@@ -0,0 +1,125 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Agregar el directorio raíz al path para poder importar los módulos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.client import namenode_client
+from src.client.namenode_client import NameNodeClient
+
+
+class TestNameNodeClientStats(unittest.TestCase):
+    """Pruebas para las estadísticas del sistema del cliente del NameNode"""
+
+    def setUp(self):
+        self.client = NameNodeClient('http://localhost:8000')
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_stats_are_returned_and_cached(self):
+        """Prueba que las estadísticas del NameNode se devuelven tal cual y se reutilizan"""
+        stats = {'namenode_active': True, 'total_files': 3, 'total_blocks': 7, 'replication_factor': 2}
+
+        with mock.patch.object(self.client, '_make_request', return_value=stats) as request:
+            self.assertEqual(self.client.get_system_stats(), stats)
+            self.assertEqual(self.client.get_system_stats(), stats)
+
+        request.assert_called_once_with('get', '/system/stats')
+
+    def test_stats_default_on_error(self):
+        """Prueba que sin respuesta del NameNode se devuelven estadísticas por defecto"""
+        with mock.patch.object(self.client, '_make_request', side_effect=ConnectionError()):
+            stats = self.client.get_system_stats()
+
+        self.assertFalse(stats['namenode_active'])
+        self.assertEqual(stats['total_files'], 0)
+
+
+class TestNameNodeClientRegistration(unittest.TestCase):
+    """Pruebas del registro de archivos y bloques"""
+
+    def setUp(self):
+        self.client = NameNodeClient('http://localhost:8000')
+        self.blocks = [{'block_id': 'b1', 'size': 10}, {'block_id': 'b2', 'size': 5}]
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_falls_back_only_on_missing_route(self):
+        """Prueba que solo se registra bloque a bloque si falta el endpoint masivo"""
+        missing = Exception('Error 405: {"detail":"Method Not Allowed"}')
+        with mock.patch.object(self.client, '_make_request', side_effect=[missing, {}, {}]) as request:
+            self.client.register_blocks_bulk('f1', self.blocks)
+
+        self.assertEqual([c.args[1] for c in request.call_args_list], ['/blocks/bulk', '/blocks/', '/blocks/'])
+
+        failure = Exception('Error 500: Internal Server Error')
+        with mock.patch.object(self.client, '_make_request', side_effect=failure) as request:
+            with self.assertRaises(Exception):
+                self.client.register_blocks_bulk('f1', self.blocks)
+
+        request.assert_called_once()
+
+    def test_small_file_registration_fallback(self):
+        """Prueba que sin /files/with-block se crea el archivo y luego su bloque"""
+        missing = Exception('Error 405: {"detail":"Method Not Allowed"}')
+        block = {'block_id': 'b1', 'size': 10, 'checksum': 'abc'}
+        with mock.patch.object(self.client, '_make_request',
+                               side_effect=[missing, {'file_id': 'f1'}, {}]) as request:
+            file_info = self.client.create_file_with_block({'name': 'a', 'path': '/a', 'type': 'file'}, block)
+
+        self.assertEqual(file_info['file_id'], 'f1')
+        self.assertEqual([c.args[1] for c in request.call_args_list], ['/files/with-block', '/files/', '/blocks/'])
+        self.assertEqual(request.call_args_list[2].kwargs['data']['file_id'], 'f1')
+
+
+
+class TestNameNodeClientCodec(unittest.TestCase):
+    """Pruebas de la negociación del formato de los cuerpos con el NameNode"""
+
+    def setUp(self):
+        self.client = NameNodeClient('http://localhost:8000')
+
+    def tearDown(self):
+        self.client.close()
+
+    def _response(self, status_code, content_type='application/json', content=b'{}'):
+        response = mock.Mock(status_code=status_code, content=content, text=content.decode('latin-1'))
+        response.headers = {'content-type': content_type}
+        return response
+
+    def test_starts_with_json(self):
+        """Prueba que se envía JSON mientras el NameNode no responda en msgpack"""
+        self.assertEqual(self.client.codec, 'json')
+        with mock.patch.object(self.client.session, 'get', return_value=self._response(200)) as get:
+            self.assertEqual(self.client._make_request('get', '/files/'), {})
+
+        self.assertEqual(get.call_args.kwargs['headers']['Content-Type'], 'application/json')
+        self.assertEqual(self.client.codec, 'json')
+
+    @unittest.skipIf(namenode_client.msgpack is None, "msgpack no está instalado")
+    def test_switches_to_msgpack_when_advertised(self):
+        """Prueba que se pasa a msgpack cuando el NameNode responde en msgpack"""
+        body = namenode_client.msgpack.packb({'ok': True})
+        response = self._response(200, namenode_client.MSGPACK_CONTENT_TYPE, body)
+        with mock.patch.object(self.client.session, 'get', return_value=response):
+            self.assertEqual(self.client._make_request('get', '/files/'), {'ok': True})
+
+        self.assertEqual(self.client.codec, 'msgpack')
+
+    def test_falls_back_to_json_on_rejected_msgpack(self):
+        """Prueba que se vuelve a JSON si el NameNode rechaza un cuerpo msgpack"""
+        self.client.codec = 'msgpack'
+        responses = [self._response(422, content=b'{"detail":[]}'), self._response(200)]
+        with mock.patch.object(self.client.session, 'get', side_effect=responses) as get:
+            self.assertEqual(self.client._make_request('get', '/files/'), {})
+
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(self.client.codec, 'json')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -109,6 +109,28 @@ class TestNameNodeOperations(unittest.TestCase):
         except Exception:
             pass
     
+    def test_create_directory_with_parents(self):
+        """Prueba la creación de directorios intermedios en una sola petición"""
+        nested_path = f"{self.test_dir}/a/b/c"
+        directory = {
+            'name': 'c',
+            'path': nested_path,
+            'type': 'directory'
+        }
+        
+        created_dir = self.client.create_directory(directory, parents=True)
+        self.assertEqual(created_dir['path'], f"/{nested_path}")
+        
+        # Los directorios intermedios deben existir
+        self.client.list_directory(f"{self.test_dir}/a")
+        self.client.list_directory(f"{self.test_dir}/a/b")
+        
+        # Repetir la operación no debe fallar
+        again = self.client.create_directory(directory, parents=True)
+        self.assertEqual(again['file_id'], created_dir['file_id'])
+        
+        self.client.delete_directory(f"{self.test_dir}/a", recursive=True)
+    
     def test_block_operations(self):
         """Prueba las operaciones básicas de bloques"""
         # Crear un archivo
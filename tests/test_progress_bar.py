@@ -0,0 +1,42 @@
+import io
+import os
+import sys
+import unittest
+
+# Agregar el directorio raíz al path para poder importar los módulos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.client.progress_bar import ProgressBar
+
+
+class TestProgressBar(unittest.TestCase):
+    """Pruebas para la barra de progreso del cliente"""
+
+    def test_updates_are_throttled(self):
+        """Prueba que las actualizaciones seguidas no se dibujan, salvo la final"""
+        stream = io.StringIO()
+        bar = ProgressBar(100, width=10, min_interval=60, stream=stream)
+
+        for done in range(1, 101):
+            bar.update(done)
+
+        frames = stream.getvalue().split('\r')[1:]
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0], '[----------] 1.0% (1/100)')
+        self.assertEqual(frames[-1], '[██████████] 100.0% (100/100)')
+
+    def test_close_ends_the_line(self):
+        """Prueba que cerrar la barra termina su línea, y no escribe nada si no se dibujó"""
+        stream = io.StringIO()
+        bar = ProgressBar(2, width=10, stream=stream)
+        bar.update(2)
+        bar.close()
+        self.assertTrue(stream.getvalue().endswith('(2/2)\n'))
+
+        stream = io.StringIO()
+        ProgressBar(2, width=10, stream=stream).close()
+        self.assertEqual(stream.getvalue(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
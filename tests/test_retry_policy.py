@@ -0,0 +1,35 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Agregar el directorio raíz al path para poder importar los módulos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.client.retry_policy import RetryPolicy
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Pruebas para la espera entre reintentos del cliente"""
+
+    def test_delay_grows_up_to_the_limit(self):
+        """Prueba que la espera máxima crece exponencialmente hasta max_delay"""
+        policy = RetryPolicy(base_delay=0.1, multiplier=2.0, max_delay=1.0)
+
+        with mock.patch('random.random', return_value=1.0):
+            self.assertAlmostEqual(policy.delay(0), 0.1)
+            self.assertAlmostEqual(policy.delay(1), 0.2)
+            self.assertAlmostEqual(policy.delay(3), 0.8)
+            self.assertAlmostEqual(policy.delay(10), 1.0)
+
+    def test_delay_is_jittered(self):
+        """Prueba que la espera es aleatoria entre 0 y el máximo del intento"""
+        policy = RetryPolicy(base_delay=0.1, multiplier=2.0, max_delay=1.0)
+        delays = [policy.delay(2) for _ in range(100)]
+
+        self.assertTrue(all(0 <= delay <= 0.4 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()